@@ -1,6 +0,0 @@
-from kqcircuits.elements.element import Element
-
-class ASlib(Element):
-    LIBRARY_NAME = "AS Library"
-    LIBRARY_DESCRIPTION = "Library from AS."
-    LIBRARY_PATH = "scq_layout"
\ No newline at end of file
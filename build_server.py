@@ -0,0 +1,181 @@
+import argparse
+import os
+import secrets
+import threading
+import time
+from multiprocessing import Pool
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+
+from kqcircuits.scq_layout.util.build_client import DEFAULT_ADDRESS, KEY_FILE
+
+# The server and its command line live outside the library package, so loading the AS Library does not import
+# them. Clients use ``submit`` and ``shutdown`` from ``util/build_client.py``.
+
+
+def write_authkey(key_file=KEY_FILE):
+    """Generate a random authentication key and write it to ``key_file``, readable by the current user only."""
+    key_file = Path(key_file)
+    key_file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    key = secrets.token_bytes(32)
+    if key_file.exists():
+        key_file.unlink()  # a new file, so the permissions of an existing one do not apply
+    fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+def _init_worker():
+    # Runs once per worker process: pay for KLayout/KQCircuits imports and library registration up front
+    from kqcircuits.elements.element import Element
+    from kqcircuits.util.library_helper import load_libraries
+    from kqcircuits.scq_layout.aslib import ASlib
+
+    load_libraries(path=Element.LIBRARY_PATH)
+    load_libraries(path=ASlib.LIBRARY_PATH)
+
+
+def _build_job(request):
+    from kqcircuits.scq_layout.util.build import build_cell, element_class, polygon_count
+    from kqcircuits.scq_layout.export_gds import export_chip_gds
+
+    start = time.perf_counter()
+    result = {"id": request.get("id"), "cell": request["cell"]}
+    try:
+        cls = element_class(request["cell"])
+        params = request.get("params", {})
+        if request.get("output"):
+            ports = export_chip_gds(request["output"], cls, **params)
+            result["output"] = request["output"]
+            result["misaligned_ports"] = len(ports["misaligned"])
+        else:
+            _, cell = build_cell(cls, **params)  # raises BuildError if the PCell failed
+            result["name"] = cell.name
+            result["polygons"] = polygon_count(cell)
+        result["ok"] = True
+    except Exception as e:  # pylint: disable=broad-except
+        result["ok"] = False
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["time"] = time.perf_counter() - start
+    return result
+
+
+class BuildServer:
+    """Long-lived build server keeping KQCircuits and the AS Library loaded in a pool of worker processes.
+
+    Clients send requests ``{"id": ..., "cell": "qubits.floating_qubit.FloatingQubit", "params": {...},
+    "output": "file.gds"}`` over a ``multiprocessing.connection`` socket (or named pipe on Windows), authenticated
+    with a random key the server writes to ``key_file``. Output files are written below ``output_dir``; other paths
+    are rejected. Results are streamed back in completion order, failed builds (including PCells that raised, which
+    KLayout leaves empty) with ``ok`` False. ``{"cmd": "close"}`` ends the stream and is answered with the
+    throughput statistics of that connection, ``{"cmd": "stats"}`` returns server totals and ``{"cmd": "shutdown"}``
+    stops the server. Only successful builds count towards ``built`` and ``cells_per_second``.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, workers=None, key_file=KEY_FILE, output_dir="."):
+        self.address = address
+        self.key_file = key_file
+        self.authkey = None
+        self.output_dir = Path(output_dir).resolve()
+        self.pool = Pool(workers or os.cpu_count(), initializer=_init_worker)
+        self.built = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._running = True
+
+    def stats(self, counts=None, started=None):
+        built, failed = (self.built, self.failed) if counts is None else (counts["built"], counts["failed"])
+        elapsed = time.perf_counter() - (self.started if started is None else started)
+        return {"built": built, "failed": failed, "elapsed": elapsed,
+                "cells_per_second": built / elapsed if elapsed > 0 else 0.0}
+
+    def serve_forever(self):
+        self.authkey = write_authkey(self.key_file)
+        with Listener(self.address, authkey=self.authkey) as listener:
+            self.address = listener.address
+            print(f"Build server listening on {listener.address}, key in {self.key_file}, output in {self.output_dir}")
+            self.ready.set()
+            while self._running:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, EOFError, OSError) as e:
+                    print(f"Refused connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        self.pool.close()
+        self.pool.join()
+
+    def _output_path(self, output):
+        """Absolute path of a requested ``output`` file, which must be below ``output_dir``."""
+        path = (self.output_dir / output).resolve()
+        if not path.is_relative_to(self.output_dir):
+            raise ValueError(f"Output path '{output}' is outside of the output directory")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return str(path)
+
+    def _handle(self, conn):
+        send_lock = threading.Lock()
+        pending = threading.Semaphore(0)
+        submitted = 0
+        counts = {"built": 0, "failed": 0}
+        started = time.perf_counter()
+
+        def send(result):
+            key = "built" if result["ok"] else "failed"
+            with self._lock:
+                counts[key] += 1
+                setattr(self, key, getattr(self, key) + 1)
+            with send_lock:
+                conn.send(result)
+            pending.release()
+
+        try:
+            while True:
+                request = conn.recv()
+                cmd = request.get("cmd")
+                if cmd == "stats":
+                    with send_lock:
+                        conn.send(self.stats())
+                elif cmd in ("close", "shutdown"):
+                    for _ in range(submitted):
+                        pending.acquire()
+                    with send_lock:
+                        conn.send({"cmd": "done", **self.stats(counts, started)})
+                    if cmd == "shutdown":
+                        self._running = False
+                        # wake up the blocking accept() so serve_forever() can exit
+                        Client(self.address, authkey=self.authkey).close()
+                    break
+                else:
+                    submitted += 1
+                    if request.get("output"):
+                        try:
+                            request = {**request, "output": self._output_path(request["output"])}
+                        except ValueError as e:
+                            send({"id": request.get("id"), "cell": request.get("cell"), "ok": False, "error": str(e)})
+                            continue
+                    self.pool.apply_async(
+                        _build_job,
+                        (request,),
+                        callback=send,
+                        error_callback=lambda e, r=request: send({"id": r.get("id"), "ok": False, "error": str(e)}),
+                    )
+        except EOFError:
+            pass
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm build server for the AS Library")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--port", type=int, default=None, help="TCP port on localhost (default: named pipe/6150)")
+    parser.add_argument("--key-file", default=KEY_FILE, help=f"authentication key written for clients ({KEY_FILE})")
+    parser.add_argument("--output-dir", default=".", help="directory output files are written to")
+    args = parser.parse_args()
+    BuildServer(("localhost", args.port) if args.port else DEFAULT_ADDRESS, workers=args.workers,
+                key_file=args.key_file, output_dir=args.output_dir).serve_forever()
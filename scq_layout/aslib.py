@@ -0,0 +1,38 @@
+import threading
+from contextlib import contextmanager
+
+from kqcircuits.elements.element import Element
+
+# Errors raised while producing cells, which KLayout only prints before leaving the cell empty. Only recorded
+# inside ``collect_produce_errors``, per thread.
+_produce_errors = threading.local()
+
+
+@contextmanager
+def collect_produce_errors():
+    """Collect the errors of AS Library cells produced in this thread inside the block into the yielded list."""
+    previous = getattr(_produce_errors, "errors", None)
+    _produce_errors.errors = errors = []
+    try:
+        yield errors
+    finally:
+        _produce_errors.errors = previous
+
+
+class ASlib(Element):
+    LIBRARY_NAME = "AS Library"
+    LIBRARY_DESCRIPTION = "Library from AS."
+    LIBRARY_PATH = "scq_layout"
+
+    # Geometric constraints checked before building (see util/constraints.py): name -> function of the Params ``p``
+    # (numpy arrays, vectorized over candidates) returning a margin in µm that must not be negative.
+    CONSTRAINTS = {}
+
+    def produce_impl(self):
+        try:
+            super().produce_impl()
+        except Exception as e:
+            errors = getattr(_produce_errors, "errors", None)
+            if errors is not None:
+                errors.append(f"{type(self).__name__}: {type(e).__name__}: {e}")
+            raise
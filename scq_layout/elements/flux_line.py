@@ -2,12 +2,18 @@ from kqcircuits.elements.element import Element
 from kqcircuits.util.parameters import Param, pdt
 from kqcircuits.scq_layout.aslib import ASlib
 from kqcircuits.pya_resolver import pya
+from kqcircuits.scq_layout.util.constraints import smallest
 
 class FluxLineT(ASlib):
     fluxline_throat = Param(pdt.TypeList, "Throat length/width of fluxline", [8.5, 5], unit="μm")
     fluxline_extend = Param(pdt.TypeDouble, "Length of fluxline along the qubit", 27.5, unit="μm")
     fluxline_taper = Param(pdt.TypeDouble, "Length of taper", 40, unit="μm")
 
+    CONSTRAINTS = {
+        "positive throat": lambda p: smallest(*p.fluxline_throat),
+        "non-negative lengths": lambda p: smallest(p.fluxline_extend, p.fluxline_taper),
+    }
+
     def build(self):
         left_arm_region = self._arm_region()
         right_arm_region = self._arm_region().transform(pya.DTrans.M0)
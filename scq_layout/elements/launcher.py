@@ -21,6 +21,7 @@ from kqcircuits.elements.element import Element
 from kqcircuits.scq_layout.aslib import ASlib
 from kqcircuits.pya_resolver import pya
 from kqcircuits.util.parameters import Param, pdt
+from kqcircuits.scq_layout.util.constraints import smallest
 
 
 class LauncherAS(ASlib):
@@ -31,6 +32,11 @@ class LauncherAS(ASlib):
     launcher_frame_gap = Param(pdt.TypeDouble, "Gap at chip frame", 85, unit="μm")
     visible = Param(pdt.TypeBoolean, "Whether the launcher is visible", True)
 
+    CONSTRAINTS = {
+        "positive pad and trace": lambda p: smallest(p.s, p.a_launcher, p.b_launcher),
+        "non-negative taper and frame gap": lambda p: smallest(p.l, p.launcher_frame_gap),
+    }
+
     def build(self):
         # optical layer
 
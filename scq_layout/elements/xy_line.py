@@ -2,6 +2,7 @@ from kqcircuits.elements.element import Element
 from kqcircuits.util.parameters import Param, pdt
 from kqcircuits.scq_layout.aslib import ASlib
 from kqcircuits.pya_resolver import pya
+from kqcircuits.scq_layout.util.constraints import smallest
 
 class XyLine(ASlib):
     xyline_throat = Param(pdt.TypeList, "Throat length/a/b of fluxline", [102, 4, 2.6], unit="μm")
@@ -9,6 +10,11 @@ class XyLine(ASlib):
     xyline_taper = Param(pdt.TypeDouble, "Length of taper", 50, unit="μm")
     xyline_cap = Param(pdt.TypeBoolean, "True for q3d simulation", False)
 
+    CONSTRAINTS = {
+        "positive throat": lambda p: smallest(*p.xyline_throat),
+        "non-negative gap and taper": lambda p: smallest(p.xyline_gap, p.xyline_taper),
+    }
+
     def build(self):
         left_arm_region = self._arm_region()
         right_arm_region = self._arm_region().transform(pya.Trans.M0)
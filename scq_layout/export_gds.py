@@ -1,16 +1,32 @@
+import warnings
+
 import pya
 from kqcircuits.util.load_save_layout import save_layout
 
-def export_chip_gds(filename, Chip):
+from kqcircuits.scq_layout.util.build import build_cell
+from kqcircuits.scq_layout.util.port_check import check_ports
+
+
+def export_chip_gds(filename, Chip, port_tolerance=None, **params):
+    """Export ``Chip`` as its metal layer (1/0) to ``filename`` and return its port alignment report.
+
+    Waveguide connections are verified with ``check_ports`` (position tolerance ``port_tolerance`` µm) before
+    export, and misaligned ones are warned about.
+    """
     # Create a new layout
     layout = pya.Layout()
     # layout.dbu = 0.001  # database unit in µm
 
     # Create the top cell
     top = layout.create_cell("TOP")
-    chip_cell = Chip.create(layout)
+    _, chip_cell = build_cell(Chip, layout, **params)  # raises BuildError if the chip failed to build
     top.insert(pya.CellInstArray(chip_cell.cell_index(), pya.Trans()))
 
+    ports = check_ports(chip_cell, tolerance=port_tolerance)
+    for port in ports["misaligned"]:
+        warnings.warn(f"{Chip.__name__}: {port['end']} is {port['offset']:.4f} µm and {port['angle']:.3f}° off "
+                      f"{port['terminal']}")
+
     # Define input layers
     layerA = layout.layer(130, 1)   # exclusion layer
     layerB = layout.layer(130, 3)   # metal layer
@@ -29,4 +45,4 @@ def export_chip_gds(filename, Chip):
 
     # Save GDS with only the target layer
     save_layout(filename, layout, layers=[(1, 0)])
-
+    return ports
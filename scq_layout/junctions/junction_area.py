@@ -0,0 +1,166 @@
+import numpy as np
+
+from kqcircuits.defaults import default_layers
+from kqcircuits.pya_resolver import pya
+from kqcircuits.scq_layout.junctions.squidAS import SquidAS
+from kqcircuits.scq_layout.junctions.squidC import SquidC
+
+E_CHARGE = 1.602176634e-19  # C
+H_PLANCK = 6.62607015e-34  # J s
+PHI0 = H_PLANCK / (2 * E_CHARGE)  # Wb
+
+_GEOMETRY_PARAMS = ("JJ_width", "JJ_length", "JJ_overshoot", "twist_length", "finger_width", "finger_sep", "flip")
+
+
+class JunctionModel:
+    """Ambegaokar–Baratoff junction model.
+
+    ``Ic = jc * A_eff``, ``Rn = pi * Delta / (2 e Ic)`` and ``Ej = Phi0 Ic / 2pi``, where ``A_eff`` is the drawn
+    overlap with every side grown by ``width_bias`` (negative for shrinkage in fabrication).
+
+    Args:
+        jc: critical current density (µA/µm²)
+        gap: superconducting gap Delta (eV), 180 µeV for aluminium
+        width_bias: growth of each junction side with respect to the drawn geometry (µm)
+    """
+
+    def __init__(self, jc=1.0, gap=180e-6, width_bias=0.0):
+        self.jc = jc
+        self.gap = gap
+        self.width_bias = width_bias
+
+    def critical_current(self, dx, dy):
+        """Critical current (A) of junctions with overlap sides ``dx``, ``dy`` (µm)."""
+        area = np.clip(dx + self.width_bias, 0, None) * np.clip(dy + self.width_bias, 0, None)
+        return self.jc * 1e-6 * area
+
+    def resistance(self, ic):
+        """Normal-state resistance (Ω), infinite for junctions without overlap."""
+        with np.errstate(divide="ignore"):
+            return np.pi * self.gap / (2 * ic)
+
+    @staticmethod
+    def josephson_energy(ic):
+        """Josephson energy Ej/h (GHz)."""
+        return PHI0 * ic / (2 * np.pi) / H_PLANCK * 1e-9
+
+
+def _param_arrays(cls, params):
+    schema = cls.get_schema()
+    values = {name: np.asarray(params.get(name, schema[name].default)) for name in _GEOMETRY_PARAMS if name in schema}
+    values = dict(zip(values, np.broadcast_arrays(*values.values())))
+    values["flip"] = values["flip"].astype(bool)
+    return {name: np.atleast_1d(value) for name, value in values.items()}
+
+
+def _to_dbu(value, dbu):
+    # like ``to_itype``: scale by 1/dbu and round half away from zero
+    value = value * (1 / dbu)
+    return np.trunc(value + np.copysign(0.5, value)).astype(np.int64)
+
+
+def _bar_box(x1, y1, x2, y2, width, dbu):
+    """Integer (left, bottom, right, top) of an axis-aligned ``_bar`` after ``to_itype``."""
+    # offset the end points by the path normal as KLayout does, which decides the rounding at half-dbu widths
+    dx, dy = x2 - x1, y2 - y1
+    inv_length = 1 / np.sqrt(dx * dx + dy * dy)
+    nx, ny = -(dy * inv_length) * (width / 2), (dx * inv_length) * (width / 2)
+    xs = [_to_dbu(v, dbu) for v in (x1 + nx, x1 - nx, x2 + nx, x2 - nx)]
+    ys = [_to_dbu(v, dbu) for v in (y1 + ny, y1 - ny, y2 + ny, y2 - ny)]
+    return np.min(xs, axis=0), np.min(ys, axis=0), np.max(xs, axis=0), np.max(ys, axis=0)
+
+
+def _squid_as_bars(p, dbu):
+    w, length, ov, flip = p["JJ_width"], p["JJ_length"], p["JJ_overshoot"], p["flip"]
+    bars = []
+    for x in (0, -p["finger_sep"]):
+        bar1 = (np.where(flip, x - ov - length, x + ov), np.where(flip, -length, 0),
+                np.where(flip, x, x - length), np.where(flip, -length, 0))
+        bar2 = (np.where(flip, x - length, x), np.where(flip, 0, ov),
+                np.where(flip, x - length, x), np.where(flip, -length - ov, -length))
+        bars.append((_bar_box(*bar1, w, dbu), _bar_box(*bar2, w, dbu)))
+    return bars
+
+
+def _squid_c_bars(p, dbu):
+    w, length, ov, flip = p["JJ_width"], p["JJ_length"], p["JJ_overshoot"], p["flip"]
+    factor_x, factor_y = np.where(flip, 1, 0), np.where(flip, 0, 1)
+    # same operation order as SquidC._cross, so that rounding to the database grid matches
+    twist, finger_width = p["twist_length"], p["finger_width"]
+    start = twist - finger_width / 2
+    end = twist + length - finger_width / 2 + ov
+    trangle = (twist + length - finger_width / 2) / 2
+    bars = []
+    for x, y in ((0, 0), (-p["finger_sep"] / 2**0.5, p["finger_sep"] / 2**0.5)):
+        bar1 = (x + start * factor_x - trangle, y + start * factor_y - trangle,
+                x + end * factor_x - trangle, y + end * factor_y - trangle)
+        bar2 = (x - start * factor_y + trangle, y - start * factor_x + trangle,
+                x - end * factor_y + trangle, y - end * factor_x + trangle)
+        bars.append((_bar_box(*bar1, w, dbu), _bar_box(*bar2, w, dbu)))
+    return bars
+
+
+_BARS = {SquidAS: _squid_as_bars, SquidC: _squid_c_bars}
+
+
+def _box_area(box):
+    left, bottom, right, top = box
+    return (right - left) * (top - bottom)
+
+
+def junction_overlaps(cls, params, dbu=0.001):
+    """Overlap sides of the two ``SIS_junction`` crosses of ``SquidAS`` or ``SquidC`` variants.
+
+    Args:
+        cls: ``SquidAS`` or ``SquidC``
+        params: dictionary of parameter names to scalars or equal-length arrays; missing ones take the defaults
+        dbu: database unit (µm) the geometry is snapped to
+
+    Returns:
+        tuple ``(dx, dy, bar_area)`` of ``(N, 2)`` arrays in µm and µm², where ``bar_area`` is the summed area of
+        the two bars of each cross
+    """
+    bars = _BARS[cls](_param_arrays(cls, params), dbu)
+    dx, dy, bar_area = [], [], []
+    for bar1, bar2 in bars:
+        dx.append(np.clip(np.minimum(bar1[2], bar2[2]) - np.maximum(bar1[0], bar2[0]), 0, None))
+        dy.append(np.clip(np.minimum(bar1[3], bar2[3]) - np.maximum(bar1[1], bar2[1]), 0, None))
+        bar_area.append(_box_area(bar1) + _box_area(bar2))
+    return (np.stack(dx, axis=-1) * dbu, np.stack(dy, axis=-1) * dbu, np.stack(bar_area, axis=-1) * dbu**2)
+
+
+def junction_table(cls, params, model=None, dbu=0.001):
+    """Junction areas and their target normal-state resistance and Josephson energy.
+
+    Returns:
+        dictionary of ``(N, 2)`` arrays ``area`` (µm²), ``ic`` (A), ``rn`` (Ω) and ``ej`` (GHz) for each junction,
+        and ``(N,)`` arrays ``squid_rn`` and ``squid_ej`` for the two junctions in parallel at zero flux
+    """
+    model = JunctionModel() if model is None else model
+    dx, dy, _ = junction_overlaps(cls, params, dbu)
+    ic = model.critical_current(dx, dy)
+    rn = model.resistance(ic)
+    ej = model.josephson_energy(ic)
+    with np.errstate(divide="ignore"):
+        squid_rn = 1 / np.sum(1 / rn, axis=-1)
+    return {"area": dx * dy, "ic": ic, "rn": rn, "ej": ej, "squid_rn": squid_rn, "squid_ej": np.sum(ej, axis=-1)}
+
+
+def validate(cls, samples, atol=1e-9):
+    """Compare the calculated junction geometry with cells built from ``samples`` (list of parameter dicts).
+
+    The built ``SIS_junction`` layer holds the merged crosses, so its area must equal the bar areas minus the
+    calculated overlaps. Returns the list of ``(params, expected, measured)`` mismatches.
+    """
+    mismatches = []
+    for params in samples:
+        layout = pya.Layout()
+        cell = cls.create(layout, **params)
+        dx, dy, bar_area = junction_overlaps(cls, {k: [v] for k, v in params.items()}, layout.dbu)
+        expected = float(np.sum(bar_area - dx * dy))
+        face = params.get("face_ids", cls.get_schema()["face_ids"].default)[0]
+        region = pya.Region(cell.begin_shapes_rec(layout.layer(default_layers[f"{face}_SIS_junction"])))
+        measured = region.area() * layout.dbu**2
+        if abs(expected - measured) > atol:
+            mismatches.append((params, expected, measured))
+    return mismatches
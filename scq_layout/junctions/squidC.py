@@ -2,6 +2,7 @@ from kqcircuits.elements.element import Element
 from kqcircuits.util.parameters import Param, pdt
 from kqcircuits.scq_layout.aslib import ASlib
 from kqcircuits.pya_resolver import pya
+from kqcircuits.scq_layout.util.constraints import smallest
 
 
 class SquidC(ASlib):
@@ -23,12 +24,23 @@ class SquidC(ASlib):
     down_arm_connect_pt = Param(pdt.TypeList, "Coordinate of down arm starting point (µm, µm)", [-50, 0])
     flip = Param(pdt.TypeBoolean, "Flip the SQUID axis", False)
 
+    CONSTRAINTS = {
+        "junction overlap": lambda p: smallest(p.JJ_width, p.JJ_overshoot),
+        "separate fingers": lambda p: p.finger_sep - p.finger_width,
+        "arm position within fingers": lambda p: smallest(p.arm_position, 1 - p.arm_position),
+        "fingers longer than their width": lambda p: smallest(p.up_finger_length, p.down_finger_length) - p.finger_width,
+        "non-negative twist length": lambda p: p.twist_length,
+    }
+
 
     def build(self):
         cross_region = self._cross(0, 0) + self._cross(-self.finger_sep / 2**0.5, self.finger_sep / 2**0.5)
         self.cell.shapes(self.get_layer("SIS_junction")).insert(cross_region)
         finger_region = self._up_finger() + self._down_finger()
         self.cell.shapes(self.get_layer("SIS_junction_2")).insert(finger_region)
+        # lumped port replacing the junctions in simulations, between the arm ends on the islands
+        self.refpoints["port_squid_a"] = pya.DPoint(float(self.up_arm_connect_pt[0]), float(self.up_arm_connect_pt[1]))
+        self.refpoints["port_squid_b"] = pya.DPoint(float(self.down_arm_connect_pt[0]), float(self.down_arm_connect_pt[1]))
 
     def _up_finger(self):
         if self.flip:
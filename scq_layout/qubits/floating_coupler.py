@@ -9,6 +9,7 @@ from kqcircuits.scq_layout.junctions.squidC import SquidC
 from kqcircuits.scq_layout.elements.flux_line import FluxLineT
 from kqcircuits.scq_layout.elements.xy_line import XyLine
 from kqcircuits.util.geometry_helper import force_rounded_corners
+from kqcircuits.scq_layout.util.constraints import smallest
 
 #@add_parameters_from(SquidAS)
 class FloatingCoupler(ASlib):
@@ -40,26 +41,43 @@ class FloatingCoupler(ASlib):
     simulation_mode = Param(pdt.TypeInt, "0: none, 1: qubit w/o bus, 2: qubit w/ bus, 3: resonator w/o DL, 4: resonator w/ DL", 0)
     visible = Param(pdt.TypeBoolean, "Whether the qubit is visible", True)
 
+    CONSTRAINTS = {
+        "arm narrower than island": lambda p: p.island1_extent[0] - p.island1_arm[0],
+        "positive island separation": lambda p: p.island_sep,
+        "island1 rounding radius": lambda p: smallest(p.island1_extent[1], p.island1_arm[0]) / 2 - p.island1_r,
+        "align rounding radius below 100 µm": lambda p: 100 - p.align_r,
+        "SQUID inside ground gap": lambda p: p.ground_gap_padding - p.squid_sep,
+        "SQUID arm 1 on island1": lambda p: smallest(
+            p.squid_arm_position1[0], p.island1_extent[0] - p.squid_arm_position1[0],
+            p.squid_arm_position1[1], p.island1_extent[1] - p.squid_arm_position1[1]),
+        "SQUID arm 2 on island2": lambda p: smallest(
+            p.squid_arm_position2[0], p.island1_extent[0] - p.squid_arm_position2[0],
+            p.squid_arm_position2[1], p.island1_extent[1] - p.squid_arm_position2[1]),
+    }
+
     def build(self):
         # First island
         island1_region, qubit1_coord = self._build_island1()
 
         # Second island
-        island2_region, qubit2_coord = self._build_island2()
+        island2_region, qubit2_coord = self._build_island2(island1_region, qubit1_coord)
 
         # Qubit base
         ground_gap_region = self.gap_region(island1_region + island2_region)
 
-        # Rounding between qubit and coupler
-        rounding_region = ground_gap_region + self._build_qubit1(1000) + self._build_qubit2(1000)
+        # Rounding between qubit and coupler, cut from the arms reaching 1000 µm towards the qubits
+        qubit1_base = self._build_qubit1(1000, qubit1_coord)
+        qubit2_base = self._build_qubit2(qubit1_base)
+        rounding_region = ground_gap_region + qubit1_base + qubit2_base
         rounding_region = force_rounded_corners(rounding_region, self.align_r / self.layout.dbu, self.align_r / self.layout.dbu, self.n)
         rounding_region = rounding_region & (
-            self._build_qubit1(1000).transform(pya.DTrans((self.align_r + 50) / self.layout.dbu, (self.align_r + 50) / self.layout.dbu))
-            + self._build_qubit2(1000).transform(pya.DTrans(-(self.align_r + 50) / self.layout.dbu, -(self.align_r + 50) / self.layout.dbu)))
-        rounding_region = rounding_region# - self._build_qubit1(1500) - self._build_qubit2(1500)
+            qubit1_base.transformed(pya.DTrans((self.align_r + 50) / self.layout.dbu, (self.align_r + 50) / self.layout.dbu))
+            + qubit2_base.transformed(pya.DTrans(-(self.align_r + 50) / self.layout.dbu, -(self.align_r + 50) / self.layout.dbu)))
 
-        # Combine component together
-        region = ground_gap_region + rounding_region - island1_region - island2_region - self._build_qubit1(1500) - self._build_qubit2(1500)
+        # Combine component together, removing the longer 1500 µm arms (XOR-identical to the original construction)
+        qubit1_region = self._build_qubit1(1500, qubit1_coord)
+        qubit2_region = self._build_qubit2(qubit1_region)
+        region = ground_gap_region + rounding_region - island1_region - island2_region - qubit1_region - qubit2_region
         
         # Add refpoints
         self.refpoints["qubit1"] = qubit1_coord
@@ -79,7 +97,7 @@ class FloatingCoupler(ASlib):
     
     def gap_region(self, region):
         ground_gap_region = region
-        ground_gap_region.size(self.ground_gap_padding * 1e3)
+        ground_gap_region.size(self.ground_gap_padding / self.layout.dbu)
 
         polygon = pya.DPolygon(
             [
@@ -125,15 +143,15 @@ class FloatingCoupler(ASlib):
 
         return island1_region, nodes[4]
     
-    def _build_island2(self):
-        if self.symmetric:
-            return self._build_island1()[0].transform(pya.DTrans.M0 * pya.DTrans.R90), pya.DTrans.M0 * pya.DTrans.R90 * self._build_island1()[1]
-        else:
-            return self._build_island1()[0].transform(pya.DTrans.R180), pya.DTrans.R180 * self._build_island1()[1]
+    def _island2_trans(self):
+        return pya.DTrans.M0 * pya.DTrans.R90 if self.symmetric else pya.DTrans.R180
+
+    def _build_island2(self, island1_region, qubit1_coord):
+        # the second island is the first one mirrored or rotated
+        return island1_region.transformed(self._island2_trans()), self._island2_trans() * qubit1_coord
 
         
-    def _build_qubit1(self, size):
-        coord = self._build_island1()[1]
+    def _build_qubit1(self, size, coord):
         polygon = pya.DPolygon(
             [
                 pya.DPoint(coord.x, coord.y),
@@ -149,11 +167,8 @@ class FloatingCoupler(ASlib):
 
         
 
-    def _build_qubit2(self, size):
-        if self.symmetric:
-            return self._build_qubit1(size).transform(pya.DTrans.M0 * pya.DTrans.R90)
-        else:
-            return self._build_qubit1(size).transform(pya.DTrans.R180)
+    def _build_qubit2(self, qubit1_region):
+        return qubit1_region.transformed(self._island2_trans())
 
     
     def _add_squid(self):
@@ -9,6 +9,7 @@ from kqcircuits.scq_layout.junctions.squidC import SquidC
 from kqcircuits.scq_layout.elements.flux_line import FluxLineT
 from kqcircuits.scq_layout.elements.xy_line import XyLine
 from kqcircuits.util.geometry_helper import force_rounded_corners
+from kqcircuits.scq_layout.util.constraints import smallest
 
 #@add_parameters_from(SquidAS)
 class FloatingCouplerV2(ASlib):
@@ -42,6 +43,22 @@ class FloatingCouplerV2(ASlib):
     simulation_mode = Param(pdt.TypeInt, "0: none, 1: qubit w/o bus, 2: qubit w/ bus, 3: resonator w/o DL, 4: resonator w/ DL", 0)
     visible = Param(pdt.TypeBoolean, "Whether the qubit is visible", True)
 
+    CONSTRAINTS = {
+        "arm narrower than island": lambda p: p.island1_extent[0] - p.island1_arm[0],
+        "positive island separation": lambda p: p.island_sep,
+        # the narrow island end is rounded to a half circle (round_corners limits the radius), but not beyond
+        "island1 rounding radius": lambda p: p.island1_extent[1] - p.island1_r,
+        "padding reduction shorter than island": lambda p: smallest(*p.island1_length) - p.padding_reduction,
+        "non-negative qubit separation": lambda p: smallest(p.sep_m, p.sep_g),
+        "SQUID inside ground gap": lambda p: p.ground_gap_padding - p.squid_sep,
+        "SQUID arm 1 on island1": lambda p: smallest(
+            p.squid_arm_position1[0], p.island1_extent[0] - p.squid_arm_position1[0],
+            p.squid_arm_position1[1], p.island1_extent[1] - p.squid_arm_position1[1]),
+        "SQUID arm 2 on island2": lambda p: smallest(
+            p.squid_arm_position2[0], p.island1_extent[0] - p.squid_arm_position2[0],
+            p.squid_arm_position2[1], p.island1_extent[1] - p.squid_arm_position2[1]),
+    }
+
     def build(self):
         # First island
         island1_region, qubit1_coord = self._build_island1(0)
@@ -8,6 +8,7 @@ from kqcircuits.util.refpoints import WaveguideToSimPort, JunctionSimPort
 from kqcircuits.scq_layout.junctions.squidAS import SquidAS
 from kqcircuits.scq_layout.elements.flux_line import FluxLineT
 from kqcircuits.scq_layout.elements.xy_line import XyLine
+from kqcircuits.scq_layout.util.constraints import smallest
 
 #@add_parameters_from(SquidAS)
 class FloatingQubit(ASlib):
@@ -38,6 +39,26 @@ class FloatingQubit(ASlib):
 
     simulation_mode = Param(pdt.TypeInt, "0: none, 1: qubit w/o bus, 2: qubit w/ bus, 3: resonator w/o DL, 4: resonator w/ DL", 0)
     visible = Param(pdt.TypeBoolean, "Whether the qubit is visible", True)
+
+    CONSTRAINTS = {
+        "island1 narrower than ground gap": lambda p: p.ground_gap[0] - p.island1_extent[0],
+        "islands fit in ground gap": lambda p: p.ground_gap[1] / 2 - p.island_sep / 2 - p.island1_extent[1],
+        "positive island separation": lambda p: p.island_sep,
+        "side hole shallower than island": lambda p: p.island1_extent[0] - p.island1_side_hole[0],
+        "side hole lower than island": lambda p: p.island1_extent[1] - p.island1_side_hole[1],
+        "coupler fits in side hole": lambda p: p.island1_side_hole[1] - p.a,
+        "ground gap rounding radius": lambda p: smallest(*p.ground_gap) / 2 - p.ground_gap_r,
+        "island1 rounding radius": lambda p: smallest(*p.island1_extent) / 2 - p.island1_r,
+        "SQUID between islands and ground": lambda p: p.ground_gap[0] / 2 - p.squid_sep - p.island1_extent[0] / 2,
+        "SQUID arm 1 on island1": lambda p: smallest(
+            p.squid_arm_position1[0], p.island1_extent[0] - p.squid_arm_position1[0],
+            p.squid_arm_position1[1], p.island1_extent[1] - p.squid_arm_position1[1]),
+        # island2 is island1 mirrored, but _add_squid places the arm with island2_extent
+        "SQUID arm 2 on island2": lambda p: smallest(
+            (p.island2_extent[0] + p.island1_extent[0]) / 2 - p.squid_arm_position2[0],
+            p.squid_arm_position2[0] - (p.island2_extent[0] - p.island1_extent[0]) / 2,
+            p.squid_arm_position2[1], p.island1_extent[1] - p.squid_arm_position2[1]),
+    }
     
 
     def build(self):
@@ -0,0 +1,75 @@
+import hashlib
+import importlib
+import json
+
+from kqcircuits.pya_resolver import pya
+
+PACKAGE = "kqcircuits.scq_layout"
+
+
+class BuildError(Exception):
+    """A cell failed to build. KLayout does not propagate errors raised by a PCell, it leaves the cell empty."""
+
+
+def element_class(name):
+    """Resolve an element class from a dotted path.
+
+    Both full paths (``kqcircuits.scq_layout.qubits.floating_qubit.FloatingQubit``) and paths relative to this
+    repository (``qubits.floating_qubit.FloatingQubit``) are accepted.
+    """
+    if not isinstance(name, str):
+        return name
+    module_name, _, class_name = name.rpartition(".")
+    if not module_name.startswith("kqcircuits."):
+        module_name = f"{PACKAGE}.{module_name}"
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def class_path(cls):
+    return f"{cls.__module__}.{cls.__name__}"
+
+
+def params_hash(cls, params):
+    """Stable hash of an element class and its (non-default) parameters."""
+    text = json.dumps([class_path(cls), params], sort_keys=True, default=str)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def build_cell(cls, layout=None, **params):
+    """Build ``cls`` with ``params`` into ``layout`` (a new one if not given) and return the layout and cell.
+
+    Raises:
+        BuildError: if an AS Library PCell raised while producing the cell (or one of its children), or if the cell is
+            unnamed or has no shapes at all (a failed KQCircuits PCell)
+    """
+    from kqcircuits.scq_layout.aslib import collect_produce_errors  # pylint: disable=import-outside-toplevel
+
+    if layout is None:
+        layout = pya.Layout()
+    with collect_produce_errors() as errors:
+        cell = element_class(cls).create(layout, **params)
+    if errors:
+        raise BuildError(errors[0])
+    if not cell.name or all(cell.begin_shapes_rec(li).at_end() for li in layout.layer_indexes()):
+        raise BuildError(f"{class_path(element_class(cls))} produced an empty cell")
+    return layout, cell
+
+
+def polygon_count(cell, layer=None):
+    layout = cell.layout()
+    layers = layout.layer_indexes() if layer is None else [layer]
+    return sum(pya.Region(cell.begin_shapes_rec(li)).count() for li in layers)
+
+
+def vertex_count(cell, layer=None):
+    layout = cell.layout()
+    layers = layout.layer_indexes() if layer is None else [layer]
+    count = 0
+    for li in layers:
+        it = cell.begin_shapes_rec(li)
+        while not it.at_end():
+            shape = it.shape()
+            if shape.is_polygon() or shape.is_box() or shape.is_path():
+                count += shape.polygon.num_points()
+            it.next()
+    return count
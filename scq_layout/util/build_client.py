@@ -0,0 +1,34 @@
+import sys
+from multiprocessing.connection import Client
+from pathlib import Path
+
+DEFAULT_ADDRESS = r"\\.\pipe\scq_layout_build" if sys.platform == "win32" else ("localhost", 6150)
+# The authentication key of a server is generated when it starts and only readable by its user. Connections
+# unpickle every message, so anybody knowing the key can run code in the server.
+KEY_FILE = Path.home() / ".scq_layout" / "build_server.key"
+
+
+def read_authkey(key_file=KEY_FILE):
+    return Path(key_file).read_bytes()
+
+
+def submit(requests, address=DEFAULT_ADDRESS, key_file=KEY_FILE):
+    """Send build requests to a running server and yield the results as they arrive.
+
+    The last yielded item is the ``{"cmd": "done", ...}`` summary with the throughput in cells per second.
+    """
+    with Client(address, authkey=read_authkey(key_file)) as conn:
+        for i, request in enumerate(requests):
+            conn.send({"id": i, **request})
+        conn.send({"cmd": "close"})
+        while True:
+            result = conn.recv()
+            yield result
+            if result.get("cmd") == "done":
+                break
+
+
+def shutdown(address=DEFAULT_ADDRESS, key_file=KEY_FILE):
+    with Client(address, authkey=read_authkey(key_file)) as conn:
+        conn.send({"cmd": "shutdown"})
+        return conn.recv()
@@ -0,0 +1,70 @@
+import hashlib
+
+
+def _own_shapes(cell, layers, box=None):
+    """Sorted text of the cell's own shapes, optionally only those touching ``box``."""
+    layout = cell.layout()
+    items = []
+    for li in layers:
+        shapes = cell.shapes(li)
+        it = shapes.each() if box is None else shapes.each_touching(box)
+        items.extend(f"{layout.get_info(li)}:{shape}" for shape in it)
+    return sorted(items)
+
+
+def instance_key(inst, child_hash):
+    """Key of a placement of a cell with content hash ``child_hash``: hash, transformation and array vectors."""
+    key = f"{child_hash}@{inst.cplx_trans}"
+    if inst.is_regular_array():
+        key += f"[{inst.a}x{inst.na},{inst.b}x{inst.nb}]"
+    return key
+
+
+def cell_hashes(layout, layers=None):
+    """Geometry content hash of every cell, computed bottom-up through the hierarchy.
+
+    A cell's hash covers its own shapes and the hashes and transformations of its child instances, so two cells have
+    the same hash exactly when their flattened geometry (on ``layers``, default all) is built the same way.
+
+    Returns:
+        dictionary of cell index to hex digest
+    """
+    layers = sorted(layout.layer_indexes() if layers is None else layers, key=lambda li: str(layout.get_info(li)))
+    hashes = {}
+    for ci in layout.each_cell_bottom_up():
+        cell = layout.cell(ci)
+        h = hashlib.sha1()
+        for item in _own_shapes(cell, layers):
+            h.update(item.encode())
+        for item in sorted(instance_key(inst, hashes[inst.cell_index]) for inst in cell.each_inst()):
+            h.update(item.encode())
+        hashes[ci] = h.hexdigest()
+    return hashes
+
+
+def box_hash(cell, box, hashes, layers=None):
+    """Content hash of the geometry of ``cell`` touching ``box`` (integer ``Box`` in the cell's coordinates).
+
+    Instances completely inside ``box`` contribute their cell hash from ``hashes`` (see :func:`cell_hashes`), the
+    ones crossing its border are descended into, so the result only changes when geometry near ``box`` changes.
+    """
+    layout = cell.layout()
+    layers = sorted(layout.layer_indexes() if layers is None else layers, key=lambda li: str(layout.get_info(li)))
+    h = hashlib.sha1()
+    _update_box_hash(h, cell, box, hashes, layers)
+    return h.hexdigest()
+
+
+def _update_box_hash(h, cell, box, hashes, layers):
+    for item in _own_shapes(cell, layers, box):
+        h.update(item.encode())
+    items = []
+    for inst in cell.each_touching_inst(box):
+        if inst.bbox().inside(box) or inst.is_regular_array():
+            items.append(instance_key(inst, hashes[inst.cell_index]))
+        else:
+            sub = hashlib.sha1()
+            _update_box_hash(sub, inst.cell, box.transformed(inst.cplx_trans.inverted()), hashes, layers)
+            items.append(instance_key(inst, sub.hexdigest()))
+    for item in sorted(items):
+        h.update(item.encode())
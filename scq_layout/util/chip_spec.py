@@ -0,0 +1,230 @@
+import ast
+import json
+import math
+import operator
+from pathlib import Path
+
+from kqcircuits.defaults import default_layers
+from kqcircuits.elements.element import get_refpoints
+from kqcircuits.elements.waveguide_composite import WaveguideComposite, Node
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.aslib import ASlib
+from kqcircuits.scq_layout.util.build import element_class, params_hash
+from kqcircuits.scq_layout.util.parallel_build import build_cells
+
+AREA_LAYER = (130, 3)  # chip metal area, as in ``TestChip`` and ``export_chip_gds``
+
+_OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+              ast.Pow: operator.pow, ast.USub: operator.neg, ast.UAdd: operator.pos}
+_FUNCTIONS = {"int": int, "round": round, "sqrt": math.sqrt}  # ``int`` truncates like ``pya.Trans``
+_CONSTANTS = {"pi": math.pi}
+
+
+def evaluate(expression, variables=None, refpoints=None):
+    """Value of an arithmetic ``expression`` of numbers, ``variables``, ``pi``, refpoint coordinates
+    (``"Q0_port_coupler.x"``) and the functions ``int``, ``round`` and ``sqrt``."""
+    variables, refpoints = variables or {}, refpoints or {}
+
+    def visit(node):
+        if isinstance(node, ast.Expression):
+            return visit(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            return _OPERATORS[type(node.op)](visit(node.left), visit(node.right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _OPERATORS:
+            return _OPERATORS[type(node.op)](visit(node.operand))
+        if isinstance(node, ast.Name) and (node.id in variables or node.id in _CONSTANTS):
+            return variables[node.id] if node.id in variables else _CONSTANTS[node.id]
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.attr in ("x", "y") \
+                and node.value.id in refpoints:
+            return getattr(refpoints[node.value.id], node.attr)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS \
+                and not node.keywords:
+            return _FUNCTIONS[node.func.id](*map(visit, node.args))
+        raise ValueError(f"Invalid expression '{expression}'")
+
+    try:
+        return visit(ast.parse(expression.strip(), mode="eval"))
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression '{expression}'") from e
+
+
+def load_spec(path):
+    """Read a chip spec from a JSON or (if PyYAML is installed) YAML file."""
+    text = Path(path).read_text()
+    if Path(path).suffix in (".yaml", ".yml"):
+        import yaml  # pylint: disable=import-outside-toplevel
+
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+class ComponentCache:
+    """Compiled components of one layout, keyed by the hash of their class and resolved parameters.
+
+    Stores the cell index and the untransformed refpoints, so a component used again, in the same chip or in the
+    next compilation of a changed spec, costs neither a PCell evaluation nor a refpoint scan.
+    """
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.hits = 0
+        self.misses = 0
+        self.prebuilt = 0
+        self._cells = {}
+
+    def get(self, cls, params, key_params=None):
+        key = params_hash(cls, params if key_params is None else key_params)
+        if key in self._cells:
+            self.hits += 1
+        else:
+            self.misses += 1
+            cell = cls.create(self.layout, **params)
+            refpoints = get_refpoints(self.layout.layer(default_layers["refpoints"]), cell, rec_levels=0)
+            self._cells[key] = (cell.cell_index(), dict(refpoints.items()))
+        cell_index, refpoints = self._cells[key]
+        return self.layout.cell(cell_index), refpoints
+
+    def prebuild(self, requests, workers=None):
+        """Build the AS Library cells of ``requests`` (``(cls, params)``) not cached yet in parallel processes.
+
+        The cells are merged into the layout as static cells (see ``build_cells``), so later ``get`` calls for them
+        are hits. KQCircuits elements are left to ``get``, as other tools rely on their PCell declarations.
+        """
+        missing = {}
+        for cls, params in requests:
+            key = params_hash(cls, params)
+            if issubclass(cls, ASlib) and key not in self._cells:
+                missing[key] = (cls, params)
+        if not missing:
+            return None
+        cells, report = build_cells(self.layout, list(missing.values()), workers)
+        for key, cell in cells.items():
+            refpoints = get_refpoints(self.layout.layer(default_layers["refpoints"]), cell, rec_levels=0)
+            self._cells[key] = (cell.cell_index(), dict(refpoints.items()))
+        self.prebuilt += len(cells)
+        return report
+
+
+class ChipCompiler:
+    """Compiles declarative chip specs into static chip cells built from AS Library and KQCircuits elements.
+
+    A spec is a dictionary (see ``chips/test_chip.json``)::
+
+        {
+            "name": "Test Chip",
+            "frame": [-4950, -4950, 4950, 4950],
+            "variables": {"readout_y": 35, "readout_length": "6000 - 250 - 120 - pi * 200 / 2"},
+            "components": {
+                "Q0": {"cell": "qubits.floating_qubit.FloatingQubit", "params": {...}, "position": [0, 2500],
+                       "rotation": 90, "mirror": false},
+                ...
+            },
+            "connections": [
+                {"nodes": ["L4_base", ["L4_base.x", "L4_base.y - 150"], "Q0_port_fluxline"], "params": {"r": 100}},
+                {"cell": "kqcircuits.elements.meander.Meander",
+                 "params": {"start_point": ..., "end_point": ..., "length": "=readout_length"}},
+                ...
+            ]
+        }
+
+    ``frame`` is the chip metal area. Components are placed with their refpoints prefixed by the component name.
+    Connections are ``WaveguideComposite`` cells through ``nodes``, or any other ``cell`` whose ``*_point``
+    parameters are points. A point is a refpoint name or ``[x, y]``, where each coordinate is a number or an
+    expression (see ``evaluate``) of the spec ``variables`` and refpoint coordinates, e.g. ``"L4_base.y - 150"``.
+    ``variables`` are numbers or expressions of the variables before them, so values derived from others (a
+    resonator length less the lead-in waveguide) are computed rather than copied. Parameter values written as
+    ``"=<expression>"`` are evaluated the same way.
+
+    All compilations share a :class:`ComponentCache`, so recompiling a changed spec only builds the changed
+    components and connections. With ``workers``, the distinct AS Library components of a spec are first built in
+    that many processes and merged into the layout, before the components are placed and the connections routed.
+    """
+
+    def __init__(self, layout=None, workers=None):
+        self.layout = pya.Layout() if layout is None else layout
+        self.cache = ComponentCache(self.layout)
+        self.workers = workers
+        self.prebuild_report = None
+        self._compiled = {}
+
+    def compile(self, spec):
+        """Build ``spec`` (dictionary or path) and return the chip cell, replacing a previous cell of the same name."""
+        if not isinstance(spec, dict):
+            spec = load_spec(spec)
+        name = spec.get("name", "Chip")
+        key = json.dumps(spec, sort_keys=True)
+        chip = self.layout.cell(name)
+        if chip is not None and self._compiled.get(name) == key:
+            return chip
+        if chip is not None:
+            chip.clear()  # only the chip cell itself, the cached components are kept
+        else:
+            chip = self.layout.create_cell(name)
+        self._compiled[name] = key
+        refpoint_layer = self.layout.layer(default_layers["refpoints"])
+        if "frame" in spec:
+            chip.shapes(self.layout.layer(*AREA_LAYER)).insert(pya.DBox(*spec["frame"]))
+
+        variables = {}
+        for var_name, value in spec.get("variables", {}).items():
+            variables[var_name] = evaluate(value, variables) if isinstance(value, str) else value
+
+        if self.workers:
+            self.prebuild_report = self.cache.prebuild([(element_class(c["cell"]),
+                                                         self._params(c.get("params", {}), variables, {}))
+                                                        for c in spec.get("components", {}).values()], self.workers)
+
+        refpoints = {}
+        for inst_name, component in spec.get("components", {}).items():
+            cls = element_class(component["cell"])
+            cell, cell_refpoints = self.cache.get(cls, self._params(component.get("params", {}), variables, refpoints))
+            position = self._point(component.get("position", (0, 0)), variables, refpoints)
+            trans = pya.DCplxTrans(1, component.get("rotation", 0), component.get("mirror", False), position.x,
+                                   position.y)
+            inst = chip.insert(pya.DCellInstArray(cell.cell_index(), trans))
+            inst.set_property("id", inst_name)
+            for ref_name, point in cell_refpoints.items():
+                refpoints[f"{inst_name}_{ref_name}"] = trans * point
+
+        for connection in spec.get("connections", []):
+            params = self._params(connection.get("params", {}), variables, refpoints)
+            if "nodes" in connection:
+                cls = WaveguideComposite
+                points = [self._point(p, variables, refpoints) for p in connection["nodes"]]
+                key_params = {**params, "nodes": [[p.x, p.y] for p in points]}
+                params["nodes"] = [Node(p) for p in points]
+            else:
+                cls = element_class(connection["cell"])
+                for key, value in params.items():
+                    if key.endswith("_point"):
+                        params[key] = self._point(value, variables, refpoints)
+                key_params = {k: [v.x, v.y] if isinstance(v, pya.DPoint) else v for k, v in params.items()}
+            cell, _ = self.cache.get(cls, params, key_params)
+            chip.insert(pya.DCellInstArray(cell.cell_index(), pya.DTrans()))
+
+        for ref_name, point in refpoints.items():
+            chip.shapes(refpoint_layer).insert(pya.DText(ref_name, pya.DTrans(point.x, point.y)))
+        return chip
+
+    def compile_many(self, specs):
+        """Compile several specs (e.g. variants of one chip with different names) into this layout."""
+        return [self.compile(spec) for spec in specs]
+
+    @staticmethod
+    def _point(value, variables, refpoints):
+        if isinstance(value, str):
+            return refpoints[value]
+        return pya.DPoint(*(ChipCompiler._value(v, variables, refpoints) for v in value))
+
+    @staticmethod
+    def _value(value, variables, refpoints):
+        return float(evaluate(value, variables, refpoints)) if isinstance(value, str) else float(value)
+
+    @staticmethod
+    def _params(params, variables, refpoints):
+        """Parameters with ``"=<expression>"`` strings evaluated."""
+        return {key: evaluate(value[1:], variables, refpoints) if isinstance(value, str) and value.startswith("=")
+                else value for key, value in params.items()}
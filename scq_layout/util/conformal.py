@@ -0,0 +1,54 @@
+import numpy as np
+
+EPS0 = 8.8541878128e-12  # F/m
+
+
+def ellipk(k):
+    """Complete elliptic integral of the first kind K(k) (modulus ``k``) by the arithmetic-geometric mean."""
+    a, b = np.ones_like(np.asarray(k, dtype=float)), np.sqrt(1 - np.asarray(k, dtype=float) ** 2)
+    for _ in range(12):
+        a, b = (a + b) / 2, np.sqrt(a * b)
+    return np.pi / (2 * a)
+
+
+def k_ratio(k):
+    """K(k') / K(k) with ``k' = sqrt(1 - k^2)``."""
+    return ellipk(np.sqrt(1 - np.asarray(k, dtype=float) ** 2)) / ellipk(k)
+
+
+def effective_permittivity(eps_r):
+    """Effective permittivity of coplanar structures on a thick substrate."""
+    return (eps_r + 1) / 2
+
+
+def coplanar_strips_capacitance(gap, width, eps_r):
+    """Capacitance per unit length (F/m) between two coplanar strips of ``width`` separated by ``gap`` (same units)."""
+    k = np.asarray(gap, dtype=float) / (gap + 2 * np.asarray(width, dtype=float))
+    return EPS0 * effective_permittivity(eps_r) * k_ratio(k)
+
+
+def disk_capacitance(area, eps_r):
+    """Self-capacitance (F) of a thin disk of ``area`` (m²) on a substrate, ``8 eps r``."""
+    return 8 * EPS0 * effective_permittivity(eps_r) * np.sqrt(np.asarray(area, dtype=float) / np.pi)
+
+
+def cpw_capacitance(a, b, eps_r):
+    """Capacitance per unit length (F/m) of a coplanar waveguide with center width ``a`` and gap ``b``."""
+    k = np.asarray(a, dtype=float) / (a + 2 * np.asarray(b, dtype=float))
+    return 4 * EPS0 * effective_permittivity(eps_r) / k_ratio(k)
+
+
+def cpw_effective_permittivity(a, b, eps_r, h=None):
+    """Effective permittivity of a coplanar waveguide with center width ``a`` and gap ``b`` on a substrate of
+    thickness ``h`` (same units), or on a thick substrate if ``h`` is None."""
+    if h is None:
+        return effective_permittivity(eps_r) * np.ones_like(np.asarray(a, dtype=float))
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    k1 = np.sinh(np.pi * a / (4 * h)) / np.sinh(np.pi * (a + 2 * b) / (4 * h))
+    return 1 + (eps_r - 1) / 2 * k_ratio(a / (a + 2 * b)) / k_ratio(k1)
+
+
+def cpw_impedance(a, b, eps_r, h=None):
+    """Characteristic impedance (Ω) of a coplanar waveguide, see :func:`cpw_effective_permittivity`."""
+    k = np.asarray(a, dtype=float) / (a + 2 * np.asarray(b, dtype=float))
+    return 30 * np.pi / np.sqrt(cpw_effective_permittivity(a, b, eps_r, h)) * k_ratio(k)
@@ -0,0 +1,56 @@
+import numpy as np
+
+_SCHEMAS = {}
+
+
+def smallest(*margins):
+    """Elementwise minimum of several margins, for constraints made of multiple conditions."""
+    return np.minimum.reduce(np.broadcast_arrays(*margins))
+
+
+class ParamArrays:
+    """Parameters of one or many candidates as numpy arrays, with the defaults of ``cls`` for missing ones.
+
+    Scalar Params are given as scalars or ``(N,)`` arrays, list Params as lists or ``(N, k)`` arrays. List Params are
+    returned transposed to ``(k, N)``, so ``p.ground_gap[0]`` is the widths of all candidates.
+    """
+
+    def __init__(self, cls, params):
+        if cls not in _SCHEMAS:
+            _SCHEMAS[cls] = cls.get_schema()
+        self._schema = _SCHEMAS[cls]
+        self._params = params
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        value = np.asarray(self._params.get(name, self._schema[name].default), dtype=float)
+        value = value.T if value.ndim == 2 else value
+        self.__dict__[name] = value  # convert only once
+        return value
+
+
+def margins(cls, params):
+    """Margins (µm) of the ``CONSTRAINTS`` of ``cls``, negative where a constraint is violated."""
+    p = ParamArrays(cls, params)
+    return {name: constraint(p) for name, constraint in getattr(cls, "CONSTRAINTS", {}).items()}
+
+
+def feasible(cls, params, tol=0.0):
+    """Boolean (array) telling which candidates satisfy all constraints of ``cls``."""
+    result = np.array(True)
+    for margin in margins(cls, params).values():
+        result = result & (margin >= -tol)
+    return result
+
+
+def violations(cls, params, tol=0.0):
+    """Names of the constraints violated by any of the candidates."""
+    return [name for name, margin in margins(cls, params).items() if np.any(margin < -tol)]
+
+
+def validate(cls, params, tol=0.0):
+    """Raise ``ValueError`` if ``params`` of ``cls`` violate any constraint."""
+    violated = violations(cls, params, tol)
+    if violated:
+        raise ValueError(f"{cls.__name__} parameters violate constraints: {', '.join(violated)}")
@@ -0,0 +1,130 @@
+from kqcircuits.defaults import default_layers
+from kqcircuits.elements.element import get_refpoints
+from kqcircuits.pya_resolver import pya
+
+AREA_LAYER = (130, 3)  # chip metal area, as in ``export_chip_gds``
+GAP_LAYER = (130, 1)  # etched gap
+PORT_CORNER = 10.0  # µm from a cut port to its ``_corner`` refpoint, pointing out of the crop
+
+
+def crop_box(cell, region, margin=0.0):
+    """Box (µm) of ``region`` in ``cell`` enlarged by ``margin``.
+
+    ``region`` is a ``pya.DBox``, ``[left, bottom, right, top]``, a refpoint name of ``cell`` (e.g. ``"Q0_base"``) or
+    the name of an instance of ``cell`` (e.g. ``"Q0"``), whose bounding box is taken.
+    """
+    return _crop_boxes(cell, [region], margin)[0]
+
+
+def _crop_boxes(cell, regions, margin):
+    refpoints, instances = None, None
+    boxes = []
+    for region in regions:
+        if isinstance(region, str):
+            if refpoints is None:
+                refpoints = get_refpoints(cell.layout().layer(default_layers["refpoints"]), cell, rec_levels=0)
+                instances = {inst.property("id"): inst.dbbox() for inst in cell.each_inst()}
+            if region in refpoints:
+                box = pya.DBox(refpoints[region], refpoints[region])
+            elif region in instances:
+                box = instances[region]
+            else:
+                raise ValueError(f"'{region}' is neither a refpoint nor an instance of {cell.name}")
+        elif isinstance(region, pya.DBox):
+            box = region
+        else:
+            box = pya.DBox(*region)
+        boxes.append(box.enlarged(margin, margin))
+    return boxes
+
+
+def _intervals(edges, horizontal):
+    """``(start, end)`` of the merged ``edges`` along a horizontal or vertical line."""
+    return sorted((min(e.x1, e.x2), max(e.x1, e.x2)) if horizontal else (min(e.y1, e.y2), max(e.y1, e.y2))
+                  for e in edges.merged().each())
+
+
+def cut_ports(cell, box, area_layer=AREA_LAYER, gap_layer=GAP_LAYER, max_width=50.0):
+    """Waveguides cut by the edges of ``box`` (µm) as ``[(point, direction)]``, direction pointing out of the box.
+
+    Along each edge, a piece of conductor flanked by gap on both sides, each at most ``max_width`` µm wide, is the
+    center conductor of a cut waveguide and gets a port at its middle. Only the shapes touching the edges are
+    fetched, through the spatially indexed hierarchical shape iterator.
+    """
+    layout = cell.layout()
+    ibox = box.to_itype(layout.dbu)
+    limit = max_width / layout.dbu
+    sides = [  # edge, is horizontal, outward direction, coordinate across the edge
+        (pya.Edge(ibox.left, ibox.bottom, ibox.right, ibox.bottom), True, pya.DVector(0, -1), box.bottom),
+        (pya.Edge(ibox.left, ibox.top, ibox.right, ibox.top), True, pya.DVector(0, 1), box.top),
+        (pya.Edge(ibox.left, ibox.bottom, ibox.left, ibox.top), False, pya.DVector(-1, 0), box.left),
+        (pya.Edge(ibox.right, ibox.bottom, ibox.right, ibox.top), False, pya.DVector(1, 0), box.right),
+    ]
+    ports = []
+    for edge, horizontal, direction, position in sides:
+        touching = edge.bbox().enlarged(1, 1)
+        gap = pya.Region(cell.begin_shapes_rec_touching(layout.layer(*gap_layer), touching))
+        if gap.is_empty():
+            continue
+        area = pya.Region(cell.begin_shapes_rec_touching(layout.layer(*area_layer), touching))
+        line = pya.Edges([edge])
+        metal = (line if area.is_empty() else line & area) - gap
+        gaps = _intervals(line & gap, horizontal)
+        gap_ends = {end: end - start for start, end in gaps}
+        gap_starts = {start: end - start for start, end in gaps}
+        for start, end in _intervals(metal, horizontal):
+            flanks = (gap_ends.get(start, limit + 1), gap_starts.get(end, limit + 1))
+            if end - start <= limit and max(flanks) <= limit:
+                middle = (start + end) / 2 * layout.dbu
+                ports.append((pya.DPoint(middle, position) if horizontal else pya.DPoint(position, middle), direction))
+    return ports
+
+
+def crop_many(cell, regions, margin=0.0, names=None, area_layer=AREA_LAYER, gap_layer=GAP_LAYER, max_width=50.0):
+    """Clip several regions (see :func:`crop_box`) of ``cell`` into a new layout.
+
+    All regions are clipped in one hierarchical ``multi_clip_into`` pass, so the cells below ``cell`` are visited
+    once and cells entirely inside or outside a region are reused instead of being clipped. Every clip contains all
+    layers and the refpoints inside it, plus ``port_cut{i}``/``port_cut{i}_corner`` refpoints at the waveguides cut
+    by its edges (see :func:`cut_ports`), which simulations pick up like any other port.
+
+    Returns:
+        tuple of the new layout and the list of clipped cells, named by ``names`` or the region
+    """
+    source = cell.layout()
+    layout = pya.Layout()
+    layout.dbu = source.dbu
+    for layer_index in source.layer_indexes():
+        layout.insert_layer_at(layer_index, source.get_info(layer_index))
+    boxes = _crop_boxes(cell, regions, margin)
+    indexes = source.multi_clip_into(cell.cell_index(), layout, [box.to_itype(source.dbu) for box in boxes])
+
+    refpoint_layer = layout.layer(default_layers["refpoints"])
+    clips = []
+    for i, (cell_index, box, region) in enumerate(zip(indexes, boxes, regions)):
+        clip = layout.cell(cell_index)
+        layout.rename_cell(cell_index, names[i] if names else f"{cell.name} {region if isinstance(region, str) else i}")
+        for n, (point, direction) in enumerate(cut_ports(cell, box, area_layer, gap_layer, max_width)):
+            clip.shapes(refpoint_layer).insert(pya.DText(f"port_cut{n}", pya.DTrans(point.x, point.y)))
+            corner = point + direction * PORT_CORNER
+            clip.shapes(refpoint_layer).insert(pya.DText(f"port_cut{n}_corner", pya.DTrans(corner.x, corner.y)))
+        clips.append(clip)
+
+    # drop the clips of cells outside every region
+    empty = [inst for clip in clips for inst in clip.each_inst() if inst.cell.bbox().empty()]
+    for inst in empty:
+        inst.delete()
+    for top in layout.top_cells():
+        if top.cell_index() not in indexes:
+            top.prune_cell()
+    return layout, clips
+
+
+def crop(cell, region, margin=0.0, name=None, **kwargs):
+    """Clip one region (see :func:`crop_box`) of ``cell`` into a new layout, see :func:`crop_many`.
+
+    Returns:
+        tuple of the new layout and the clipped cell
+    """
+    layout, clips = crop_many(cell, [region], margin, [name] if name else None, **kwargs)
+    return layout, clips[0]
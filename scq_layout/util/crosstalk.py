@@ -0,0 +1,249 @@
+import numpy as np
+
+from kqcircuits.defaults import default_layers
+from kqcircuits.elements.element import get_refpoints
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.util.conformal import EPS0, cpw_capacitance, disk_capacitance, effective_permittivity
+from kqcircuits.scq_layout.util.geometry import JUNCTION_LAYERS, center_lines, island_regions, transform_points
+
+MU0 = 4e-7 * np.pi  # H/m
+ENDPOINT_TOLERANCE = 1.0  # µm between a line end and the refpoint naming it
+_CHUNK = 2_000_000  # segment-point pairs evaluated at once
+
+
+def _has_shapes(cell, layers):
+    return any(not cell.begin_shapes_rec(li).at_end() for li in layers)
+
+
+def _loops(cell, layers, tolerance=0.5):
+    """SQUID loops below ``cell``, i.e. holes of the merged junction layers, as point arrays (µm)."""
+    layout = cell.layout()
+    region = pya.Region()
+    for li in layers:
+        region += pya.Region(cell.begin_shapes_rec(li))
+    region = region.merged().smoothed(tolerance / layout.dbu, True)
+    return [np.array([(p.x * layout.dbu, p.y * layout.dbu) for p in polygon.each_point_hole(i)])
+            for polygon in region.each() for i in range(polygon.holes())]
+
+
+def _endpoints(segments):
+    """Points where a line made of ``segments`` starts or ends, i.e. segment ends not shared by another segment."""
+    ends = {}
+    for point in segments.reshape(-1, 2):
+        key = tuple(np.round(point, 3))
+        ends[key] = ends.get(key, 0) + 1
+    return [np.array(key) for key, count in ends.items() if count == 1]
+
+
+def chip_elements(cell, face="1t1"):
+    """Drive lines and qubits placed in ``cell``.
+
+    Lines are instances with waveguide center line paths (``WaveguideComposite``, ``Meander``, ...) and qubits
+    instances containing junction shapes. Each distinct cell is analysed once and transformed per placement.
+
+    Returns:
+        tuple of the lines ``[{"name", "ends", "segments", "a", "b"}]`` and qubits
+        ``[{"name", "ports", "loops", "islands"}]`` where lines are named after the refpoints at their ``ends`` (e.g.
+        ``L4_base-Q0_port_fluxline``), qubits after the instance name with ``ports`` the chip refpoint names of their
+        ports (e.g. ``Q0_port_fluxline``), and islands are ``(points, area)`` tuples, coordinates in µm
+    """
+    layout = cell.layout()
+    path_layer = layout.layer(default_layers[f"{face}_waveguide_path"])
+    junction_layers = [layout.layer(default_layers[f"{face}_{name}"]) for name in JUNCTION_LAYERS]
+    refpoint_layer = layout.layer(default_layers["refpoints"])
+    refpoints = {name: (p.x, p.y) for name, p in get_refpoints(refpoint_layer, cell, rec_levels=0).items()
+                 if not name.endswith("_corner")}
+    ref_names, ref_points = list(refpoints), np.array(list(refpoints.values())).reshape(-1, 2)
+
+    analysed = {}
+    lines, qubits = [], []
+    for inst in cell.each_inst():
+        child = inst.cell
+        if child.cell_index() not in analysed:
+            if _has_shapes(child, junction_layers):
+                islands = [(np.array([(p.x * layout.dbu, p.y * layout.dbu) for p in next(r.each()).each_point_hull()]),
+                            r.area() * layout.dbu**2) for r in island_regions(child, face)]
+                ports = [name for name in get_refpoints(refpoint_layer, child, rec_levels=0) if name.startswith("port")]
+                analysed[child.cell_index()] = ("qubit", ports, _loops(child, junction_layers), islands)
+            else:
+                segments = center_lines(child, path_layer)
+                params = child.pcell_parameters_by_name() if child.is_pcell_variant() else {}
+                analysed[child.cell_index()] = ("line", segments, params.get("a", 10), params.get("b", 6))
+        kind, *data = analysed[child.cell_index()]
+        for i, trans in enumerate(inst.dcell_inst.each_cplx_trans()):
+            name = inst.property("id") or f"{child.name}_{len(qubits) if kind == 'qubit' else len(lines)}"
+            if kind == "qubit":
+                ports, loops, islands = data
+                qubits.append({"name": name, "ports": [f"{name}_{port}" for port in ports],
+                               "loops": [transform_points(loop, trans) for loop in loops],
+                               "islands": [(transform_points(points, trans), area) for points, area in islands]})
+            elif len(data[0]):
+                segments = transform_points(data[0], trans)
+                ends = []
+                for end in _endpoints(segments):
+                    distance = np.hypot(*(ref_points - end).T)
+                    if len(distance) and distance.min() < ENDPOINT_TOLERANCE:
+                        ends.append(ref_names[int(distance.argmin())])
+                if ends:
+                    name = "-".join(sorted(ends))
+                lines.append({"name": name, "ends": ends, "segments": segments, "a": data[1], "b": data[2]})
+    return lines, qubits
+
+
+def _filaments(lines, return_current):
+    """Current filaments of the lines: center conductors and, optionally, ground returns at the gap edges."""
+    starts, ends, weights, owners = [], [], [], []
+    for index, line in enumerate(lines):
+        p0, p1 = line["segments"][:, 0], line["segments"][:, 1]
+        offsets = [(0.0, 1.0)]
+        if return_current:
+            offset = line["a"] / 2 + line["b"]
+            offsets += [(offset, -0.5), (-offset, -0.5)]
+        direction = p1 - p0
+        normal = np.stack([-direction[:, 1], direction[:, 0]], axis=1) / np.hypot(*direction.T)[:, None]
+        for offset, weight in offsets:
+            starts.append(p0 + offset * normal)
+            ends.append(p1 + offset * normal)
+            weights.append(np.full(len(p0), weight))
+            owners.append(np.full(len(p0), index))
+    return np.concatenate(starts), np.concatenate(ends), np.concatenate(weights), np.concatenate(owners)
+
+
+def _loop_quadrature(loops):
+    """Two point Gauss-Legendre nodes and line elements along the loop edges."""
+    points, elements, owners = [], [], []
+    for index, loop in enumerate(loops):
+        edges = np.roll(loop, -1, axis=0) - loop
+        for t in (0.5 - 0.5 / np.sqrt(3), 0.5 + 0.5 / np.sqrt(3)):
+            points.append(loop + t * edges)
+            elements.append(edges / 2)
+            owners.append(np.full(len(loop), index))
+    return np.concatenate(points), np.concatenate(elements), np.concatenate(owners)
+
+
+def _potential_log(p0, p1, u, points):
+    """``ln((s1 + r1) / (s0 + r0))`` of the vector potential of filaments ``p0 -> p1`` at ``points``, ``(S, P)``."""
+    px, py = points[:, 0], points[:, 1]
+    ux, uy = u[:, 0:1], u[:, 1:2]
+    x0, y0 = p0[:, 0:1] - px, p0[:, 1:2] - py
+    x1, y1 = p1[:, 0:1] - px, p1[:, 1:2] - py
+    s0, s1 = x0 * ux + y0 * uy, x1 * ux + y1 * uy
+    r0, r1 = np.hypot(x0, y0), np.hypot(x1, y1)
+    # (s1 + r1) / (s0 + r0) == (r0 - s0) / (r1 - s1), use the form without cancellation
+    ahead = s0 + s1 > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log = np.log(np.where(ahead, s1 + r1, r0 - s0) / np.where(ahead, s0 + r0, r1 - s1))
+    log[~np.isfinite(log)] = 0  # point on the filament
+    return log
+
+
+def _field(p0, p1, u, points):
+    """Out of plane ``B / (μ0 I / 4π)`` (1/µm) of filaments ``p0 -> p1`` at ``points``, ``(S, P)``."""
+    px, py = points[:, 0], points[:, 1]
+    ux, uy = u[:, 0:1], u[:, 1:2]
+    x0, y0 = p0[:, 0:1] - px, p0[:, 1:2] - py
+    x1, y1 = p1[:, 0:1] - px, p1[:, 1:2] - py
+    distance = uy * x0 - ux * y0  # signed distance of the point from the filament line
+    with np.errstate(divide="ignore", invalid="ignore"):
+        field = ((x1 * ux + y1 * uy) / np.hypot(x1, y1) - (x0 * ux + y0 * uy) / np.hypot(x0, y0)) / distance
+    field[~np.isfinite(field)] = 0
+    return field
+
+
+def mutual_inductance(lines, loops, return_current=True, near=10.0):
+    """Mutual inductance (pH) between every line and every loop, ``(lines, loops)`` array.
+
+    Filaments closer to a loop than ``near`` loop radii contribute the circulation of their vector potential around
+    the loop, ``A = μ0 I / 4π · u ln((s1 + r1) / (s0 + r0))`` for a straight filament along ``u``, integrated with
+    two Gauss-Legendre points per loop edge. Farther filaments contribute their field at the loop center times the
+    loop area (Biot-Savart). Both are evaluated for all filament and point pairs at once.
+    """
+    p0, p1, weights, owners = _filaments(lines, return_current)
+    u = (p1 - p0) / np.hypot(*(p1 - p0).T)[:, None]
+    centers = np.array([loop.mean(axis=0) for loop in loops])
+    radii = np.array([np.hypot(*(loop - loop.mean(axis=0)).T).max() for loop in loops])
+    areas = np.array([np.sum(loop[:, 0] * np.roll(loop[:, 1], -1) - np.roll(loop[:, 0], -1) * loop[:, 1]) / 2
+                      for loop in loops])  # signed, positive for counterclockwise loops
+
+    flux = np.zeros((len(p0), len(loops)))
+    step = max(1, _CHUNK // len(loops))
+    for i in range(0, len(p0), step):
+        flux[i:i + step] = _field(p0[i:i + step], p1[i:i + step], u[i:i + step], centers) * areas
+
+    # distance from the loop centers to the filaments
+    t = np.clip(np.einsum("sk,spk->sp", u, centers[None, :, :] - p0[:, None, :]), 0,
+                np.hypot(*(p1 - p0).T)[:, None])
+    closest = p0[:, None, :] + t[..., None] * u[:, None, :]
+    close = np.hypot(*(closest - centers[None, :, :]).transpose(2, 0, 1)) < near * radii
+    for index, loop in enumerate(loops):
+        segments = np.nonzero(close[:, index])[0]
+        if len(segments):
+            points, elements, _ = _loop_quadrature([loop])
+            log = _potential_log(p0[segments], p1[segments], u[segments], points)
+            flux[segments, index] = np.sum(log * (u[segments] @ elements.T), axis=1)
+
+    m = np.zeros((len(lines), len(loops)))
+    np.add.at(m, owners, weights[:, None] * flux)
+    return m * MU0 / (4 * np.pi) * 1e-6 * 1e12
+
+
+def mutual_capacitance(lines, islands, eps_r=11.45, step=20.0):
+    """Mutual capacitance (fF) between every line and every island, ``(lines, islands)`` array.
+
+    Both line elements of length ``step`` and islands hold a charge against their surrounding ground, i.e. they are
+    dipoles of their self-capacitance and charge separation (``a/2 + b`` for the line, the equivalent disk radius
+    for an island). Their mutual capacitance is that of two dipoles, ``C1 C2 s1 s2 / (4π ε r³)``, with ``r`` the
+    distance to the island center, at least the island radius plus the line separation.
+    """
+    eps = EPS0 * effective_permittivity(eps_r)
+    centers = np.array([points.mean(axis=0) for points, _ in islands]).reshape(-1, 2)
+    areas = np.array([area for _, area in islands])
+    radius = np.sqrt(areas / np.pi)
+    c_islands = disk_capacitance(areas * 1e-12, eps_r)
+    c = np.zeros((len(lines), len(islands)))
+    for index, line in enumerate(lines):
+        p0, p1 = line["segments"][:, 0], line["segments"][:, 1]
+        pieces = np.maximum(1, np.ceil(np.hypot(*(p1 - p0).T) / step)).astype(int)
+        t = (np.concatenate([np.arange(n) for n in pieces]) + 0.5) / np.repeat(pieces, pieces)
+        start, end = np.repeat(p0, pieces, axis=0), np.repeat(p1, pieces, axis=0)
+        samples = start + t[:, None] * (end - start)
+        lengths = np.repeat(np.hypot(*(p1 - p0).T) / pieces, pieces)
+        separation = line["a"] / 2 + line["b"]
+        c_elements = cpw_capacitance(line["a"], line["b"], eps_r) * lengths * 1e-6
+        r = np.hypot(*(samples[:, None, :] - centers[None, :, :]).transpose(2, 0, 1))
+        r = np.maximum(r, radius + separation) * 1e-6
+        c[index] = np.sum(c_elements[:, None] * c_islands * separation * radius * 1e-12 / (4 * np.pi * eps * r**3),
+                          axis=0)
+    return c * 1e15
+
+
+def crosstalk_matrix(cell, face="1t1", eps_r=11.45, return_current=True):
+    """Screening estimate of the inductive and capacitive crosstalk between the drive lines and qubits of a chip.
+
+    See :func:`chip_elements`, :func:`mutual_inductance` and :func:`mutual_capacitance`. Lines ending at a qubit
+    port target that qubit; ``M_ratio`` is the mutual inductance of a line to each loop relative to its target loop.
+
+    Returns:
+        dictionary with the ``lines``, ``loops`` and ``islands`` names, ``M`` (pH) and ``C`` (fF) as nested lists
+        ``[line][loop]`` and ``[line][island]``, and ``M_ratio`` (None for lines without a target loop)
+    """
+    lines, qubits = chip_elements(cell, face)
+    loops = [(f"{q['name']}_loop{i + 1}" if len(q["loops"]) > 1 else q["name"], loop)
+             for q in qubits for i, loop in enumerate(q["loops"])]
+    loop_ports = [set(q["ports"]) for q in qubits for _ in q["loops"]]
+    islands = [(f"{q['name']}_island{i + 1}", island) for q in qubits for i, island in enumerate(q["islands"])]
+    m = mutual_inductance(lines, [loop for _, loop in loops], return_current) if loops else np.zeros((len(lines), 0))
+    c = mutual_capacitance(lines, [i for _, i in islands], eps_r) if islands else np.zeros((len(lines), 0))
+    ratios = []
+    for index, line in enumerate(lines):
+        targets = [j for j, ports in enumerate(loop_ports) if ports.intersection(line["ends"])]
+        ratios.append(list(np.abs(m[index]) / abs(m[index, targets[0]])) if targets and m[index, targets[0]] else None)
+    return {
+        "lines": [line["name"] for line in lines],
+        "loops": [name for name, _ in loops],
+        "islands": [name for name, _ in islands],
+        "M": m.tolist(),
+        "C": c.tolist(),
+        "M_ratio": ratios,
+    }
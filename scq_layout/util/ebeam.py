@@ -0,0 +1,142 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+from kqcircuits.defaults import default_layers
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.util.geometry import JUNCTION_LAYERS
+
+
+class WriterModel:
+    """Exposure timing of a Gaussian beam vector scan writer for one layer.
+
+    Every trapezoid is one figure, filled with shots on a grid of ``beam_step``. A shot dwells long enough to
+    deliver ``dose``, but at least one period of ``max_frequency``; each figure adds ``figure_settle`` for the beam
+    deflection and each write field the ``stage_move`` to reach it.
+
+    Args:
+        beam_step: shot pitch (µm)
+        dose: exposure dose (µC/cm²)
+        current: beam current (nA)
+        max_frequency: maximum shot frequency (MHz)
+        figure_settle: settling time per figure (µs)
+        field: write field size (µm)
+        stage_move: stage move and settling time per write field (s)
+    """
+
+    def __init__(self, beam_step=0.005, dose=1000.0, current=1.0, max_frequency=50.0, figure_settle=1.0, field=500.0,
+                 stage_move=0.2):
+        self.beam_step = beam_step
+        self.dose = dose
+        self.current = current
+        self.max_frequency = max_frequency
+        self.figure_settle = figure_settle
+        self.field = field
+        self.stage_move = stage_move
+
+    @property
+    def dwell(self):
+        """Time per shot (s)."""
+        charge = self.dose * 1e-14 * self.beam_step**2  # µC/cm² to C/µm²
+        return max(charge / (self.current * 1e-9), 1 / (self.max_frequency * 1e6))
+
+    def time(self, figures, shots, fields):
+        """Write time (s) of ``figures`` with ``shots`` in total, spread over ``fields`` write fields."""
+        return shots * self.dwell + figures * self.figure_settle * 1e-6 + fields * self.stage_move
+
+
+# fine bars in small steps at low current, fingers in coarse steps at high current
+DEFAULT_WRITERS = {
+    "SIS_junction": WriterModel(beam_step=0.004, current=1.0),
+    "SIS_junction_2": WriterModel(beam_step=0.02, current=10.0),
+}
+
+
+def fracture(region):
+    """Trapezoids (horizontal slabs) of the merged ``region``, as written by the e-beam."""
+    return [trapezoid for polygon in region.merged().each()
+            for trapezoid in polygon.decompose_trapezoids(pya.Polygon.TD_htrapezoids)]
+
+
+def _fracture_job(polygons, dbu, beam_step):
+    """Figure and shot count of ``polygons``, run in a worker process."""
+    trapezoids = fracture(pya.Region(polygons))
+    shots = sum(math.ceil(t.area() * dbu**2 / beam_step**2 - 1e-9) for t in trapezoids)
+    return len(trapezoids), shots
+
+
+def _placements(cell):
+    """Number of placements of every cell below ``cell`` (including itself) by cell index."""
+    layout = cell.layout()
+    counts = {cell.cell_index(): 1}
+    for cell_index in layout.each_cell_top_down():
+        if cell_index in counts:
+            for inst in layout.cell(cell_index).each_inst():
+                counts[inst.cell_index] = counts.get(inst.cell_index, 0) + counts[cell_index] * inst.size()
+    return counts
+
+
+def _fields(cell, layer, field):
+    """Write fields (as grid indices) holding shapes of ``layer`` below ``cell``."""
+    fields = set()
+    it = cell.begin_shapes_rec(layer)
+    while not it.at_end():
+        center = it.shape().dbbox().transformed(it.dtrans()).center()
+        fields.add((math.floor(center.x / field), math.floor(center.y / field)))
+        it.next()
+    return fields
+
+
+def write_estimate(cell, layers=JUNCTION_LAYERS, writers=None, face="1t1", chips_per_wafer=1, workers=None):
+    """Shot count and write time of the e-beam layers of ``cell``, e.g. a chip.
+
+    The shapes of every distinct cell are fractured once, in parallel over ``workers`` processes (1 to fracture in
+    this process), and multiplied by the number of placements of that cell, so a chip with many identical SQUIDs
+    costs one SQUID fracture.
+
+    Args:
+        cell: top cell to estimate
+        layers: names of the e-beam layers (without face prefix)
+        writers: dictionary of layer name to :class:`WriterModel`, by default ``DEFAULT_WRITERS``
+        face: face of the layers
+        chips_per_wafer: number of copies of ``cell`` on a wafer
+        workers: number of fracturing processes
+
+    Returns:
+        dictionary with ``figures``, ``shots`` and write ``time`` (s) of the chip in total, per layer in ``layers`` and
+        per distinct cell in ``cells``, and the same totals for ``chips_per_wafer`` chips in ``wafer``
+    """
+    layout = cell.layout()
+    writers = {**DEFAULT_WRITERS, **(writers or {})}
+    counts = _placements(cell)
+    jobs = []
+    for name in layers:
+        li = layout.layer(default_layers[f"{face}_{name}"])
+        for cell_index in counts:
+            shapes = layout.cell(cell_index).shapes(li)
+            if not shapes.is_empty():
+                polygons = [s.polygon for s in shapes.each() if s.is_polygon() or s.is_box() or s.is_path()]
+                jobs.append((name, cell_index, polygons))
+    if workers == 1 or len(jobs) < 2:
+        results = [_fracture_job(p, layout.dbu, writers[name].beam_step) for name, _, p in jobs]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_fracture_job, [p for _, _, p in jobs], [layout.dbu] * len(jobs),
+                                    [writers[name].beam_step for name, _, _ in jobs]))
+
+    report = {"layers": {}, "cells": {}}
+    for name in layers:
+        report["layers"][name] = {"figures": 0, "shots": 0}
+    for (name, cell_index, _), (figures, shots) in zip(jobs, results):
+        report["cells"].setdefault(layout.cell(cell_index).name, {})[name] = {"figures": figures, "shots": shots}
+        report["layers"][name]["figures"] += figures * counts[cell_index]
+        report["layers"][name]["shots"] += shots * counts[cell_index]
+    for name, entry in report["layers"].items():
+        fields = len(_fields(cell, layout.layer(default_layers[f"{face}_{name}"]), writers[name].field))
+        entry["fields"] = fields
+        entry["time"] = writers[name].time(entry["figures"], entry["shots"], fields)
+    for key in ("figures", "shots", "time"):
+        report[key] = sum(entry[key] for entry in report["layers"].values())
+    report["wafer"] = {"chips": chips_per_wafer, **{key: report[key] * chips_per_wafer for key in ("figures", "shots")},
+                       "time": report["time"] * chips_per_wafer}
+    return report
@@ -0,0 +1,169 @@
+import numpy as np
+
+from kqcircuits.defaults import default_layers
+from kqcircuits.elements.element import get_refpoints
+from kqcircuits.elements.launcher import Launcher
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.elements.launcher import LauncherAS
+from kqcircuits.scq_layout.util.conformal import cpw_effective_permittivity, cpw_impedance
+from kqcircuits.scq_layout.util.crosstalk import ENDPOINT_TOLERANCE, chip_elements
+
+C_LIGHT = 299792458.0  # m/s
+GAP_LAYER = (130, 1)  # etched gap
+PROBE_DISTANCE = 1.0  # µm beyond a line end
+LAUNCHERS = (Launcher, LauncherAS)
+
+
+class _Ends:
+    """Line ends of a chip, and what they are connected to."""
+
+    def __init__(self, cell, gap_layer):
+        layout = cell.layout()
+        self.cell = cell
+        self.gap = layout.layer(*gap_layer)
+        refpoint_layer = layout.layer(default_layers["refpoints"])
+        refpoints = get_refpoints(refpoint_layer, cell, rec_levels=0)
+        self.names = [name for name in refpoints.keys() if not name.endswith("_corner")]
+        self.points = np.array([(refpoints[name].x, refpoints[name].y) for name in self.names]).reshape(-1, 2)
+        # chip refpoint names of the launcher refpoints, e.g. ``L1_port``
+        self.launchers = {f"{inst.property('id')}_{name}" for inst in cell.each_inst()
+                          if inst.property("id") and isinstance(inst.cell.pcell_declaration(), LAUNCHERS)
+                          for name in get_refpoints(refpoint_layer, inst.cell, rec_levels=0)}
+
+    def refpoint(self, point):
+        distance = np.hypot(*(self.points - point).T)
+        return self.names[int(distance.argmin())] if len(distance) and distance.min() < ENDPOINT_TOLERANCE else None
+
+    def kind(self, point, direction):
+        """``port`` at a launcher, ``open`` at a coupling element port or before a gap, else ``short``."""
+        name = self.refpoint(point)
+        if name in self.launchers:
+            return "port", name
+        if name is not None and "_port" in name:
+            return "open", name
+        probe = pya.DPoint(*(point + direction * PROBE_DISTANCE))
+        box = pya.DBox(probe, probe).enlarged(0.01, 0.01)
+        gap = pya.Region(self.cell.begin_shapes_rec_touching(self.gap, box)) & pya.Region(
+            box.to_itype(self.cell.layout().dbu))
+        return ("open" if not gap.is_empty() else "short"), name
+
+
+def chip_resonators(cell, face="1t1", gap_layer=GAP_LAYER):
+    """Resonators of a chip, i.e. chains of waveguide lines not ending at a launcher.
+
+    Lines (see ``chip_elements``) meeting end to end are chained. A chain end at a port refpoint of another element
+    (a qubit coupler, a finger capacitor) or before a gap is open, an end into ground metal is shorted.
+
+    Returns:
+        list of ``{"name", "ends", "kinds", "lengths", "a", "b", "qubit"}``, where ``lengths``, ``a`` and ``b`` are
+        per line of the chain (µm) and ``qubit`` is the instance name of a qubit at one of the ends, if any
+    """
+    lines, qubits = chip_elements(cell, face)
+    ends = _Ends(cell, gap_layer)
+
+    # chain lines whose ends meet
+    owners = {}
+    for index, line in enumerate(lines):
+        for point in (line["segments"][0, 0], line["segments"][-1, 1]):
+            owners.setdefault(tuple(np.round(point / ENDPOINT_TOLERANCE)), []).append(index)
+    parent = list(range(len(lines)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for indexes in owners.values():
+        for other in indexes[1:]:
+            parent[find(other)] = find(indexes[0])
+
+    resonators = []
+    for root in sorted({find(i) for i in range(len(lines))}):
+        chain = [i for i in range(len(lines)) if find(i) == root]
+        terminations = []
+        for i in chain:
+            segments = lines[i]["segments"]
+            for point, inner in ((segments[0, 0], segments[0, 1]), (segments[-1, 1], segments[-1, 0])):
+                if len(owners[tuple(np.round(point / ENDPOINT_TOLERANCE))]) == 1:
+                    direction = (point - inner) / np.hypot(*(point - inner))
+                    terminations.append(ends.kind(point, direction))
+        kinds = [kind for kind, _ in terminations]
+        if "port" in kinds or len(kinds) != 2:
+            continue
+        names = [name for _, name in terminations if name]
+        resonators.append({
+            "name": "-".join(sorted(names)) if names else lines[chain[0]]["name"],
+            "ends": [name for _, name in terminations],
+            "kinds": kinds,
+            "lengths": [float(np.sum(np.hypot(*(lines[i]["segments"][:, 1] - lines[i]["segments"][:, 0]).T)))
+                        for i in chain],
+            "a": [lines[i]["a"] for i in chain],
+            "b": [lines[i]["b"] for i in chain],
+            "qubit": next((q["name"] for q in qubits if set(q["ports"]).intersection(names)), None),
+        })
+    return resonators
+
+
+def frequency_plan(resonators, qubit_frequencies=None, eps_r=11.45, substrate_thickness=525.0, min_spacing=0.05,
+                   min_detuning=0.5):
+    """Frequencies of ``resonators`` (see :func:`chip_resonators`) and their collisions.
+
+    A resonator with one shorted end is a quarter wave, otherwise a half wave resonator. Its fundamental frequency
+    is ``c / (n Σ L_i sqrt(ε_eff,i))`` with ``n`` 4 or 2 and ``ε_eff`` of each line from its ``a`` and ``b`` on the
+    substrate (conformal mapping), computed for all lines at once.
+
+    Args:
+        resonators: list of resonator dictionaries
+        qubit_frequencies: dictionary of qubit name to frequency (GHz)
+        eps_r: substrate relative permittivity
+        substrate_thickness: substrate thickness (µm), None for a thick substrate
+        min_spacing: minimum spacing of resonator frequencies (GHz)
+        min_detuning: minimum detuning of a resonator from its qubit (GHz)
+
+    Returns:
+        dictionary with ``resonators`` (``name``, ``type``, ``length``, ``frequency`` (GHz), ``impedance`` (Ω) and
+        ``qubit``, ``detuning`` (GHz) for resonators at a qubit), ``collisions`` (pairs of resonator names closer
+        than ``min_spacing``) and ``detuning_violations`` (resonators closer than ``min_detuning`` to their qubit)
+    """
+    qubit_frequencies = qubit_frequencies or {}
+    owners = np.repeat(np.arange(len(resonators)), [len(r["lengths"]) for r in resonators])
+    lengths = np.concatenate([r["lengths"] for r in resonators]) if resonators else np.zeros(0)
+    a = np.concatenate([r["a"] for r in resonators]) if resonators else np.zeros(0)
+    b = np.concatenate([r["b"] for r in resonators]) if resonators else np.zeros(0)
+    eps_eff = cpw_effective_permittivity(a, b, eps_r, substrate_thickness)
+    electrical = np.bincount(owners, lengths * np.sqrt(eps_eff), minlength=len(resonators)) * 1e-6
+    impedance = np.bincount(owners, lengths * cpw_impedance(a, b, eps_r, substrate_thickness),
+                            minlength=len(resonators)) / np.maximum(np.bincount(owners, lengths,
+                                                                                minlength=len(resonators)), 1e-12)
+    quarter = np.array(["short" in r["kinds"] and r["kinds"].count("short") == 1 for r in resonators], dtype=bool)
+    frequencies = C_LIGHT / (np.where(quarter, 4, 2) * electrical) * 1e-9
+
+    result = {"resonators": [], "collisions": [], "detuning_violations": []}
+    for i, resonator in enumerate(resonators):
+        entry = {
+            "name": resonator["name"],
+            "type": "quarter" if quarter[i] else "half",
+            "length": float(sum(resonator["lengths"])),
+            "frequency": float(frequencies[i]),
+            "impedance": float(impedance[i]),
+        }
+        qubit = resonator.get("qubit")
+        if qubit is not None:
+            entry["qubit"] = qubit
+            if qubit in qubit_frequencies:
+                entry["detuning"] = float(frequencies[i] - qubit_frequencies[qubit])
+                if abs(entry["detuning"]) < min_detuning:
+                    result["detuning_violations"].append(resonator["name"])
+        result["resonators"].append(entry)
+
+    order = np.argsort(frequencies)
+    close = np.nonzero(np.diff(frequencies[order]) < min_spacing)[0]
+    for i in close:
+        j = i + 1
+        while j < len(order) and frequencies[order[j]] - frequencies[order[i]] < min_spacing:
+            j += 1
+        result["collisions"].extend([resonators[order[i]]["name"], resonators[order[k]]["name"]]
+                                    for k in range(i + 1, j))
+    return result
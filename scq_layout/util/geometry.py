@@ -0,0 +1,49 @@
+import numpy as np
+
+from kqcircuits.defaults import default_layers
+from kqcircuits.elements.element import get_refpoints
+from kqcircuits.pya_resolver import pya
+
+JUNCTION_LAYERS = ("SIS_junction", "SIS_junction_2")  # layers of the SQUID junctions, without the face prefix
+
+
+def cell_ports(cell):
+    """Ports ``name -> (point, direction)`` of ``cell``, i.e. refpoints with a matching ``_corner`` refpoint."""
+    layout = cell.layout()
+    refpoints = get_refpoints(layout.layer(default_layers["refpoints"]), cell, rec_levels=0)
+    result = {}
+    for name, point in refpoints.items():
+        corner = refpoints.get(f"{name}_corner")
+        if corner is not None and corner != point:
+            direction = corner - point
+            result[name] = (point, direction * (1 / direction.length()))
+    return result
+
+
+def center_lines(cell, layer):
+    """Zero width waveguide center line paths below ``cell`` as ``(N, 2, 2)`` segments (µm)."""
+    segments = []
+    it = cell.begin_shapes_rec(layer)
+    while not it.at_end():
+        shape = it.shape()
+        if shape.is_path() and shape.path_width == 0:
+            points = [p for p in shape.dpath.transformed(it.dtrans()).each_point()]
+            segments.extend([(p.x, p.y), (q.x, q.y)] for p, q in zip(points, points[1:]))
+        it.next()
+    return np.array(segments, dtype=float).reshape(-1, 2, 2)
+
+
+def transform_points(points, trans):
+    """``points`` (array of any shape ending in 2) transformed by a ``DCplxTrans``."""
+    ex, ey = trans * pya.DVector(1, 0), trans * pya.DVector(0, 1)
+    matrix = np.array([[ex.x, ex.y], [ey.x, ey.y]])
+    return points @ matrix + np.array([trans.disp.x, trans.disp.y])
+
+
+def island_regions(cell, face="1t1"):
+    """Metal islands of a qubit-like cell, i.e. the holes of the merged ground gap, largest first."""
+    layout = cell.layout()
+    gap = pya.Region(cell.begin_shapes_rec(layout.layer(default_layers[f"{face}_base_metal_gap_wo_grid"])))
+    islands = [pya.Region(pya.Polygon(list(poly.each_point_hole(i))))
+               for poly in gap.merged().each() for i in range(poly.holes())]
+    return sorted(islands, key=lambda r: -r.area())
@@ -0,0 +1,139 @@
+import importlib
+import sys
+import time
+import traceback
+from pathlib import Path
+
+from kqcircuits.pya_resolver import pya
+from kqcircuits.util.library_helper import to_library_name
+
+from kqcircuits.scq_layout.aslib import ASlib
+
+PACKAGE = ASlib.__module__.rsplit(".", 1)[0]
+PACKAGE_DIR = Path(sys.modules[ASlib.__module__].__file__).parent
+WATCHED_DIRS = ("qubits", "junctions", "elements", "chips", "util")
+
+
+def _source_mtimes():
+    return {path: path.stat().st_mtime_ns for d in WATCHED_DIRS for path in (PACKAGE_DIR / d).rglob("*.py")}
+
+
+def _module_name(path):
+    return ".".join((PACKAGE,) + path.relative_to(PACKAGE_DIR).with_suffix("").parts)
+
+
+def _dependents(changed):
+    """Loaded package modules depending (transitively) on ``changed``, in an order where dependencies come first."""
+    names = (_module_name(path) for path in _source_mtimes())
+    modules = {name: sys.modules[name] for name in names if name in sys.modules}
+    uses = {}
+    for name, module in modules.items():
+        for value in vars(module).values():
+            dep = value.__name__ if isinstance(value, type(sys)) else getattr(value, "__module__", None)
+            if dep in modules and dep != name:
+                uses.setdefault(dep, set()).add(name)
+    order, seen = [], set()
+
+    def visit(name):
+        if name not in seen:
+            seen.add(name)
+            for user in uses.get(name, ()):
+                visit(user)
+            order.append(name)
+
+    for name in changed:
+        if name in modules:
+            visit(name)
+    return [modules[name] for name in reversed(order)]
+
+
+def _pcell_classes(module):
+    return [v for v in vars(module).values()
+            if isinstance(v, type) and issubclass(v, pya.PCellDeclarationHelper) and v.__module__ == module.__name__]
+
+
+class HotReloader:
+    """Watches the AS Library sources and rebuilds only the cells whose code changed.
+
+    :meth:`poll` compares the modification times of the modules under ``WATCHED_DIRS``. Changed modules and the
+    package modules importing them are reloaded, their PCells are registered again in the AS Library, and then only
+    the variants of those PCells and the cells containing them are regenerated, first in the library and then as
+    library proxies in ``layout``. Call :meth:`watch` for a blocking loop (notebook) or :meth:`start_timer` in the
+    KLayout GUI.
+
+    Args:
+        layout: layout open in the viewer
+        on_rebuild: optional callback receiving the report dictionary after every rebuild
+    """
+
+    def __init__(self, layout, on_rebuild=None):
+        self.layout = layout
+        self.on_rebuild = on_rebuild
+        self._mtimes = _source_mtimes()
+        self._timer = None
+
+    def poll(self):
+        """Rebuild after source changes. Returns the report dictionary, or None if nothing changed."""
+        mtimes = _source_mtimes()
+        changed = [_module_name(p) for p, t in mtimes.items() if self._mtimes.get(p) != t]
+        self._mtimes = mtimes
+        if not changed:
+            return None
+        return self.rebuild(changed)
+
+    def rebuild(self, module_names):
+        start = time.perf_counter()
+        report = {"changed": module_names, "reloaded": [], "cells": 0, "ok": True}
+        library = pya.Library.library_by_name(ASlib.LIBRARY_NAME)
+        lib_layout = library.layout()
+        pcell_ids = set()
+        try:
+            for module in _dependents(module_names):
+                importlib.reload(module)
+                report["reloaded"].append(module.__name__)
+                classes = _pcell_classes(module)
+                for cls in classes:
+                    name = to_library_name(cls.__name__)
+                    # like load_libraries, register already known PCells and the last class of the module
+                    if lib_layout.pcell_declaration(name) is not None or cls is classes[-1]:
+                        pcell_ids.add(lib_layout.register_pcell(name, cls()))
+        except Exception:  # pylint: disable=broad-except
+            traceback.print_exc()
+            report["ok"] = False
+        report["reload_time"] = time.perf_counter() - start
+
+        affected = set()
+        for cell in lib_layout.each_cell():
+            if cell.is_pcell_variant() and not cell.is_library_cell() and cell.pcell_id() in pcell_ids:
+                affected.add(cell.cell_index())
+                affected.update(cell.caller_cells())
+        for ci in list(lib_layout.each_cell_bottom_up()):
+            if ci in affected:
+                lib_layout.cell(ci).refresh()
+        for ci in list(self.layout.each_cell_bottom_up()):
+            cell = self.layout.cell(ci)
+            if cell.is_library_cell() and cell.library().id() == library.id() and cell.library_cell_index() in affected:
+                cell.refresh()
+                report["cells"] += 1
+        report["time"] = time.perf_counter() - start
+        print(f"Reloaded {', '.join(m.rsplit('.', 1)[-1] for m in report['reloaded']) or '-'}: "
+              f"{len(affected)} library cells, {report['cells']} layout cells rebuilt in {report['time'] * 1e3:.1f} ms")
+        if self.on_rebuild is not None:
+            self.on_rebuild(report)
+        return report
+
+    def watch(self, interval=0.5):
+        """Poll for changes until interrupted."""
+        try:
+            while True:
+                self.poll()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+    def start_timer(self, interval=0.5):
+        """Poll from the Qt event loop of the KLayout GUI."""
+        self._timer = pya.QTimer()
+        self._timer.interval = int(interval * 1000)
+        self._timer.timeout = self.poll
+        self._timer.start()
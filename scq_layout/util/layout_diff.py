@@ -0,0 +1,177 @@
+import math
+import re
+
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.util.cell_hash import instance_key, box_hash, cell_hashes
+
+MARKER_LAYER = (999, 0)  # boxes around the differing tiles
+_VARIANT_SUFFIX = re.compile(r"\$\d+$")
+
+
+def _instance_name(inst):
+    """Name pairing the placements of changed cells: instance name, or cell name without variant suffix."""
+    return inst.property("id") or _VARIANT_SUFFIX.sub("", inst.cell.name)
+
+
+class _Diff:
+    """Hierarchical diff of two layouts, each distinct pair of differing cells compared once."""
+
+    def __init__(self, old_layout, new_layout, tile, markers):
+        if old_layout.dbu != new_layout.dbu:
+            raise ValueError(f"Database units differ: {old_layout.dbu} and {new_layout.dbu}")
+        self.old, self.new = old_layout, new_layout
+        self.old_hashes, self.new_hashes = cell_hashes(old_layout), cell_hashes(new_layout)
+        self.infos = sorted({*map(old_layout.get_info, old_layout.layer_indexes()),
+                             *map(new_layout.get_info, new_layout.layer_indexes())}, key=str)
+        self.tile = max(1, round(tile / old_layout.dbu))
+        self.markers = markers
+        self.marker_layer = markers.layer(*MARKER_LAYER)
+        self.nodes = {}
+        self.marker_cells = {}
+
+    def compare(self, old_cell, new_cell):
+        """Node of the changed-cell tree for a pair of cells, or None if their hashes are equal."""
+        key = (old_cell.cell_index(), new_cell.cell_index())
+        if self.old_hashes[key[0]] == self.new_hashes[key[1]]:
+            return None
+        if key in self.nodes:
+            return self.nodes[key]
+
+        marker = self.markers.create_cell(f"DIFF_{new_cell.name}")
+        node = {"name": new_cell.name, "old": old_cell.name, "area": 0.0, "tiles": 0, "changed": [], "moved": [],
+                "added": [], "removed": []}
+        old_insts = self._unmatched(old_cell, self.old_hashes, self.new_hashes, new_cell)
+        new_insts = self._unmatched(new_cell, self.new_hashes, self.old_hashes, old_cell)
+
+        by_name = {}
+        for inst in old_insts:
+            if not inst.is_regular_array():
+                by_name.setdefault(_instance_name(inst), []).append(inst)
+        residual_old, residual_new = [], []
+        for inst in new_insts:
+            candidates = by_name.get(_instance_name(inst)) if not inst.is_regular_array() else None
+            if not candidates:
+                residual_new.append(inst)
+                node["added"].append(inst.property("id") or inst.cell.name)
+                continue
+            # a placement at the same position if any, otherwise the instance was moved
+            old_inst = next((c for c in candidates if c.cplx_trans == inst.cplx_trans), candidates[0])
+            candidates.remove(old_inst)
+            child = self.compare(old_inst.cell, inst.cell)
+            if old_inst.cplx_trans == inst.cplx_trans:
+                node["changed"].append({"instance": inst.property("id") or inst.cell.name, **child})
+                child_marker = self.marker_cells[(old_inst.cell_index, inst.cell_index)]
+                marker.insert(pya.CellInstArray(child_marker.cell_index(), inst.cplx_trans))
+            else:
+                # the geometry of both placements is XORed here, the content change is reported but not counted
+                residual_old.append(old_inst)
+                residual_new.append(inst)
+                node["moved"].append({"instance": inst.property("id") or inst.cell.name,
+                                      "from": str(old_inst.dcplx_trans), "to": str(inst.dcplx_trans), "changed": child})
+        for insts in by_name.values():
+            for inst in insts:
+                residual_old.append(inst)
+                node["removed"].append(inst.property("id") or inst.cell.name)
+        residual_old += [inst for inst in old_insts if inst.is_regular_array()]
+
+        self._xor(node, marker, old_cell, residual_old, new_cell, residual_new)
+        node["total_area"] = node["area"] + sum(child["total_area"] for child in node["changed"])
+        self.nodes[key] = node
+        self.marker_cells[key] = marker
+        return node
+
+    @staticmethod
+    def _unmatched(cell, hashes, other_hashes, other):
+        """Instances of ``cell`` without an identical placement of identical content in ``other``."""
+        keys = {}
+        for inst in other.each_inst():
+            k = instance_key(inst, other_hashes[inst.cell_index])
+            keys[k] = keys.get(k, 0) + 1
+        unmatched = []
+        for inst in cell.each_inst():
+            k = instance_key(inst, hashes[inst.cell_index])
+            if keys.get(k, 0):
+                keys[k] -= 1
+            else:
+                unmatched.append(inst)
+        return unmatched
+
+    def _residual(self, layout, cell, insts, info):
+        """Own shapes of ``cell`` and the flattened ``insts`` on layer ``info``."""
+        li = layout.find_layer(info)
+        region = pya.Region()
+        if li is None:
+            return region
+        region.insert(cell.shapes(li))
+        for inst in insts:
+            child = pya.Region(inst.cell.begin_shapes_rec(li))
+            for trans in inst.cell_inst.each_cplx_trans():
+                region += child.transformed(trans)
+        return region
+
+    def _xor(self, node, marker, old_cell, old_insts, new_cell, new_insts):
+        """Tiled XOR of the residual geometry, skipping tiles where the whole cells have equal content hashes."""
+        residuals = [(info, self._residual(self.old, old_cell, old_insts, info),
+                      self._residual(self.new, new_cell, new_insts, info)) for info in self.infos]
+        bbox = pya.Box()
+        for _, a, b in residuals:
+            bbox += a.bbox() + b.bbox()
+        if bbox.empty():
+            return
+        area = 0
+        nx, ny = math.ceil(bbox.width() / self.tile) or 1, math.ceil(bbox.height() / self.tile) or 1
+        for i in range(nx):
+            for j in range(ny):
+                tile = pya.Box(bbox.left + i * self.tile, bbox.bottom + j * self.tile,
+                               min(bbox.left + (i + 1) * self.tile, bbox.right),
+                               min(bbox.bottom + (j + 1) * self.tile, bbox.top))
+                if box_hash(old_cell, tile, self.old_hashes) == box_hash(new_cell, tile, self.new_hashes):
+                    continue
+                differs = False
+                window = pya.Region(tile)
+                for info, a, b in residuals:
+                    xor = (a & window) ^ (b & window)
+                    if not xor.is_empty():
+                        differs = True
+                        area += xor.area()
+                        marker.shapes(self.markers.layer(info)).insert(xor)
+                if differs:
+                    node["tiles"] += 1
+                    marker.shapes(self.marker_layer).insert(tile)
+        node["area"] = area * self.old.dbu**2
+
+
+def diff_cells(old_cell, new_cell, tile=500.0):
+    """Geometry difference of two revisions of a cell, e.g. a chip before and after a change.
+
+    Geometry content hashes (see ``cell_hashes``) are computed bottom-up for both layouts. Identical subtrees are
+    skipped immediately: instances with equal hash and placement cancel out, and the remaining placements are paired
+    by instance name (or cell name without variant suffix). Pairs at the same position are compared recursively,
+    each distinct pair of cells once; pairs at different positions are moved instances. What is left of a differing
+    cell, its own shapes and the moved, added or removed instances, is XORed per layer in tiles of ``tile`` µm,
+    skipping tiles whose content hashes (``box_hash``) are equal in both cells.
+
+    ``area`` is the XOR area of the residual geometry of one cell, and ``total_area`` the sum of the areas of a
+    cell and its changed children. It is not the area of a flat XOR of the two cells: where changed siblings (or a
+    child and the residual of its parent) overlap, the overlap is counted once for each of them, and changes that
+    cancel each other between different cells are counted too. It is the amount of changed geometry to review.
+
+    Returns:
+        tuple of the marker layout, its top cell (hierarchical like the changed-cell tree, with the XOR on the
+        original layers and the differing tiles on ``MARKER_LAYER``) and the changed-cell tree, or None if the cells
+        are identical. A tree node has the cell ``name``, the ``old`` cell name, the XOR ``area`` (µm²) of its own
+        residual geometry and ``total_area`` including its changed children, the number of differing ``tiles``, the
+        ``changed`` child nodes (with their ``instance`` name), the ``moved`` instances (``instance``, ``from`` and
+        ``to`` transformations and the ``changed`` node of their cell, None if only moved) and the ``added`` and
+        ``removed`` instances
+    """
+    markers = pya.Layout()
+    markers.dbu = new_cell.layout().dbu
+    diff = _Diff(old_cell.layout(), new_cell.layout(), tile, markers)
+    tree = diff.compare(old_cell, new_cell)
+    top = markers.create_cell("DIFF")
+    if tree is not None:
+        top.insert(pya.CellInstArray(diff.marker_cells[(old_cell.cell_index(), new_cell.cell_index())].cell_index(),
+                                     pya.Trans()))
+    return markers, top, tree
@@ -0,0 +1,142 @@
+import json
+
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.util.geometry import cell_ports
+
+AREA_LAYER = (130, 3)  # chip metal area, as in ``export_chip_gds``
+GAP_LAYER = (130, 1)  # etched gap
+PROBE_DISTANCE = 1.0  # µm from a port into the conductor
+
+
+class _Netlist:
+    """Hierarchical metal connectivity of ``cell`` using ``LayoutToNetlist`` in deep mode."""
+
+    def __init__(self, cell, area_layer, gap_layer):
+        layout = cell.layout()
+        self.l2n = pya.LayoutToNetlist(pya.RecursiveShapeIterator(layout, cell, []))
+        area = self.l2n.make_polygon_layer(layout.layer(*area_layer), "area")
+        gap = self.l2n.make_polygon_layer(layout.layer(*gap_layer), "gap")
+        if area.is_empty():
+            # element cells have no chip area, take the extent of their gaps as the ground plane, in a deep layer so
+            # that the metal stays hierarchical
+            area = self.l2n.make_layer("ground")
+            area.insert(gap.bbox())
+        self.metal = area - gap
+        self.l2n.register(self.metal, "metal")
+        self.l2n.connect(self.metal)
+        self.l2n.extract_netlist()
+        bbox = area.bbox().to_dtype(layout.dbu).enlarged(-PROBE_DISTANCE, -PROBE_DISTANCE)
+        self.ground = {self.probe(p) for p in (bbox.p1, bbox.p2, pya.DPoint(bbox.left, bbox.top),
+                                               pya.DPoint(bbox.right, bbox.bottom))} - {None}
+
+    def probe(self, point):
+        net = self.l2n.probe_net(self.metal, point)
+        return None if net is None else (net.circuit().name, net.cluster_id)
+
+    def probe_port(self, point, direction):
+        """Net of the conductor ending at a port, probed just inside the element."""
+        return self.probe(point - direction * PROBE_DISTANCE)
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, key):
+        self.parent.setdefault(key, key)
+        while self.parent[key] != key:
+            self.parent[key] = self.parent[self.parent[key]]
+            key = self.parent[key]
+        return key
+
+    def union(self, a, b):
+        self.parent[self.find(a)] = self.find(b)
+
+
+def extract_netlist(cell, area_layer=AREA_LAYER, gap_layer=GAP_LAYER, tolerance=0.01):
+    """Nets connecting the ports of the instances in ``cell``, checked against the extracted metal connectivity.
+
+    The intended connectivity is built hierarchically: the ports of every distinct child cell are grouped by the
+    metal nets of that cell, which is extracted once however many times the cell is placed, and ports of different
+    instances at the same position (within ``tolerance`` µm) are joined. Ports connected only through the ground of
+    a cell (e.g. a shorted flux line) are not joined with each other, but their net is marked ``grounded``.
+
+    Each intended net is then compared with the metal connectivity of the whole chip, extracted hierarchically in
+    ``LayoutToNetlist`` deep mode:
+
+    * ``opens``: nets whose ports lie on different metal nets, and ports not connected to anything
+    * ``shorts``: pairs of nets on the same metal net other than ground
+
+    Returns:
+        dictionary with ``nets`` (list of ``{"name", "ports", "grounded"}``, where ``ports`` maps the names of ports of
+        named instances, e.g. ``Q0_port_fluxline``, to their positions), ``opens`` and ``shorts``
+    """
+    cell_netlists = {}
+    uf = _UnionFind()
+    ports = {}  # key -> (name, point, direction)
+    grounded = set()
+    by_position = {}
+    index = 0
+    for inst in cell.each_inst():
+        child = inst.cell
+        if child.cell_index() not in cell_netlists:
+            child_ports = cell_ports(child)
+            netlist = _Netlist(child, area_layer, gap_layer) if child_ports else None
+            nets = {name: netlist.probe_port(*port) for name, port in child_ports.items()} if netlist else {}
+            cell_netlists[child.cell_index()] = (child_ports, nets, netlist.ground if netlist else set())
+        child_ports, nets, ground = cell_netlists[child.cell_index()]
+        inst_name = inst.property("id")
+        for trans in inst.dcell_inst.each_cplx_trans():
+            index += 1
+            owners = {}
+            for name, (point, direction) in child_ports.items():
+                key = (index, name)
+                ports[key] = (f"{inst_name}_{name}" if inst_name else None, trans * point, trans * direction)
+                uf.find(key)
+                if nets[name] in ground:
+                    grounded.add(key)
+                elif nets[name] is not None:
+                    uf.union(key, owners.setdefault(nets[name], key))
+                position = trans * point
+                by_position.setdefault((round(position.x / tolerance), round(position.y / tolerance)), []).append(key)
+
+    dangling = []
+    for keys in by_position.values():
+        for key in keys[1:]:
+            uf.union(key, keys[0])
+        if len(keys) == 1:
+            dangling.append(keys[0])
+
+    chip = _Netlist(cell, area_layer, gap_layer)
+    groups = {}
+    for key in ports:
+        groups.setdefault(uf.find(key), []).append(key)
+    result = {"nets": [], "opens": [], "shorts": []}
+    metal_nets = {}
+    for i, keys in enumerate(sorted(groups.values(), key=lambda ks: min(ks))):
+        name = f"net{i}"
+        probed = {chip.probe_port(ports[k][1], ports[k][2]) for k in keys} - {None}
+        result["nets"].append({
+            "name": name,
+            "ports": {ports[k][0]: [ports[k][1].x, ports[k][1].y] for k in sorted(keys) if ports[k][0]},
+            "grounded": any(k in grounded for k in keys) or bool(probed & chip.ground),
+        })
+        if len(probed) > 1:
+            result["opens"].append({"net": name, "metal_nets": len(probed)})
+        for metal_net in probed - chip.ground:
+            if metal_net in metal_nets:
+                result["shorts"].append([metal_nets[metal_net], name])
+            metal_nets.setdefault(metal_net, name)
+    for key in dangling:
+        if key not in grounded and ports[key][0]:
+            result["opens"].append({"port": ports[key][0]})
+    return result
+
+
+def export_netlist(filename, cell, **kwargs):
+    """Write ``extract_netlist`` of ``cell`` to a JSON file and return it."""
+    netlist = extract_netlist(cell, **kwargs)
+    with open(filename, "w") as f:
+        json.dump(netlist, f, indent=2)
+    return netlist
@@ -0,0 +1,69 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.util.build import build_cell, class_path, element_class, params_hash
+
+
+def _build_job(cls, params):
+    """Build one cell in its own layout in a worker process and return its name, OASIS bytes and build time."""
+    start = time.perf_counter()
+    layout, cell = build_cell(cls, **params)
+    options = pya.SaveLayoutOptions()
+    options.format = "OASIS"
+    options.add_cell(cell.cell_index())
+    return cell.name, layout.write_bytes(options), time.perf_counter() - start
+
+
+def merge_cell(layout, name, data):
+    """Copy the cell tree in OASIS ``data`` into ``layout`` as a new static cell named ``name`` (made unique)."""
+    source = pya.Layout()
+    source.read_bytes(data, pya.LoadLayoutOptions())
+    target = layout.create_cell(name)
+    target.copy_tree(source.top_cell())
+    return target
+
+
+def build_cells(layout, requests, workers=None):
+    """Build the distinct cells of ``requests`` in parallel and merge them into ``layout``.
+
+    Every worker process builds its cells in a layout of its own, which is passed back as OASIS and copied into
+    ``layout`` with ``Cell.copy_tree``, so the merged cells are static (not PCell variants). Requests with the same
+    class and parameters are built once.
+
+    Args:
+        layout: layout to merge the cells into
+        requests: list of ``(cls, params)``, ``cls`` an element class or its dotted path and ``params`` picklable
+        workers: number of processes, by default the number of cores; 1 builds serially in this process
+
+    Returns:
+        tuple of a dictionary of ``params_hash(cls, params)`` to merged cell and a report with the number of
+        ``cells`` built, the ``workers``, the summed ``build_time`` of the workers and the ``elapsed`` time (s)
+    """
+    start = time.perf_counter()
+    distinct = {}
+    for cls, params in requests:
+        cls = element_class(cls)
+        distinct.setdefault(params_hash(cls, params), (class_path(cls), params))
+    keys = list(distinct)
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(keys) < 2:
+        results = [_build_job(*distinct[key]) for key in keys]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_build_job, *zip(*(distinct[key] for key in keys))))
+    cells = {key: merge_cell(layout, name, data) for key, (name, data, _) in zip(keys, results)}
+    report = {"cells": len(keys), "workers": workers, "build_time": sum(t for _, _, t in results),
+              "elapsed": time.perf_counter() - start}
+    return cells, report
+
+
+def scaling(requests, worker_counts=None):
+    """Elapsed time of :func:`build_cells` for ``requests`` by number of workers, and the speedup over the first
+    of ``worker_counts`` (by default 1, powers of two and the number of cores)."""
+    worker_counts = worker_counts or sorted({1, *(2**i for i in range(os.cpu_count().bit_length()))} |
+                                            {os.cpu_count()})
+    elapsed = {workers: build_cells(pya.Layout(), requests, workers)[1]["elapsed"] for workers in worker_counts}
+    return {workers: {"elapsed": t, "speedup": elapsed[worker_counts[0]] / t} for workers, t in elapsed.items()}
@@ -0,0 +1,82 @@
+import re
+
+import numpy as np
+
+from kqcircuits.scq_layout.util.constraints import feasible
+
+
+def param_key(name):
+    """Split a tuned parameter name like ``"island1_extent[1]"`` into the Param name and list index (or None)."""
+    match = re.fullmatch(r"(\w+)\[(\d+)\]", name)
+    return (match.group(1), int(match.group(2))) if match else (name, None)
+
+
+class ParamSpace:
+    """Box of tuned Params of an element, mapping points (arrays in the order of ``bounds``) to Param dictionaries.
+
+    Args:
+        cls: element class
+        bounds: dictionary of tuned Param to ``(low, high)``; list Params are indexed as ``"island1_extent[1]"``
+        fixed: other non-default Params
+    """
+
+    def __init__(self, cls, bounds, fixed=None):
+        self.cls = cls
+        self.names = list(bounds)
+        self.bounds = np.array([bounds[name] for name in self.names], dtype=float)
+        self.fixed = fixed or {}
+        self.defaults = self.point({})
+
+    def params(self, x):
+        """Full parameter dictionary of the point ``x``."""
+        schema = self.cls.get_schema()
+        params = dict(self.fixed)
+        for name, value in zip(self.names, x):
+            key, index = param_key(name)
+            if index is not None:
+                values = list(params.get(key, schema[key].default))
+                values[index] = float(value)
+                params[key] = values
+            else:
+                params[key] = float(value)
+        return params
+
+    def point(self, params):
+        """Point of a parameter dictionary, with the defaults of the element for missing Params."""
+        schema = self.cls.get_schema()
+        x = []
+        for name in self.names:
+            key, index = param_key(name)
+            value = params.get(key, schema[key].default)
+            x.append(float(value if index is None else value[index]))
+        return np.array(x)
+
+    def contains(self, x):
+        return bool(np.all((x >= self.bounds[:, 0]) & (x <= self.bounds[:, 1])))
+
+    def feasible(self, xs):
+        """Which of the points ``xs`` satisfy the ``CONSTRAINTS`` of the element, checked at once without building."""
+        schema = self.cls.get_schema()
+        params = dict(self.fixed)
+        for column, name in enumerate(self.names):
+            key, index = param_key(name)
+            if index is None:
+                params[key] = xs[:, column]
+            else:
+                if np.ndim(params.get(key)) != 2:
+                    params[key] = np.tile(np.asarray(params.get(key, schema[key].default), dtype=float), (len(xs), 1))
+                params[key][:, index] = xs[:, column]
+        return np.broadcast_to(feasible(self.cls, params), len(xs))
+
+    def sample(self, n, rng):
+        """Latin hypercube sample of ``n`` points."""
+        u = (np.argsort(rng.random((len(self.names), n)), axis=1).T + rng.random((n, len(self.names)))) / n
+        return self.bounds[:, 0] + u * (self.bounds[:, 1] - self.bounds[:, 0])
+
+    def uniform(self, n, rng):
+        """``n`` independent uniformly distributed points."""
+        return self.bounds[:, 0] + rng.random((n, len(self.names))) * (self.bounds[:, 1] - self.bounds[:, 0])
+
+    def unit(self, x):
+        """Point scaled to the unit box."""
+        return (np.asarray(x) - self.bounds[:, 0]) / (self.bounds[:, 1] - self.bounds[:, 0])
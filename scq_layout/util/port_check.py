@@ -0,0 +1,130 @@
+import math
+
+import numpy as np
+
+from kqcircuits.defaults import default_layers
+
+from kqcircuits.scq_layout.util.geometry import center_lines, cell_ports, transform_points
+
+CAPTURE_RADIUS = 5.0  # µm, terminals farther apart are not considered connected
+ANGLE_TOLERANCE = 0.01  # degrees
+
+
+class _Terminals:
+    """Names, positions, outward directions and kinds (waveguide end or port) of connection terminals (µm)."""
+
+    def __init__(self, names=(), points=None, directions=None, waveguide=None):
+        self.names = list(names)
+        self.points = np.zeros((0, 2)) if points is None else np.asarray(points, dtype=float).reshape(-1, 2)
+        self.directions = np.zeros((0, 2)) if directions is None else np.asarray(directions, dtype=float).reshape(-1, 2)
+        self.waveguide = np.zeros(0, dtype=bool) if waveguide is None else np.asarray(waveguide, dtype=bool)
+
+    def transformed(self, trans, prefix):
+        points = transform_points(self.points, trans)
+        directions = (transform_points(self.points + self.directions, trans) - points) / trans.mag
+        return _Terminals([f"{prefix}{name}" for name in self.names], points, directions, self.waveguide)
+
+    @staticmethod
+    def concatenate(parts):
+        return _Terminals([name for part in parts for name in part.names],
+                          np.concatenate([part.points for part in parts]) if parts else None,
+                          np.concatenate([part.directions for part in parts]) if parts else None,
+                          np.concatenate([part.waveguide for part in parts]) if parts else None)
+
+
+def _waveguide_ends(cell, segments):
+    """Ends of the center line ``segments`` of a waveguide cell, named after its own nearest ports if any."""
+    keys = [tuple(np.round(point, 3)) for point in segments.reshape(-1, 2)]
+    counts = {}
+    for key in keys:
+        counts[key] = counts.get(key, 0) + 1
+    ports = cell_ports(cell)
+    names, points, directions = [], [], []
+    for i, key in enumerate(keys):
+        if counts[key] == 1:
+            point, inner = segments.reshape(-1, 2)[i], segments.reshape(-1, 2)[i ^ 1]
+            near = [name for name, (p, _) in ports.items()
+                    if math.hypot(p.x - point[0], p.y - point[1]) < CAPTURE_RADIUS]
+            names.append(near[0] if near else f"end{len(names)}")
+            points.append(point)
+            directions.append((point - inner) / np.hypot(*(point - inner)))
+    return _Terminals(names, points, directions, [True] * len(names))
+
+
+def _terminals(cell, path_layer, cache):
+    """Terminals of ``cell``: the ends of a waveguide cell, otherwise its own ports and those of its descendants."""
+    if cell.cell_index() not in cache:
+        segments = center_lines(cell, path_layer)
+        if len(segments):
+            cache[cell.cell_index()] = _waveguide_ends(cell, segments)
+        else:
+            ports = cell_ports(cell)
+            parts = [_Terminals(ports, [(p.x, p.y) for p, _ in ports.values()],
+                                [(d.x, d.y) for _, d in ports.values()], [False] * len(ports))]
+            parts += _placed(cell, path_layer, cache, "/")
+            cache[cell.cell_index()] = _Terminals.concatenate(parts)
+    return cache[cell.cell_index()]
+
+
+def _placed(cell, path_layer, cache, separator):
+    """Terminals of every placement of the children of ``cell``, prefixed with the instance name."""
+    parts = []
+    for inst in cell.each_inst():
+        terminals = _terminals(inst.cell, path_layer, cache)
+        if terminals.names:
+            for trans in inst.dcell_inst.each_cplx_trans():
+                parts.append(terminals.transformed(trans, f"{inst.property('id') or inst.cell.name}{separator}"))
+    return parts
+
+
+def check_ports(cell, tolerance=None, angle_tolerance=ANGLE_TOLERANCE, capture_radius=CAPTURE_RADIUS, face="1t1"):
+    """Alignment of the waveguides placed in ``cell`` with the element ports they connect to.
+
+    Waveguide ends are the free ends of the center line paths of every waveguide instance, element ports the
+    refpoints with a ``_corner`` refpoint of all other instances and of their descendants, so a port copied by hand
+    to a qubit (e.g. ``port_fluxline``) is compared with the port of the flux line it was copied from. Terminals
+    are put into a spatial hash of ``capture_radius`` cells, and every waveguide end is compared with all terminals
+    within ``capture_radius`` of it. Connected terminals should coincide and face each other.
+
+    Args:
+        cell: chip cell
+        tolerance: maximum position offset (µm), by default one database unit
+        angle_tolerance: maximum direction mismatch (degrees)
+        capture_radius: maximum distance (µm) of terminals considered connected
+        face: face of the waveguide center lines
+
+    Returns:
+        dictionary with the number of waveguide ``ends`` and ``connections``, the ``misaligned`` connections
+        ``{"end", "terminal", "position", "offset", "angle"}`` (offset in µm, angle in degrees) and the waveguide ends
+        without any terminal in reach in ``unconnected``
+    """
+    layout = cell.layout()
+    tolerance = layout.dbu if tolerance is None else tolerance
+    cache = {}
+    path_layer = layout.layer(default_layers[f"{face}_waveguide_path"])
+    terminals = _Terminals.concatenate(_placed(cell, path_layer, cache, "_"))
+
+    grid = {}
+    for i, key in enumerate(map(tuple, np.floor(terminals.points / capture_radius).astype(int))):
+        grid.setdefault(key, []).append(i)
+    report = {"ends": int(terminals.waveguide.sum()), "connections": 0, "misaligned": [], "unconnected": []}
+    for i in np.nonzero(terminals.waveguide)[0]:
+        cx, cy = np.floor(terminals.points[i] / capture_radius).astype(int)
+        near = np.array([j for dx in (-1, 0, 1) for dy in (-1, 0, 1) for j in grid.get((cx + dx, cy + dy), ())
+                         if j != i], dtype=int)
+        near = near[np.hypot(*(terminals.points[near] - terminals.points[i]).T) < capture_radius] if len(near) else near
+        if not len(near):
+            report["unconnected"].append(terminals.names[i])
+        connected = near[~terminals.waveguide[near] | (near > i)]  # waveguide pairs are checked from their first end
+        offsets = np.hypot(*(terminals.points[connected] - terminals.points[i]).T)
+        report["connections"] += len(connected)
+        cosines = np.clip(-terminals.directions[connected] @ terminals.directions[i], -1, 1)
+        angles = np.degrees(np.arccos(cosines))
+        reported = set()
+        for j, offset, angle in zip(connected, offsets, angles):
+            if (offset > tolerance or angle > angle_tolerance) and terminals.names[j] not in reported:
+                reported.add(terminals.names[j])  # cells placed twice at the same position
+                report["misaligned"].append({"end": terminals.names[i], "terminal": terminals.names[j],
+                                             "position": terminals.points[i].tolist(), "offset": float(offset),
+                                             "angle": float(angle)})
+    return report
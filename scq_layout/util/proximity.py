@@ -0,0 +1,147 @@
+import math
+
+import numpy as np
+
+from kqcircuits.defaults import default_layers
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.util.ebeam import fracture
+from kqcircuits.scq_layout.util.geometry import JUNCTION_LAYERS
+
+
+class PointSpreadFunction:
+    """Double Gaussian e-beam point spread function, ``(exp(-r²/α²)/(πα²) + η exp(-r²/β²)/(πβ²)) / (1 + η)``.
+
+    Args:
+        alpha: forward scattering range (µm)
+        beta: backscattering range (µm)
+        eta: ratio of backscattered to forward scattered energy
+    """
+
+    def __init__(self, alpha=0.02, beta=30.0, eta=0.7):
+        self.alpha = alpha
+        self.beta = beta
+        self.eta = eta
+
+
+def _raster(region, box, pixel):
+    """Coverage (0 to 1) of ``region`` on a grid of ``pixel`` (dbu) starting at the corner of ``box`` (dbu)."""
+    nx, ny = math.ceil(box.width() / pixel) + 1, math.ceil(box.height() / pixel) + 1
+    area = region.rasterize(box.p1, pya.Vector(pixel, pixel), nx, ny)
+    return np.array(area, dtype=float) / pixel**2
+
+
+def _blur(raster, pixel, sigma):
+    """Convolution of ``raster`` with ``exp(-r²/σ²)/(πσ²)`` by FFT, ``pixel`` and ``sigma`` in the same unit."""
+    fy = np.fft.fftfreq(raster.shape[0], pixel)[:, None]
+    fx = np.fft.rfftfreq(raster.shape[1], pixel)[None, :]
+    transfer = np.exp(-((np.pi * sigma) ** 2) * (fx**2 + fy**2))
+    return np.fft.irfft2(np.fft.rfft2(raster) * transfer, raster.shape)
+
+
+def _sample(image, box, pixel, points):
+    """Bilinear interpolation of a raster from :func:`_raster` at ``points`` (dbu)."""
+    x = np.array([(p.x - box.left) / pixel - 0.5 for p in points])
+    y = np.array([(p.y - box.bottom) / pixel - 0.5 for p in points])
+    x0 = np.clip(np.floor(x).astype(int), 0, image.shape[1] - 2)
+    y0 = np.clip(np.floor(y).astype(int), 0, image.shape[0] - 2)
+    fx, fy = np.clip(x - x0, 0, 1), np.clip(y - y0, 0, 1)
+    return ((1 - fy) * ((1 - fx) * image[y0, x0] + fx * image[y0, x0 + 1])
+            + fy * ((1 - fx) * image[y0 + 1, x0] + fx * image[y0 + 1, x0 + 1]))
+
+
+def _edge_points(edge, step, samples):
+    """Up to ``samples`` points evenly spread along ``edge``, at least ``step`` apart."""
+    n = max(1, min(samples, math.ceil(edge.length() / step)))
+    return [edge.p1 + (edge.p2 - edge.p1) * ((i + 0.5) / n) for i in range(n)]
+
+
+def dose_factors(cell, psf=None, layers=JUNCTION_LAYERS, face="1t1", samples=8):
+    """Dose factors of the fractured e-beam shapes of ``cell`` itself (not of its children).
+
+    All ``layers`` expose the same resist, so their union is the pattern. The backscattered exposure ``B`` is the
+    pattern convolved with the β Gaussian on a grid of β/4 over the cell, and the forward exposure ``F`` the pattern
+    convolved with the α Gaussian on a grid of α/2 in a small window around each sample point, both by FFT. Each
+    trapezoid edge on the pattern outline is sampled at up to ``samples`` points. The dose of a trapezoid brings its
+    outline to the development threshold of a large pattern edge, ``(1 + η) / (2 (F + η B))`` with ``F`` and ``B``
+    averaged over the samples, i.e. 1 for a large pattern and ``1 + η`` for an isolated wide line.
+
+    Returns:
+        dictionary of layer name to list of ``(trapezoid, dose factor)``
+    """
+    psf = psf or PointSpreadFunction()
+    layout = cell.layout()
+    dbu = layout.dbu
+    regions = {name: pya.Region(cell.shapes(layout.layer(default_layers[f"{face}_{name}"]))) for name in layers}
+    pattern = pya.Region()
+    for region in regions.values():
+        pattern += region
+    pattern.merge()
+    if pattern.is_empty():
+        return {name: [] for name in layers}
+    outline = pattern.edges()
+
+    back_pixel = max(1, round(psf.beta / 4 / dbu))
+    back_box = pattern.bbox().enlarged(3 * psf.beta / dbu, 3 * psf.beta / dbu)
+    back = _blur(_raster(pattern, back_box, back_pixel), back_pixel, psf.beta / dbu)
+    fore_pixel = max(1, round(psf.alpha / 2 / dbu))
+    margin = math.ceil(3 * psf.alpha / dbu) + 2 * fore_pixel
+
+    result = {}
+    for name, region in regions.items():
+        result[name] = []
+        for trapezoid in fracture(region):
+            points = [point for edge in (pya.Edges(trapezoid) & outline).each()
+                      for point in _edge_points(edge, fore_pixel, samples)]
+            if points:
+                forward = []
+                for point in points:
+                    window = pya.Box(point, point).enlarged(margin, margin)
+                    image = _blur(_raster(pattern, window, fore_pixel), fore_pixel, psf.alpha / dbu)
+                    forward.append(_sample(image, window, fore_pixel, [point])[0])
+                f = np.mean(forward)
+            else:
+                f, points = 0.5, [trapezoid.bbox().center()]  # inside a larger pattern, as at a large pattern edge
+            b = np.mean(_sample(back, back_box, back_pixel, points))
+            result[name].append((trapezoid, float((1 + psf.eta) / (2 * (f + psf.eta * b)))))
+    return result
+
+
+def proximity_correct(cell, psf=None, dose_step=0.02, layers=JUNCTION_LAYERS, face="1t1", samples=8):
+    """E-beam layers of ``cell`` with proximity corrected doses, in a new layout.
+
+    Dose factors (see :func:`dose_factors`) are computed once per distinct cell and the trapezoids are put into dose
+    classes: a trapezoid of layer ``L/D`` and dose factor ``d`` goes to layer ``L`` with datatype
+    ``round(d / dose_step)``, so the dose of datatype ``n`` is ``n * dose_step``. Only the dose class layers are
+    kept, in the hierarchy of ``cell``. Proximity between shapes of different cells is not taken into account.
+
+    Returns:
+        tuple of the new layout, the corrected cell and a report with the ``doses`` of the classes used, the number of
+        ``shapes`` per class and the dose range per distinct cell in ``cells``
+    """
+    layout = pya.Layout()
+    layout.dbu = cell.layout().dbu
+    top = layout.create_cell(cell.name)
+    top.copy_tree(cell)
+    infos = {name: layout.get_info(layout.layer(default_layers[f"{face}_{name}"])) for name in layers}
+    corrected = {}
+    for c in layout.each_cell():
+        doses = dose_factors(c, psf, layers, face, samples)
+        if any(doses.values()):
+            corrected[c.cell_index()] = doses
+    for li in layout.layer_indexes():
+        layout.clear_layer(li)
+
+    report = {"doses": {}, "shapes": {}, "cells": {}}
+    for cell_index, doses in corrected.items():
+        c = layout.cell(cell_index)
+        factors = [dose for shapes in doses.values() for _, dose in shapes]
+        report["cells"][c.name] = [min(factors), max(factors)]
+        for name, shapes in doses.items():
+            for trapezoid, dose in shapes:
+                datatype = round(dose / dose_step)
+                c.shapes(layout.layer(infos[name].layer, datatype)).insert(trapezoid)
+                key = f"{infos[name].layer}/{datatype}"
+                report["doses"][key] = round(datatype * dose_step, 6)
+                report["shapes"][key] = report["shapes"].get(key, 0) + 1
+    return layout, top, report
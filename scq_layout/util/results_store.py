@@ -0,0 +1,281 @@
+import json
+import numbers
+import os
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from kqcircuits.scq_layout.util.build import class_path, element_class, params_hash, polygon_count, vertex_count
+from kqcircuits.scq_layout.util.geometry import cell_ports
+
+HASH_DTYPE = np.dtype("S40")  # hex digest of ``params_hash``
+NUMBER_DTYPE = np.dtype("<f8")  # missing values are NaN
+CODE_DTYPE = np.dtype("<i4")  # strings are dictionary encoded, missing values are -1
+
+
+def flatten(record):
+    """Flat columns of a nested ``record``: ``{"params": {"r": 5, "size": [1, 2]}}`` gives ``params.r``,
+    ``params.size.0`` and ``params.size.1``."""
+    columns = {}
+
+    def visit(prefix, value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                visit(f"{prefix}.{key}" if prefix else str(key), item)
+        elif isinstance(value, (list, tuple)):
+            for i, item in enumerate(value):
+                visit(f"{prefix}.{i}", item)
+        else:
+            columns[prefix] = value
+
+    visit("", record)
+    return columns
+
+
+def cell_record(cls, params, cell, time=None):
+    """Record of a built variant: class, parameter hash and Params, geometric metrics, ports and build time."""
+    cls = element_class(cls)
+    bbox = cell.dbbox()
+    return {
+        "cell": class_path(cls),
+        "hash": params_hash(cls, params),
+        "params": params,
+        "metrics": {"polygons": polygon_count(cell), "vertices": vertex_count(cell), "width": bbox.width(),
+                    "height": bbox.height()},
+        "ports": {name: [point.x, point.y] for name, (point, _) in cell_ports(cell).items()},
+        "time": time,
+    }
+
+
+def _kind(name, value):
+    """Kind of a column value, ``"str"``, ``"number"`` or None if missing."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return "str"
+    if isinstance(value, numbers.Real) and name != "hash":
+        return "number"
+    raise TypeError(f"Unsupported value {value!r} of column '{name}'")
+
+
+class _Segment:
+    """Column files of one writer, read through memory maps up to the committed number of rows."""
+
+    def __init__(self, path):
+        self.path = path
+        self.meta = json.loads((path / "meta.json").read_text())
+        self.rows = self.meta["rows"]
+
+    def dtype(self, column):
+        return np.dtype(self.meta["columns"][column])
+
+    def column(self, column, raw=False):
+        """Memory mapped column, strings decoded unless ``raw``; all missing if this segment lacks it."""
+        if column not in self.meta["columns"]:
+            return np.full(self.rows, np.nan)
+        dtype = self.dtype(column)
+        if self.rows == 0:
+            values = np.zeros(0, dtype)
+        else:
+            values = np.memmap(self.path / self.meta["files"][column], dtype, mode="r", shape=(self.rows,))
+        if dtype == CODE_DTYPE and not raw:
+            words = np.array(self.meta["dictionaries"][column] + [None], dtype=object)
+            return words[values]
+        return values
+
+    def find(self, digests):
+        """Rows holding any of ``digests``, by binary search in the index and a scan of rows not indexed yet."""
+        indexed = self.meta.get("indexed", 0)
+        rows = []
+        if indexed:
+            order = np.memmap(self.path / "hash.order", np.dtype("<i8"), mode="r", shape=(indexed,))
+            hashes = np.memmap(self.path / "hash.sorted", HASH_DTYPE, mode="r", shape=(indexed,))
+            lo, hi = np.searchsorted(hashes, digests, "left"), np.searchsorted(hashes, digests, "right")
+            rows.extend(order[i] for a, b in zip(lo, hi) for i in range(a, b))
+        if indexed < self.rows:
+            tail = self.column("hash")[indexed:]
+            rows.extend(indexed + np.nonzero(np.isin(tail, digests))[0])
+        return np.sort(np.array(rows, dtype=int))
+
+
+class ResultsWriter:
+    """Appends records to a segment of its own in a :class:`ResultsStore`.
+
+    Rows are buffered and appended to the column files every ``batch`` records; the row count in ``meta.json`` is
+    replaced atomically after the columns are written, so readers never see partial rows. Closing the writer
+    writes the parameter hash index of the segment.
+
+    Column files are numbered, ``meta.json`` maps column names to them, so any name is allowed. A column holds
+    either numbers or strings, set by its first value: a record with a value of the other kind is rejected with
+    ``ValueError`` when it is appended, before anything is written. Only a column of missing values so far takes
+    strings later, it is then converted to a string column.
+    """
+
+    def __init__(self, root, batch=1024):
+        self.path = Path(root) / f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+        self.path.mkdir(parents=True)
+        self.batch = batch
+        self.meta = {"rows": 0, "columns": {}, "files": {}, "dictionaries": {}, "indexed": 0}
+        self._kinds = {}
+        self._words = {}
+        self._buffer = []
+        self._files = 0
+        self._commit()
+
+    def append(self, record):
+        """Append a (nested) record, see :func:`flatten`. Its ``hash`` column is the parameter hash.
+
+        Raises:
+            TypeError: for values other than numbers, strings and None
+            ValueError: for an empty column name or a value whose kind differs from the earlier values of its column
+        """
+        row = flatten(record)
+        kinds = {}
+        for name, value in row.items():
+            if not name:
+                raise ValueError(f"Record {record!r} has a value without a column name")
+            kind = _kind(name, value)
+            if kind is not None and self._kinds.get(name, kind) != kind:
+                raise ValueError(f"Column '{name}' holds {self._kinds[name]} values, got {value!r}")
+            kinds[name] = kind
+        for name, kind in kinds.items():
+            if kind is not None:
+                self._kinds.setdefault(name, kind)
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        rows = self.meta["rows"]
+        names = list(dict.fromkeys(name for row in self._buffer for name in row))
+        for name in names:
+            if name not in self.meta["columns"]:
+                self._add_column(name)
+            elif self._kinds.get(name) == "str" and np.dtype(self.meta["columns"][name]) == NUMBER_DTYPE:
+                self._add_column(name)  # only missing values so far, replaced by a string column
+        for name, dtype in self.meta["columns"].items():
+            values = [row.get(name) for row in self._buffer]
+            with open(self.path / self.meta["files"][name], "ab") as f:
+                f.write(self._encode(name, np.dtype(dtype), values).tobytes())
+        self.meta["rows"] = rows + len(self._buffer)
+        self._buffer = []
+        self._commit()
+
+    def close(self):
+        """Flush and index the segment by parameter hash."""
+        self.flush()
+        segment = _Segment(self.path)
+        if "hash" in self.meta["columns"] and self.meta["rows"]:
+            hashes = np.asarray(segment.column("hash"))
+            order = np.argsort(hashes, kind="stable")
+            order.astype("<i8").tofile(self.path / "hash.order")
+            hashes[order].tofile(self.path / "hash.sorted")
+            self.meta["indexed"] = self.meta["rows"]
+            self._commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _add_column(self, name):
+        """Create the file of column ``name``, missing in all rows written so far. The file of a replaced column is
+        kept, readers may still map it until they see the next commit."""
+        if name == "hash":
+            dtype = HASH_DTYPE
+        elif self._kinds.get(name) == "str":
+            dtype = CODE_DTYPE
+            self.meta["dictionaries"][name] = []
+            self._words[name] = {}
+        else:
+            dtype = NUMBER_DTYPE
+        self.meta["columns"][name] = dtype.str
+        self.meta["files"][name] = f"{self._files}.bin"
+        self._files += 1
+        self._encode(name, dtype, [None] * self.meta["rows"]).tofile(self.path / self.meta["files"][name])
+
+    def _encode(self, name, dtype, values):
+        if dtype == HASH_DTYPE:
+            return np.array([value or "" for value in values], dtype)
+        if dtype == CODE_DTYPE:
+            words, dictionary = self._words[name], self.meta["dictionaries"][name]
+            for value in values:
+                if value is not None and value not in words:
+                    words[value] = len(dictionary)
+                    dictionary.append(value)
+            return np.array([-1 if value is None else words[value] for value in values], dtype)
+        return np.array([np.nan if value is None else float(value) for value in values], dtype)
+
+    def _commit(self):
+        temp = self.path / "meta.json.tmp"
+        temp.write_text(json.dumps(self.meta))
+        os.replace(temp, self.path / "meta.json")
+
+
+class ResultsStore:
+    """Columnar on-disk store of sweep, metric and benchmark results.
+
+    A store is a directory of segments, one per :class:`ResultsWriter`, so parallel workers append to the same store
+    without locking. Every column of a segment is a flat binary file read through ``numpy.memmap``: numbers as
+    float64, strings dictionary encoded and the parameter hash as 40 bytes, with a sorted index per segment. Queries
+    run segment by segment and only map the columns they use, so stores larger than memory can be queried.
+
+    Usage::
+
+        store = ResultsStore("results")
+        with store.writer() as writer:
+            writer.append(cell_record(FloatingQubit, params, cell, time))
+        rows = store.query(lambda c: c["params.island1_r"] > 80, columns=["hash", "metrics.vertices"])
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def writer(self, batch=1024):
+        return ResultsWriter(self.root, batch)
+
+    def segments(self):
+        return [_Segment(path) for path in sorted(self.root.iterdir()) if (path / "meta.json").exists()]
+
+    def __len__(self):
+        return sum(segment.rows for segment in self.segments())
+
+    def columns(self):
+        return sorted({name for segment in self.segments() for name in segment.meta["columns"]})
+
+    def query(self, where=None, columns=None):
+        """Rows selected by ``where``, a function of a segment's columns (``c["metrics.vertices"]``) returning a
+        boolean mask, as a dictionary of ``columns`` (all by default) to arrays."""
+        columns = self.columns() if columns is None else columns
+        parts = {name: [] for name in columns}
+        for segment in self.segments():
+            mask = slice(None) if where is None else np.asarray(where(_Columns(segment)), dtype=bool)
+            for name in columns:
+                parts[name].append(np.asarray(segment.column(name)[mask]))
+        return {name: np.concatenate(values) if values else np.zeros(0) for name, values in parts.items()}
+
+    def find(self, digests, columns=None):
+        """Rows of the given parameter hashes (one or a list), using the hash index of each segment."""
+        digests = np.sort(np.atleast_1d(np.array(digests, dtype=HASH_DTYPE)))
+        columns = self.columns() if columns is None else columns
+        parts = {name: [] for name in columns}
+        for segment in self.segments():
+            rows = segment.find(digests)
+            for name in columns:
+                parts[name].append(np.asarray(segment.column(name)[rows]))
+        return {name: np.concatenate(values) if values else np.zeros(0) for name, values in parts.items()}
+
+
+class _Columns:
+    """Lazy column access of a segment for ``where`` functions."""
+
+    def __init__(self, segment):
+        self.segment = segment
+
+    def __getitem__(self, name):
+        return self.segment.column(name)
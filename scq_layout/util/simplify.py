@@ -0,0 +1,85 @@
+from kqcircuits.defaults import default_layers
+from kqcircuits.elements.element import get_refpoints
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.util.build import vertex_count
+from kqcircuits.scq_layout.util.geometry import JUNCTION_LAYERS
+
+
+def _vertices(region):
+    return sum(polygon.num_points() for polygon in region.each())
+
+
+def _replace_junctions(cell, face, port_width):
+    """Replace the junction shapes of a SQUID cell by a lumped port path between its ``port_squid_a/b`` refpoints."""
+    layout = cell.layout()
+    junction_layers = [layout.layer(default_layers[f"{face}_{name}"]) for name in JUNCTION_LAYERS]
+    if all(cell.shapes(li).is_empty() for li in junction_layers):
+        return False
+    refpoints = get_refpoints(layout.layer(default_layers["refpoints"]), cell, rec_levels=0)
+    if "port_squid_a" not in refpoints or "port_squid_b" not in refpoints:
+        return False
+    for li in junction_layers:
+        cell.shapes(li).clear()
+    port = pya.DPath([refpoints["port_squid_a"], refpoints["port_squid_b"]], port_width)
+    cell.shapes(layout.layer(default_layers[f"{face}_ports"])).insert(port)
+    return True
+
+
+def _smooth(cell, layer, distance):
+    """Smooth the polygons of ``cell`` on ``layer`` in place, keeping texts. Returns vertex counts before and after."""
+    shapes = cell.shapes(layer)
+    polygons = [shape.polygon for shape in shapes.each() if shape.is_polygon() or shape.is_box() or shape.is_path()]
+    if not polygons:
+        return 0, 0
+    texts = [shape.text for shape in shapes.each() if shape.is_text()]
+    region = pya.Region(polygons)
+    smoothed = region.smoothed(distance, True)
+    shapes.clear()
+    shapes.insert(smoothed)
+    for text in texts:
+        shapes.insert(text)
+    return _vertices(region), _vertices(smoothed)
+
+
+def simplify(cell, tolerance=0.2, face="1t1", port_width=2.0):
+    """Copy of ``cell`` simplified for simulation export, in a new layout.
+
+    Every distinct cell of the hierarchy is processed once:
+
+    * polygons are merged and smoothed with ``Region.smoothed``, which drops vertices deviating less than
+      ``tolerance`` µm from the simplified outline, i.e. decimates arcs and merges near-collinear edges, while
+      keeping horizontal and vertical edges
+    * SQUID cells with ``port_squid_a``/``port_squid_b`` refpoints lose their junction layers, and a lumped port path
+      of ``port_width`` between these refpoints is put on the ports layer of ``face``
+
+    Returns:
+        tuple of the new layout, the simplified cell and a report with the ``vertices`` before and after
+        (``simplified_vertices``), their ``reduction`` ratio, the own vertices of each distinct cell before and after
+        in ``cells`` and the lumped ports ``[[xa, ya], [xb, yb]]`` in ``junction_ports``
+    """
+    layout = pya.Layout()
+    layout.dbu = cell.layout().dbu
+    top = layout.create_cell(cell.name)
+    top.copy_tree(cell)
+
+    report = {"vertices": vertex_count(top), "cells": {}}
+    ports_layer = layout.layer(default_layers[f"{face}_ports"])
+    kept = {layout.layer(default_layers["refpoints"]), ports_layer}
+    junction_cells = {c.cell_index() for c in layout.each_cell() if _replace_junctions(c, face, port_width)}
+    for c in layout.each_cell():
+        counts = [_smooth(c, li, tolerance / layout.dbu) for li in layout.layer_indexes() if li not in kept]
+        report["cells"][c.name] = [sum(before for before, _ in counts), sum(after for _, after in counts)]
+
+    report["simplified_vertices"] = vertex_count(top)
+    report["reduction"] = 1 - report["simplified_vertices"] / max(report["vertices"], 1)
+    report["junction_ports"] = []
+    it = top.begin_shapes_rec(ports_layer)
+    while not it.at_end():
+        if it.cell_index() in junction_cells and it.shape().is_path():
+            path = it.shape().dpath.transformed(it.dtrans())
+            port = [[p.x, p.y] for p in path.each_point()]
+            if port not in report["junction_ports"]:  # overlapping placements of the same SQUID
+                report["junction_ports"].append(port)
+        it.next()
+    return layout, top, report
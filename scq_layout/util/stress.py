@@ -0,0 +1,170 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from kqcircuits.scq_layout.util.build import build_cell, class_path, element_class, params_hash, vertex_count
+from kqcircuits.scq_layout.util.param_space import ParamSpace
+
+# Params known to produce degenerate geometry near the ends of their ranges
+DEFAULT_RANGES = {
+    "qubits.floating_coupler.FloatingCoupler": {"align_r": (0.5, 100), "island1_r": (0.5, 100),
+                                                "ground_gap_padding": (7, 300)},
+    "junctions.squidC.SquidC": {"twist_length": (0, 20), "arm_position": (0, 1)},
+}
+
+
+def measure(cls, params):
+    """Build ``cls`` with ``params`` in a new layout and return the build ``time`` (s), ``vertices`` and ``error``.
+
+    A PCell raising while it is produced, which KLayout only prints, is a failed build (see ``build_cell``).
+    """
+    start = time.perf_counter()
+    try:
+        _, cell = build_cell(cls, **params)
+    except Exception as e:  # pylint: disable=broad-except
+        return {"time": time.perf_counter() - start, "vertices": 0, "error": f"{type(e).__name__}: {e}"}
+    elapsed = time.perf_counter() - start
+    return {"time": elapsed, "vertices": vertex_count(cell), "error": None}
+
+
+class StressTest:
+    """Randomized search for Params of an element with pathological build times, vertex counts or build errors.
+
+    Points are sampled by Latin hypercube within ``ranges``, points violating the element ``CONSTRAINTS`` are dropped
+    (unless ``constrained`` is False) and the others are built headless. A build is an outlier if it raises, takes
+    longer than ``time_limit`` or has more than ``vertex_limit`` vertices; the limits default to ``outlier_factor``
+    times the median of the sample. Each outlier is shrunk to a minimal reproducing parameter set: tuned Params are
+    reset to their defaults one by one where the outlier persists, and the remaining ones are bisected towards their
+    defaults.
+
+    Args:
+        cls: element class (or dotted path, see ``element_class``)
+        ranges: dictionary of Param to ``(low, high)``, by default ``DEFAULT_RANGES`` of ``cls``; list Params are
+            indexed as ``"island1_extent[1]"``
+        fixed: other non-default Params
+        workers: number of processes building the sample, 1 to build in this process
+        seed: random seed
+    """
+
+    def __init__(self, cls, ranges=None, fixed=None, workers=None, seed=0):
+        self.cls = element_class(cls)
+        ranges = DEFAULT_RANGES[class_path(self.cls).replace("kqcircuits.scq_layout.", "")] if ranges is None \
+            else ranges
+        self.space = ParamSpace(self.cls, ranges, fixed)
+        self.names, self.bounds, self.fixed, self.defaults = (self.space.names, self.space.bounds, self.space.fixed,
+                                                              self.space.defaults)
+        self.workers = workers
+        self.rng = np.random.default_rng(seed)
+        self.builds = 0
+
+    def params(self, x):
+        """Parameter dictionary of the point ``x`` (array in the order of ``ranges``)."""
+        return self.space.params(x)
+
+    def sample(self, n):
+        """Latin hypercube sample of ``n`` points satisfying the element constraints (fewer if some do not)."""
+        xs = self.space.sample(n, self.rng)
+        return xs[self.space.feasible(xs)]
+
+    def measure(self, xs):
+        """:func:`measure` of the points ``xs``, in parallel unless ``workers`` is 1."""
+        params = [self.params(x) for x in xs]
+        self.builds += len(params)
+        if self.workers == 1 or len(params) < 2:
+            return [measure(self.cls, p) for p in params]
+        with ProcessPoolExecutor(self.workers) as pool:
+            return list(pool.map(measure, [class_path(self.cls)] * len(params), params))
+
+    def run(self, samples=200, constrained=True, time_limit=None, vertex_limit=None, outlier_factor=10.0,
+            max_outliers=5, store=None):
+        """Build ``samples`` random points and shrink the worst outliers.
+
+        Args:
+            samples: number of points sampled (before dropping those violating constraints)
+            constrained: drop points violating the element ``CONSTRAINTS``
+            time_limit: build time (s) above which a build is an outlier
+            vertex_limit: vertex count above which a build is an outlier
+            outlier_factor: limits relative to the sample median if not given
+            max_outliers: number of outliers shrunk, slowest and largest first
+            store: optional :class:`ResultsStore` recording every build
+
+        Returns:
+            dictionary with the ``samples`` (``params``, ``time``, ``vertices``, ``error``), the number of
+            ``infeasible`` points dropped, the ``time_limit`` and ``vertex_limit`` used, and the ``outliers`` with
+            their ``shrunk`` parameter sets (non-default tuned Params only, ``None`` if not reproduced)
+        """
+        measure(self.cls, self.fixed)  # warm up imports and PCell declarations before timing
+        if constrained:
+            xs = self.sample(samples)
+        else:
+            xs = self.space.uniform(samples, self.rng)
+        results = self.measure(xs)
+        times = np.array([r["time"] for r in results])
+        vertices = np.array([r["vertices"] for r in results])
+        ok = np.array([r["error"] is None for r in results], dtype=bool)
+        time_limit = outlier_factor * float(np.median(times[ok])) if time_limit is None and ok.any() else time_limit
+        vertex_limit = outlier_factor * float(np.median(vertices[ok])) if vertex_limit is None and ok.any() \
+            else vertex_limit
+        limits = (time_limit, vertex_limit)
+
+        report = {"samples": [], "infeasible": samples - len(xs), "time_limit": time_limit,
+                  "vertex_limit": vertex_limit, "outliers": []}
+        writer = store.writer() if store is not None else None
+        for x, result in zip(xs, results):
+            params = self.params(x)
+            report["samples"].append({"params": params, **result})
+            if writer is not None:
+                writer.append({"cell": class_path(self.cls), "hash": params_hash(self.cls, params), "params": params,
+                               "metrics": {"vertices": result["vertices"]}, "time": result["time"],
+                               "error": result["error"]})
+        if writer is not None:
+            writer.close()
+
+        severity = [np.inf if r["error"] else max(r["time"] / (time_limit or np.inf),
+                                                  r["vertices"] / (vertex_limit or np.inf)) for r in results]
+        for i in np.argsort(severity)[::-1][:max_outliers]:
+            if _is_outlier(results[i], limits):
+                shrunk = self.shrink(xs[i], limits, results[i]["error"] is not None)
+                report["outliers"].append({**report["samples"][i], "shrunk": shrunk})
+        return report
+
+    def shrink(self, x, limits, error=False, steps=8):
+        """Minimal tuned Params of the outlier ``x`` still building as an outlier (raising if ``error``).
+
+        Returns:
+            dictionary with the non-default tuned ``params`` and the ``time``, ``vertices`` and ``error`` of their
+            build, or None if ``x`` itself is no longer an outlier
+        """
+        def reproduces(point):
+            result = self.measure([point])[0]
+            return (result["error"] is not None if error else _is_outlier(result, limits)), result
+
+        x = np.array(x, dtype=float)
+        reproduced, result = reproduces(x)
+        if not reproduced:
+            return None
+        for i in range(len(x)):
+            trial = x.copy()
+            trial[i] = self.defaults[i]
+            reproduced, trial_result = reproduces(trial)
+            if reproduced:
+                x, result = trial, trial_result
+        for i in np.nonzero(x != self.defaults)[0]:
+            near, far = self.defaults[i], x[i]  # ``far`` reproduces, ``near`` does not
+            for _ in range(steps):
+                trial = x.copy()
+                trial[i] = (near + far) / 2
+                reproduced, trial_result = reproduces(trial)
+                if reproduced:
+                    far, x, result = trial[i], trial, trial_result
+                else:
+                    near = trial[i]
+        return {"params": {name: float(value) for name, value, default in zip(self.names, x, self.defaults)
+                           if value != default}, **result}
+
+
+def _is_outlier(result, limits):
+    time_limit, vertex_limit = limits
+    return (result["error"] is not None or (time_limit is not None and result["time"] > time_limit)
+            or (vertex_limit is not None and result["vertices"] > vertex_limit))
@@ -0,0 +1,233 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from kqcircuits.scq_layout.util.build import build_cell, class_path, element_class, params_hash
+from kqcircuits.scq_layout.util.conformal import coplanar_strips_capacitance, disk_capacitance
+from kqcircuits.scq_layout.util.geometry import island_regions
+from kqcircuits.scq_layout.util.param_space import ParamSpace
+
+E_CHARGE = 1.602176634e-19  # C
+H_PLANCK = 6.62607015e-34  # J s
+
+
+class ResultCache:
+    """Evaluation results memoized on disk as ``{params_hash}.json``, one file per class and parameter set."""
+
+    def __init__(self, directory=".optimizer_cache"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, cls, params):
+        return self.directory / f"{params_hash(cls, params)}.json"
+
+    def get(self, cls, params):
+        path = self._path(cls, params)
+        return json.loads(path.read_text())["metrics"] if path.exists() else None
+
+    def put(self, cls, params, metrics):
+        entry = {"cell": class_path(cls), "params": params, "metrics": metrics}
+        self._path(cls, params).write_text(json.dumps(entry, default=float))
+
+    def entries(self, cls):
+        """All cached ``(params, metrics)`` of ``cls``."""
+        for path in self.directory.glob("*.json"):
+            entry = json.loads(path.read_text())
+            if entry["cell"] == class_path(cls):
+                yield entry["params"], entry["metrics"]
+
+
+class GeometryEvaluator:
+    """Quick capacitance stand-in computed from the built geometry.
+
+    Each island gets the self-capacitance of a disk of equal area, and each pair of islands the coplanar strip
+    capacitance of their facing length. For the two largest islands (the floating qubit pads) ``C_sum = Cm + C1 C2
+    / (C1 + C2)`` and the charging energy ``Ec = e^2 / 2 C_sum`` are reported. Capacitances are in fF, ``Ec`` in MHz.
+    Replace it by an evaluator wrapping a field solver for sign-off; any picklable ``evaluator(cls, params) ->
+    dict`` works with :class:`SurrogateOptimizer`.
+    """
+
+    def __init__(self, eps_r=11.45, face="1t1"):
+        self.eps_r = eps_r
+        self.face = face
+
+    def __call__(self, cls, params):
+        layout, cell = build_cell(cls, **params)
+        dbu = layout.dbu
+        islands = island_regions(cell, self.face)
+        metrics = {f"C{i + 1}": float(disk_capacitance(r.area() * (dbu * 1e-6) ** 2, self.eps_r)) * 1e15
+                   for i, r in enumerate(islands)}
+        for i, ri in enumerate(islands):
+            for j in range(i + 1, len(islands)):
+                metrics[f"C{i + 1}{j + 1}"] = self._mutual(ri, islands[j], dbu)
+        if len(islands) >= 2:
+            c1, c2, cm = metrics["C1"], metrics["C2"], metrics["C12"]
+            metrics["C_sum"] = cm + c1 * c2 / (c1 + c2)
+            metrics["Ec"] = E_CHARGE**2 / (2 * metrics["C_sum"] * 1e-15) / H_PLANCK * 1e-6
+        return metrics
+
+    def _mutual(self, r1, r2, dbu):
+        pairs = r1.separation_check(r2, int(1e9))
+        if pairs.is_empty():
+            return 0.0
+        gap = min(pair.distance() for pair in pairs.each()) * dbu
+        facing = (r1.sized(int(gap / dbu)) & r2.sized(int(gap / dbu))).bbox()
+        length = max(facing.width(), facing.height()) * dbu
+        width = min(min(r.bbox().width(), r.bbox().height()) for r in (r1, r2)) * dbu
+        return float(coplanar_strips_capacitance(gap, width, self.eps_r)) * length * 1e-6 * 1e15
+
+
+class GaussianProcess:
+    """Gaussian process regression with a squared exponential kernel on inputs scaled to the unit cube.
+
+    The length scale is chosen from a small grid by the marginal likelihood.
+    """
+
+    def __init__(self, noise=1e-6, length_scales=(0.05, 0.1, 0.2, 0.4, 0.8, 1.6)):
+        self.noise = noise
+        self.length_scales = length_scales
+
+    @staticmethod
+    def _kernel(a, b, length):
+        d2 = np.sum((a[:, None, :] - b[None, :, :]) ** 2, axis=-1)
+        return np.exp(-0.5 * d2 / length**2)
+
+    def fit(self, x, y):
+        self.x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.mean, self.scale = y.mean(), y.std() or 1.0
+        y = (y - self.mean) / self.scale
+        best = None
+        for length in self.length_scales:
+            k = self._kernel(self.x, self.x, length) + self.noise * np.eye(len(y))
+            try:
+                chol = np.linalg.cholesky(k)
+            except np.linalg.LinAlgError:
+                continue
+            alpha = np.linalg.solve(chol.T, np.linalg.solve(chol, y))
+            likelihood = -0.5 * y @ alpha - np.sum(np.log(np.diag(chol)))
+            if best is None or likelihood > best[0]:
+                best = (likelihood, length, chol, alpha)
+        _, self.length, self._chol, self._alpha = best
+        return self
+
+    def predict(self, x):
+        """Posterior mean and standard deviation at the points ``x``."""
+        ks = self._kernel(np.asarray(x, dtype=float), self.x, self.length)
+        v = np.linalg.solve(self._chol, ks.T)
+        std = np.sqrt(np.clip(1 - np.sum(v**2, axis=0), 0, None))
+        return self.mean + self.scale * (ks @ self._alpha), self.scale * std
+
+
+class SurrogateOptimizer:
+    """Fits a surrogate to the evaluated designs and proposes the next candidates to reach ``targets``.
+
+    Each target metric gets its own :class:`GaussianProcess` on the tuned parameters. Candidates of a batch are
+    chosen by Thompson sampling: each one minimizes the relative squared target error on an independent draw of the
+    surrogate, so the batch explores where the model is uncertain. Candidates violating the element ``CONSTRAINTS``
+    are rejected before anything is built. Results are memoized in a :class:`ResultCache`,
+    which also warm starts later runs with the same fixed parameters.
+
+    Args:
+        cls: element class (or dotted path, see ``element_class``)
+        bounds: dictionary of tuned parameter to ``(low, high)``; list parameters are indexed as ``"island1_extent[1]"``
+        targets: dictionary of metric name to target value
+        evaluator: picklable ``evaluator(cls, params) -> dict``, by default :class:`GeometryEvaluator`
+        fixed: other non-default parameters
+        cache_dir: directory of the :class:`ResultCache`
+        workers: number of processes evaluating a batch in parallel, 1 to evaluate in this process
+        seed: random seed
+    """
+
+    def __init__(self, cls, bounds, targets, evaluator=None, fixed=None, cache_dir=".optimizer_cache", workers=None,
+                 seed=0):
+        self.cls = element_class(cls)
+        self.space = ParamSpace(self.cls, bounds, fixed)
+        self.names, self.bounds, self.fixed = self.space.names, self.space.bounds, self.space.fixed
+        self.targets = targets
+        self.evaluator = GeometryEvaluator() if evaluator is None else evaluator
+        self.cache = ResultCache(cache_dir)
+        self.workers = workers
+        self.rng = np.random.default_rng(seed)
+        self.evaluations = 0
+        self.history = []  # (x, metrics) of all known designs
+        self._load_history()
+
+    def params(self, x):
+        """Full parameter dictionary of the point ``x`` (array in the order of ``bounds``)."""
+        return self.space.params(x)
+
+    def feasible(self, xs):
+        """Which of the points ``xs`` satisfy the ``CONSTRAINTS`` of the element, checked at once without building."""
+        return self.space.feasible(xs)
+
+    def _load_history(self):
+        for params, metrics in self.cache.entries(self.cls):
+            x = self.space.point(params)
+            if params == self.params(x) and self.space.contains(x):
+                self.history.append((x, metrics))
+
+    def objective(self, metrics):
+        """Sum of squared relative errors to the targets."""
+        return sum(((metrics[name] - target) / target) ** 2 for name, target in self.targets.items())
+
+    def evaluate(self, xs):
+        """Metrics of the points ``xs``, taken from the cache or evaluated in parallel."""
+        params = [self.params(x) for x in xs]
+        results = [self.cache.get(self.cls, p) for p in params]
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            todo = [params[i] for i in missing]
+            if self.workers == 1:
+                computed = [self.evaluator(self.cls, p) for p in todo]
+            else:
+                with ProcessPoolExecutor(self.workers) as pool:
+                    computed = list(pool.map(self.evaluator, [self.cls] * len(todo), todo))
+            for i, metrics in zip(missing, computed):
+                self.cache.put(self.cls, params[i], metrics)
+                results[i] = metrics
+            self.evaluations += len(missing)
+        self.history.extend(zip(xs, results))
+        return results
+
+    def propose(self, n, candidates=2000):
+        """Next ``n`` points to evaluate."""
+        x = np.array([h[0] for h in self.history])
+        models = {name: GaussianProcess().fit(self.space.unit(x), [h[1][name] for h in self.history])
+                  for name in self.targets}
+        pool = self.space.sample(candidates, self.rng)
+        best = min(self.history, key=lambda h: self.objective(h[1]))[0]
+        # local candidates around the best design refine the optimum once it has been bracketed
+        span = self.bounds[:, 1] - self.bounds[:, 0]
+        local = np.clip(best + 0.05 * span * self.rng.standard_normal((candidates, len(self.names))),
+                        self.bounds[:, 0], self.bounds[:, 1])
+        pool = np.vstack([pool, local])
+        pool = pool[self.feasible(pool)]
+        if len(pool) == 0:
+            raise ValueError(f"No candidates of {self.cls.__name__} within the bounds satisfy its constraints")
+        predictions = {name: model.predict(self.space.unit(pool)) for name, model in models.items()}
+        proposed = []
+        for _ in range(n):
+            draw = {name: mean + std * self.rng.standard_normal(len(pool)) for name, (mean, std) in predictions.items()}
+            proposed.append(pool[np.argmin(self.objective(draw))])
+        return np.array(proposed)
+
+    def best(self):
+        x, metrics = min(self.history, key=lambda h: self.objective(h[1]))
+        return {"params": self.params(x), "metrics": metrics, "objective": self.objective(metrics),
+                "evaluations": self.evaluations}
+
+    def run(self, max_evaluations=40, batch_size=4, initial=8, tol=1e-4):
+        """Evaluate batches until the objective is below ``tol`` or ``max_evaluations`` designs were evaluated.
+
+        Returns:
+            dictionary with the best ``params``, its ``metrics`` and ``objective``, and the number of ``evaluations``
+        """
+        if len(self.history) < 2:
+            sample = self.space.sample(4 * initial, self.rng)
+            self.evaluate(sample[self.feasible(sample)][:initial])
+        while self.best()["objective"] > tol and self.evaluations < max_evaluations:
+            self.evaluate(self.propose(min(batch_size, max_evaluations - self.evaluations)))
+        return self.best()
@@ -0,0 +1,192 @@
+import hashlib
+import math
+from pathlib import Path
+
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.util.cell_hash import box_hash, cell_hashes
+
+
+class TileRenderer:
+    """Headless multi-resolution tile renderer with an on-disk cache.
+
+    The square around the cell bounding box is split into ``2**z x 2**z`` tiles of ``tile_size`` pixels at zoom level
+    ``z`` (tile ``(0, 0)`` in the top left corner, as in web maps). Tiles are rendered with
+    ``KLayoutView.get_pixels`` (PNG) or written from the clipped polygons (SVG) and stored in ``cache_dir`` under the
+    content hash of the geometry inside them, so after an edit only tiles whose geometry changed are rendered again.
+    Call :meth:`refresh` after modifying the layout.
+
+    Args:
+        view: ``KLayoutView`` holding the layout
+        cell: cell to render, or None for the active cell of ``view``
+        cache_dir: directory of the cached tiles
+        tile_size: tile width and height in pixels
+        layers_set: list of layer names to render, or None for the default set
+    """
+
+    def __init__(self, view, cell=None, cache_dir=".tile_cache", tile_size=256, layers_set=None):
+        self.view = view
+        self.layout = view.layout
+        self.cell = view.active_cell if cell is None else cell
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.tile_size = tile_size
+        self.layers_set = layers_set
+        self.hits = 0
+        self.misses = 0
+        view.layout_view.resize(tile_size, tile_size)
+        # grid and scale bar would be drawn separately on every tile
+        view.layout_view.set_config("grid-visible", "false")
+        view.layout_view.set_config("grid-show-ruler", "false")
+        self.refresh()
+
+    def refresh(self):
+        """Recompute the cell content hashes after the layout has been edited."""
+        self._hashes = cell_hashes(self.layout)
+        bbox = self.cell.dbbox()
+        half = max(bbox.width(), bbox.height(), self.tile_size * self.layout.dbu) / 2
+        self.world = pya.DBox(bbox.center().x - half, bbox.center().y - half, bbox.center().x + half,
+                              bbox.center().y + half)
+
+    @property
+    def max_level(self):
+        """Zoom level at which one pixel is about one database unit."""
+        return max(0, math.ceil(math.log2(self.world.width() / (self.tile_size * self.layout.dbu))))
+
+    def tile_box(self, z, x, y):
+        side = self.world.width() / 2**z
+        left, top = self.world.left + x * side, self.world.top - y * side
+        return pya.DBox(left, top - side, left + side, top)
+
+    def level_for(self, box, tiles=1):
+        """Deepest zoom level at which ``box`` (DBox) fits in ``tiles`` tiles across."""
+        extent = max(box.width(), box.height(), self.layout.dbu)
+        return min(self.max_level, max(0, math.floor(math.log2(tiles * self.world.width() / extent))))
+
+    def tile_at(self, z, point):
+        """Indices ``(x, y)`` of the tile containing ``point`` (DPoint) at level ``z``."""
+        side = self.world.width() / 2**z
+        return int((point.x - self.world.left) // side), int((self.world.top - point.y) // side)
+
+    def tile_key(self, z, x, y, fmt="png"):
+        box = self.tile_box(z, x, y)
+        # one pixel of margin, so that shape outlines drawn across the tile border are accounted for
+        margin = box.width() / self.tile_size
+        content = box_hash(self.cell, box.enlarged(margin, margin).to_itype(self.layout.dbu), self._hashes)
+        options = (fmt, self.tile_size, self.layers_set, str(box), content)
+        return hashlib.sha1(repr(options).encode()).hexdigest()
+
+    def tile(self, z, x, y, fmt="png"):
+        """Returns the PNG or SVG data of a tile, rendering it only if it is not in the cache."""
+        path = self.cache_dir / f"{self.tile_key(z, x, y, fmt)}.{fmt}"
+        if path.exists():
+            self.hits += 1
+            return path.read_bytes()
+        self.misses += 1
+        box = self.tile_box(z, x, y)
+        data = self._render_png(box) if fmt == "png" else self._render_svg(box)
+        path.write_bytes(data)
+        return data
+
+    def pyramid(self, levels=None, fmt="png"):
+        """Render (or validate the cache of) all tiles of the given zoom levels, by default up to level 3."""
+        for z in range(4) if levels is None else levels:
+            for x in range(2**z):
+                for y in range(2**z):
+                    self.tile(z, x, y, fmt)
+
+    def _render_png(self, box):
+        size = self.tile_size
+        return self.view.get_pixels(self.cell, size, size, self.layers_set, box).to_png_data()
+
+    def _render_svg(self, box):
+        dbu = self.layout.dbu
+        ibox = box.to_itype(dbu)
+        scale = self.tile_size / ibox.width()
+
+        def point(p):
+            return f"{(p.x - ibox.left) * scale:.2f},{(ibox.top - p.y) * scale:.2f}"
+
+        lines = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.tile_size}" height="{self.tile_size}">']
+        for layer in self.view.layout_view.each_layer():
+            if not layer.visible or layer.layer_index() < 0:
+                continue
+            region = pya.Region(self.cell.begin_shapes_rec_touching(layer.layer_index(), ibox)) & pya.Region(ibox)
+            if region.is_empty():
+                continue
+            color = f"#{layer.eff_fill_color(True) & 0xFFFFFF:06x}"
+            lines.append(f'<g fill="{color}" fill-opacity="0.5" stroke="{color}" fill-rule="evenodd">')
+            for poly in region.each():
+                contours = [poly.each_point_hull()] + [poly.each_point_hole(i) for i in range(poly.holes())]
+                d = " ".join("M" + " L".join(point(p) for p in contour) + " Z" for contour in contours)
+                lines.append(f'<path d="{d}"/>')
+            lines.append("</g>")
+        lines.append("</svg>")
+        return "\n".join(lines).encode()
+
+
+class TileViewer:
+    """Zoomable notebook view of a :class:`TileRenderer`, showing ``columns x rows`` tiles. Requires ipywidgets.
+
+    Use the buttons to pan and zoom, or :meth:`goto` to jump to an area, for example
+    ``viewer.goto(squid_cell.dbbox().transformed(trans))``.
+    """
+
+    def __init__(self, renderer, columns=4, rows=3):
+        import ipywidgets  # pylint: disable=import-outside-toplevel
+
+        self.renderer = renderer
+        self.columns, self.rows = columns, rows
+        self.z, self.x, self.y = 0, 0, 0
+        size = f"{renderer.tile_size}px"
+        self._images = [ipywidgets.Image(format="png", layout=ipywidgets.Layout(width=size, height=size))
+                        for _ in range(columns * rows)]
+        grid = ipywidgets.GridBox(self._images, layout=ipywidgets.Layout(
+            grid_template_columns=f"repeat({columns}, {size})", grid_gap="0px"))
+        buttons = []
+        for label, action in (("+", lambda: self.zoom(1)), ("-", lambda: self.zoom(-1)),
+                              ("←", lambda: self.pan(-1, 0)), ("→", lambda: self.pan(1, 0)),
+                              ("↑", lambda: self.pan(0, -1)), ("↓", lambda: self.pan(0, 1))):
+            button = ipywidgets.Button(description=label, layout=ipywidgets.Layout(width="40px"))
+            button.on_click(lambda _, a=action: a())
+            buttons.append(button)
+        self._status = ipywidgets.Label()
+        self.widget = ipywidgets.VBox([ipywidgets.HBox(buttons + [self._status]), grid])
+        self.update()
+
+    def _ipython_display_(self):
+        from IPython.display import display  # pylint: disable=import-outside-toplevel
+
+        display(self.widget)
+
+    def update(self):
+        n = 2**self.z
+        blank = b""
+        for i, image in enumerate(self._images):
+            x, y = self.x + i % self.columns, self.y + i // self.columns
+            image.value = self.renderer.tile(self.z, x, y) if 0 <= x < n and 0 <= y < n else blank
+        r = self.renderer
+        self._status.value = f"level {self.z}/{r.max_level}, cache hits {r.hits}, rendered {r.misses}"
+
+    def zoom(self, step, center=None):
+        box = self.renderer.tile_box(self.z, self.x, self.y)
+        if center is None:
+            side = box.width()
+            center = pya.DPoint(box.left + side * self.columns / 2, box.top - side * self.rows / 2)
+        self.z = min(max(self.z + step, 0), self.renderer.max_level)
+        self._center(center)
+
+    def pan(self, dx, dy):
+        self.x += dx
+        self.y += dy
+        self.update()
+
+    def goto(self, box):
+        """Show the area ``box`` (DBox in the coordinates of the rendered cell) at the deepest level it fits."""
+        self.z = self.renderer.level_for(box, min(self.columns, self.rows))
+        self._center(box.center())
+
+    def _center(self, point):
+        x, y = self.renderer.tile_at(self.z, point)
+        self.x, self.y = x - self.columns // 2, y - self.rows // 2
+        self.update()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# the build server lives at the repository root, outside the library package loaded by KQCircuits
+sys.path.insert(0, str(Path(__file__).parent.parent))
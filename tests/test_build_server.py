@@ -0,0 +1,85 @@
+import stat
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.aslib import collect_produce_errors
+from kqcircuits.scq_layout.qubits.floating_qubit import FloatingQubit
+from kqcircuits.scq_layout.util.build import BuildError, build_cell
+from kqcircuits.scq_layout.util.build_client import shutdown, submit
+
+from build_server import BuildServer
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    root = tmp_path_factory.mktemp("build_server")
+    server = BuildServer(("localhost", 0), workers=1, key_file=root / "key", output_dir=root / "out")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    assert server.ready.wait(60)
+    yield server
+    shutdown(server.address, server.key_file)
+    thread.join(60)
+
+
+def test_build_cell_raises_on_pcell_error():
+    with pytest.raises(BuildError, match="FloatingQubit: TypeError"):
+        build_cell("qubits.floating_qubit.FloatingQubit", island_sep="abc")
+
+
+def test_produce_errors_are_collected_per_build():
+    layout = pya.Layout()
+    FloatingQubit.create(layout, island_sep="xyz")  # not recorded anywhere outside of a build
+    with collect_produce_errors() as outer:
+        with pytest.raises(BuildError):
+            build_cell(FloatingQubit, island_sep="abc")
+        FloatingQubit.create(layout, island_sep="def")
+    assert len(outer) == 1 and outer[0].startswith("FloatingQubit: TypeError")  # only the create in the block
+    build_cell(FloatingQubit, island_sep=30.0)  # earlier failures are not reported again
+
+
+def test_key_file_is_private(server):
+    assert stat.S_IMODE(server.key_file.stat().st_mode) == 0o600
+    assert len(server.key_file.read_bytes()) == 32
+
+
+def test_round_trip(server):
+    requests = [
+        {"cell": "qubits.floating_qubit.FloatingQubit", "params": {"island_sep": 30}},
+        {"cell": "qubits.floating_qubit.FloatingQubit", "params": {"island_sep": "abc"}},
+        {"cell": "junctions.squidC.SquidC", "output": "squid.gds"},
+        {"cell": "junctions.squidC.SquidC", "output": "../squid.gds"},
+    ]
+    results = list(submit(requests, server.address, server.key_file))
+    done = results.pop()
+    by_id = {result["id"]: result for result in results}
+
+    assert by_id[0]["ok"] and by_id[0]["name"] == "Floating Qubit" and by_id[0]["polygons"] > 0
+    assert not by_id[1]["ok"] and "TypeError" in by_id[1]["error"]
+    assert by_id[2]["ok"] and by_id[2]["output"] == str(server.output_dir / "squid.gds")
+    assert (server.output_dir / "squid.gds").stat().st_size > 0
+    assert not by_id[3]["ok"] and "outside" in by_id[3]["error"]
+    assert not (server.output_dir.parent / "squid.gds").exists()
+
+    assert done["cmd"] == "done" and done["built"] == 2 and done["failed"] == 2
+    assert done["cells_per_second"] == pytest.approx(2 / done["elapsed"], rel=0.1)
+
+
+def test_wrong_key_is_refused(server, tmp_path):
+    (tmp_path / "key").write_bytes(b"scq_layout")
+    with pytest.raises(Exception):
+        list(submit([{"cell": "junctions.squidC.SquidC"}], server.address, tmp_path / "key"))
+
+
+def test_library_load_imports_no_tooling():
+    # KQCircuits imports every module below the library path when the AS Library is loaded
+    code = ("import sys; from kqcircuits.pya_resolver import pya; "
+            "from kqcircuits.scq_layout.junctions.squidC import SquidC; SquidC.create(pya.Layout()); "
+            "print(sorted(m for m in sys.modules if {'pytest', 'build_server', 'tests'} & set(m.split('.'))))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd="/", check=True)
+    assert result.stdout.strip() == "[]"
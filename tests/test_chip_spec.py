@@ -0,0 +1,62 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.chips import test as test_chip
+from kqcircuits.scq_layout.util.chip_spec import ChipCompiler, evaluate
+
+SPEC = Path(__file__).parent.parent / "scq_layout" / "chips" / "test_chip.json"
+
+
+def _xor_area(cell_a, cell_b):
+    layout_a, layout_b = cell_a.layout(), cell_b.layout()
+    infos = {*map(layout_a.get_info, layout_a.layer_indexes()), *map(layout_b.get_info, layout_b.layer_indexes())}
+    areas = {}
+    for info in infos:
+        regions = []
+        for layout, cell in ((layout_a, cell_a), (layout_b, cell_b)):
+            li = layout.find_layer(info)
+            regions.append(pya.Region() if li is None else pya.Region(cell.begin_shapes_rec(li)))
+        area = (regions[0] ^ regions[1]).area() * layout_a.dbu**2
+        if area:
+            areas[str(info)] = area
+    return areas
+
+
+def test_compiled_spec_matches_test_chip():
+    chip_layout = pya.Layout()
+    chip = test_chip.TestChip.create(chip_layout)
+    compiler = ChipCompiler()
+    assert _xor_area(compiler.compile(SPEC), chip) == {}
+
+
+def test_recompile_reuses_components():
+    compiler = ChipCompiler()
+    compiler.compile(SPEC)
+    misses = compiler.cache.misses
+    spec = json.loads(SPEC.read_text())
+    spec["components"]["Q0"]["position"] = [0, 2400]
+    compiler.compile(spec)
+    assert compiler.cache.misses > misses  # connections to Q0 are rerouted
+    assert compiler.cache.hits >= len(spec["components"])
+
+
+def test_evaluate():
+    refpoints = {"Q0_port": pya.DPoint(3, -4)}
+    assert evaluate("2 * a + Q0_port.y", {"a": 5}, refpoints) == 6
+    assert evaluate("int(-2.7) + round(pi)", {}) == 1
+    for expression in ("__import__('os')", "a.b", "Q0_port.z", "1 +"):
+        with pytest.raises(ValueError):
+            evaluate(expression, {"a": 1}, refpoints)
+
+
+def test_parallel_prebuild_matches_serial_compile():
+    serial = ChipCompiler()
+    parallel = ChipCompiler(workers=2)
+    assert _xor_area(parallel.compile(SPEC), serial.compile(SPEC)) == {}
+    # only the qubit is an AS Library component, the KQCircuits launchers and capacitors are not prebuilt
+    assert parallel.prebuild_report["cells"] == parallel.cache.prebuilt == 1
+    assert parallel.cache.misses < serial.cache.misses
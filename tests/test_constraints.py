@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from kqcircuits.scq_layout.aslib import ASlib
+from kqcircuits.scq_layout.elements import launcher  # pylint: disable=unused-import
+from kqcircuits.scq_layout.junctions.squidC import SquidC
+from kqcircuits.scq_layout.qubits import floating_coupler, floating_coupler_v2  # pylint: disable=unused-import
+from kqcircuits.scq_layout.qubits.floating_qubit import FloatingQubit
+from kqcircuits.scq_layout.util.constraints import feasible, margins, smallest, validate, violations
+
+
+def _subclasses(cls):
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from _subclasses(sub)
+
+
+@pytest.mark.parametrize("cls", sorted({c for c in _subclasses(ASlib) if c.CONSTRAINTS}, key=lambda c: c.__name__))
+def test_defaults_are_feasible(cls):
+    assert feasible(cls, {}) and violations(cls, {}) == []
+
+
+def test_margins_of_list_params():
+    m = margins(FloatingQubit, {})
+    assert m["island1 narrower than ground gap"] == pytest.approx(800 - 680)
+    assert m["islands fit in ground gap"] == pytest.approx(600 / 2 - 30 / 2 - 175)
+    assert m["island1 rounding radius"] == pytest.approx(0)  # the default island is a stadium
+
+
+def test_candidates_are_checked_at_once():
+    params = {"island1_extent": np.array([[680, 175], [680, 120], [900, 175]]), "island1_r": np.array([50, 50, 50])}
+    assert list(feasible(FloatingQubit, params)) == [True, True, False]
+    assert violations(FloatingQubit, params) == ["island1 narrower than ground gap",
+                                                 "SQUID between islands and ground"]
+    assert smallest(np.array([1.0, 5.0]), 3.0, np.array([4.0, 2.0])).tolist() == [1.0, 2.0]
+
+
+def test_validate():
+    validate(SquidC, {"JJ_width": 0.1})
+    with pytest.raises(ValueError, match="separate fingers, non-negative twist length"):
+        validate(SquidC, {"finger_sep": 1.0, "twist_length": -0.5})
+    assert feasible(SquidC, {"twist_length": -0.005}, tol=0.01)
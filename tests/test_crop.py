@@ -0,0 +1,58 @@
+import pytest
+
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.util.build import build_cell
+from kqcircuits.scq_layout.util.crop import GAP_LAYER, crop, crop_box, crop_many
+from kqcircuits.scq_layout.util.geometry import cell_ports
+
+CAPACITOR = [-4200, 2100, -3800, 2400]  # around C1, whose feed lines run along x = -4000
+
+
+@pytest.fixture(scope="module")
+def chip():
+    return build_cell("chips.test.TestChip")
+
+
+def _gap(cell, box=None):
+    region = pya.Region(cell.begin_shapes_rec(cell.layout().layer(*GAP_LAYER)))
+    return region if box is None else region & pya.Region(box.to_itype(cell.layout().dbu))
+
+
+def test_crop_box(chip):
+    _, cell = chip
+    q0 = next(inst for inst in cell.each_inst() if inst.property("id") == "Q0").dbbox()
+    assert crop_box(cell, "Q0", 50) == q0.enlarged(50, 50)
+    assert crop_box(cell, "Q0_port_coupler") == pya.DBox(-102.5, 2094, -102.5, 2094)
+    assert crop_box(cell, CAPACITOR) == crop_box(cell, pya.DBox(*CAPACITOR))
+    with pytest.raises(ValueError, match="'Q9'"):
+        crop_box(cell, "Q9")
+
+
+def test_clip_is_the_geometry_inside_the_region(chip):
+    _, cell = chip
+    layout, clip = crop(cell, "Q0", 100, name="qubit")
+    box = crop_box(cell, "Q0", 100)
+    assert clip.name == "qubit" and layout.top_cells() == [clip]
+    assert (_gap(clip) ^ _gap(cell, box)).is_empty()
+    assert {"Q0_port_coupler", "Q0_port_fluxline", "Q0_port_xyline"} <= set(cell_ports(clip))
+
+
+def test_cut_waveguides_get_ports(chip):
+    _, cell = chip
+    layout, clip = crop(cell, CAPACITOR)  # pylint: disable=unused-variable
+    ports = cell_ports(clip)
+    assert set(ports) == {"port_cut0", "port_cut1"}
+    assert ports["port_cut0"] == (pya.DPoint(-4000, 2100), pya.DVector(0, -1))
+    assert ports["port_cut1"] == (pya.DPoint(-4000, 2400), pya.DVector(0, 1))
+
+
+def test_crop_many_matches_single_crops(chip):
+    _, cell = chip
+    layout, clips = crop_many(cell, ["Q0", CAPACITOR, "L2"], margin=20)
+    assert [clip.name for clip in clips] == ["Test Chip Q0", "Test Chip 1", "Test Chip L2"]
+    assert len(layout.top_cells()) == 3
+    for region, clip in zip(["Q0", CAPACITOR, "L2"], clips):
+        single_layout, single = crop(cell, region, margin=20)  # pylint: disable=unused-variable
+        assert (_gap(clip) ^ _gap(single)).is_empty()
+        assert set(cell_ports(clip)) == set(cell_ports(single))
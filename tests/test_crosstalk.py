@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from kqcircuits.scq_layout.util import crosstalk
+from kqcircuits.scq_layout.util.build import build_cell
+from kqcircuits.scq_layout.util.crosstalk import (MU0, chip_elements, crosstalk_matrix, mutual_capacitance,
+                                                  mutual_inductance)
+
+LOOP = np.array([[-5, -5], [5, -5], [5, 5], [-5, 5]], dtype=float)  # 10 µm square, counterclockwise
+
+
+def _line(y, length=1e5):
+    """Long straight line along x at ``y`` (µm)."""
+    return {"name": f"y={y}", "segments": np.array([[[-length / 2, y], [length / 2, y]]]), "a": 10, "b": 6}
+
+
+@pytest.mark.parametrize("distance", [20, 60, 500])  # vector potential near the loop, Biot-Savart far from it
+def test_mutual_inductance_of_a_long_wire(distance):
+    m = mutual_inductance([_line(distance)], [LOOP], return_current=False)[0, 0]
+    exact = MU0 / (2 * np.pi) * 10e-6 * np.log((distance + 5) / (distance - 5)) * 1e12
+    assert abs(m) == pytest.approx(exact, rel=1e-3)
+
+
+def test_return_currents_screen_the_line():
+    lines = [_line(60)]
+    assert abs(mutual_inductance(lines, [LOOP])[0, 0]) < abs(mutual_inductance(lines, [LOOP], False)[0, 0])
+
+
+def test_mutual_capacitance_falls_with_distance():
+    c = mutual_capacitance([_line(50), _line(100), _line(200)], [(5 * LOOP, 2500.0)])[:, 0]
+    assert np.all(c > 0)
+    assert c[0] / c[1] == pytest.approx(4, rel=0.01) and c[1] / c[2] == pytest.approx(4, rel=0.01)
+
+
+def test_chip_crosstalk():
+    _, cell = build_cell("chips.test.TestChip")
+    lines, qubits = chip_elements(cell)
+    assert [q["name"] for q in qubits] == ["Q0"] and len(qubits[0]["loops"]) == 1
+    report = crosstalk_matrix(cell)
+    assert report["loops"] == ["Q0"] and report["islands"] == ["Q0_island1", "Q0_island2"]
+    assert len(report["M"]) == len(report["C"]) == len(report["lines"]) == len(lines)
+    flux = report["lines"].index("L4_base-Q0_port_fluxline")
+    assert np.argmax(np.abs(report["M"])[:, 0]) == flux
+    assert report["M_ratio"][flux] == [1.0]
+    assert report["M_ratio"][report["lines"].index("C1_port_a-C2_port_b")] is None
+
+
+def test_lines_target_qubits_by_exact_port_name(monkeypatch):
+    names = ["q1", "q10", "xq1"]  # "q1_port" is part of the port names of the others
+    qubits = [{"name": name, "ports": [f"{name}_port_flux"], "loops": [LOOP + (200 * i, 0)], "islands": []}
+              for i, name in enumerate(names)]
+    lines = [{"name": f"{name}_port_flux", "ends": [f"{name}_port_flux"], "a": 10, "b": 6,
+              "segments": np.array([[[200 * i - 10, 30], [200 * i + 10, 30]]])} for i, name in enumerate(names)]
+    monkeypatch.setattr(crosstalk, "chip_elements", lambda cell, face: (lines, qubits))
+    report = crosstalk_matrix(None)
+    for i, ratios in enumerate(report["M_ratio"]):
+        assert ratios[i] == 1.0 and max(ratios) == 1.0  # relative to its own qubit, which it couples to most
@@ -0,0 +1,82 @@
+import pytest
+
+from kqcircuits.defaults import default_layers
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.util.build import build_cell
+from kqcircuits.scq_layout.util.ebeam import DEFAULT_WRITERS, fracture, write_estimate
+from kqcircuits.scq_layout.util.geometry import JUNCTION_LAYERS
+from kqcircuits.scq_layout.util.proximity import dose_factors, proximity_correct
+from kqcircuits.scq_layout.util.simplify import simplify
+
+
+def _junction_layer(layout, name="SIS_junction"):
+    return layout.layer(default_layers[f"1t1_{name}"])
+
+
+@pytest.fixture
+def pattern():
+    """A 40 µm pad and an isolated 0.2 µm line on the fine junction layer."""
+    layout = pya.Layout()
+    cell = layout.create_cell("Pattern")
+    cell.shapes(_junction_layer(layout)).insert(pya.DBox(0, 0, 40, 40))
+    cell.shapes(_junction_layer(layout)).insert(pya.DBox(200, 0, 200.2, 5))
+    return layout, cell
+
+
+def test_fracture_keeps_area():
+    region = pya.Region(pya.Polygon([pya.Point(0, 0), pya.Point(0, 20), pya.Point(10, 20), pya.Point(10, 10),
+                                     pya.Point(20, 10), pya.Point(20, 0)]))
+    trapezoids = fracture(region)
+    assert len(trapezoids) == 2 and sum(t.area() for t in trapezoids) == region.area()
+
+
+def test_write_estimate_counts_placements():
+    layout = pya.Layout()
+    top = layout.create_cell("Top")
+    _, squid = build_cell("junctions.squidC.SquidC", layout)
+    for x in (0, 500, 1000):
+        top.insert(pya.DCellInstArray(squid.cell_index(), pya.DTrans(pya.DVector(x, 0))))
+    report = write_estimate(top, workers=1)
+    single = report["cells"][squid.name]
+    for name in JUNCTION_LAYERS:
+        if name in single:
+            assert report["layers"][name]["shots"] == 3 * single[name]["shots"]
+            assert report["layers"][name]["fields"] == 3  # one SQUID per 500 µm write field
+    assert report["shots"] > 0 and report["time"] > 0
+
+
+def test_write_estimate_shots_cover_area(pattern):
+    layout, cell = pattern
+    step = DEFAULT_WRITERS["SIS_junction"].beam_step
+    shots = write_estimate(cell, layers=["SIS_junction"], workers=1)["shots"]
+    assert shots == pytest.approx((40 * 40 + 0.2 * 5) / step**2, rel=0.01)
+
+
+def test_isolated_line_gets_more_dose(pattern):
+    _, cell = pattern
+    doses = {t.bbox().width(): dose for t, dose in dose_factors(cell)["SIS_junction"]}
+    line, pad = doses[200], doses[40000]
+    assert line > pad > 1
+
+
+def test_proximity_correct_dose_classes(pattern):
+    _, cell = pattern
+    layout, top, report = proximity_correct(cell, dose_step=0.05)
+    assert sum(report["shapes"].values()) == 2
+    assert all(layout.get_info(li).datatype * 0.05 == pytest.approx(report["doses"][str(layout.get_info(li))])
+               for li in layout.layer_indexes() if not top.shapes(li).is_empty())
+
+
+def test_simplify_replaces_junctions_by_ports():
+    _, cell = build_cell("qubits.floating_qubit.FloatingQubit")
+    layout, top, report = simplify(cell, tolerance=0.2)
+    assert 0 < report["simplified_vertices"] < report["vertices"]
+    assert len(report["junction_ports"]) == 1
+    for name in JUNCTION_LAYERS:
+        assert top.begin_shapes_rec(_junction_layer(layout, name)).at_end()
+    # smoothing moves outlines by less than the tolerance
+    gap = default_layers["1t1_base_metal_gap_wo_grid"]
+    before = pya.Region(cell.begin_shapes_rec(cell.layout().layer(gap)))
+    after = pya.Region(top.begin_shapes_rec(layout.layer(gap)))
+    assert (before ^ after).sized(-int(0.2 / layout.dbu)).is_empty()
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.elements.launcher import LauncherAS
+from kqcircuits.scq_layout.qubits.floating_qubit import FloatingQubit
+from kqcircuits.scq_layout.util.build import build_cell
+from kqcircuits.scq_layout.util.frequency_plan import C_LIGHT, GAP_LAYER, _Ends, chip_resonators, frequency_plan
+
+
+def _resonator(name, kinds, lengths, qubit=None):
+    return {"name": name, "kinds": kinds, "lengths": lengths, "a": [10] * len(lengths), "b": [6] * len(lengths),
+            "qubit": qubit}
+
+
+def test_frequencies_on_a_thick_substrate():
+    resonators = [_resonator("half", ["open", "open"], [3000.0, 3000.0]),
+                  _resonator("quarter", ["open", "short"], [6000.0])]
+    plan = frequency_plan(resonators, eps_r=11.45, substrate_thickness=None)
+    half, quarter = plan["resonators"]
+    # ε_eff of a CPW on a thick substrate is the mean of the substrate and vacuum
+    assert half["frequency"] == pytest.approx(C_LIGHT / (2 * 6e-3 * np.sqrt((11.45 + 1) / 2)) * 1e-9)
+    assert (half["type"], quarter["type"]) == ("half", "quarter")
+    assert quarter["frequency"] == pytest.approx(half["frequency"] / 2)
+    assert half["length"] == 6000.0 and half["impedance"] == pytest.approx(50, abs=2)
+
+
+def test_collisions_and_detuning():
+    resonators = [_resonator("R1", ["open", "open"], [12000.0]), _resonator("R2", ["open", "open"], [12010.0]),
+                  _resonator("R3", ["short", "open"], [5000.0], qubit="Q0"),
+                  _resonator("R4", ["short", "open"], [5500.0], qubit="Q1")]
+    plan = frequency_plan(resonators, {"Q0": 6.0, "Q1": 4.0})
+    assert plan["collisions"] == [["R2", "R1"]]
+    frequencies = {r["name"]: r["frequency"] for r in plan["resonators"]}
+    assert plan["resonators"][2]["detuning"] == pytest.approx(frequencies["R3"] - 6.0)
+    assert plan["detuning_violations"] == ["R3"] and abs(frequencies["R4"] - 4.0) > 0.5
+
+
+def test_chip_resonators():
+    _, cell = build_cell("chips.test.TestChip")
+    resonators = {r["name"]: r for r in chip_resonators(cell)}
+    assert set(resonators) == {"C1_port_a-C2_port_b", "Q0_port_coupler"}  # not the launcher feed lines
+    # the meander between the capacitors is open at both ends, the readout of Q0 is shorted at its far end
+    assert resonators["C1_port_a-C2_port_b"]["kinds"] == ["open", "open"]
+    readout = resonators["Q0_port_coupler"]
+    assert sorted(readout["kinds"]) == ["open", "short"] and readout["qubit"] == "Q0"
+    assert len(readout["lengths"]) == 2  # two waveguides chained end to end
+    plan = frequency_plan(list(resonators.values()))
+    assert [r["type"] for r in plan["resonators"]] == ["half", "quarter"]
+
+
+def test_launchers_are_found_by_type():
+    layout = pya.Layout()
+    top = layout.create_cell("top")
+    for name, cls in [("P1", LauncherAS), ("Launcher", FloatingQubit)]:
+        top.insert(pya.DCellInstArray(cls.create(layout).cell_index(), pya.DTrans())).set_property("id", name)
+    launchers = _Ends(top, GAP_LAYER).launchers
+    assert "P1_port" in launchers and not any(name.startswith("Launcher_") for name in launchers)
+    _, cell = build_cell("chips.test.TestChip")  # KQCircuits launchers
+    assert {f"L{i}_port" for i in range(1, 5)} <= _Ends(cell, GAP_LAYER).launchers
@@ -0,0 +1,49 @@
+import pytest
+
+from kqcircuits.klayout_view import KLayoutView
+
+from kqcircuits.scq_layout.qubits import floating_coupler  # pylint: disable=unused-import
+from kqcircuits.scq_layout.qubits.floating_qubit import FloatingQubit
+from kqcircuits.scq_layout.util.hot_reload import PACKAGE, HotReloader, _dependents
+
+QUBIT = f"{PACKAGE}.qubits.floating_qubit"
+COUPLER = f"{PACKAGE}.qubits.floating_coupler"
+
+
+@pytest.fixture
+def view():
+    view = KLayoutView()
+    view.insert_cell(FloatingQubit)
+    return view
+
+
+def test_dependents_come_after_their_dependencies():
+    names = [module.__name__ for module in _dependents([f"{PACKAGE}.elements.xy_line"])]
+    assert names[0] == f"{PACKAGE}.elements.xy_line"
+    assert names.index(QUBIT) < names.index(f"{PACKAGE}.chips.test")
+    assert _dependents([f"{PACKAGE}.not_a_module"]) == []
+
+
+def test_unchanged_sources_do_not_rebuild(view):
+    reports = []
+    reloader = HotReloader(view.layout, on_rebuild=reports.append)
+    assert reloader.poll() is None and reports == []
+
+
+def test_only_cells_of_changed_modules_are_rebuilt(view):
+    reports = []
+    reloader = HotReloader(view.layout, on_rebuild=reports.append)
+    assert reloader.rebuild([COUPLER])["cells"] == 0
+    report = reloader.rebuild([QUBIT])
+    assert report["ok"] and report["reloaded"] == [QUBIT, f"{PACKAGE}.chips.test"] and report["cells"] == 1
+    assert reports[-1] is report
+    assert not view.top_cell.bbox().empty()
+
+
+def test_poll_rebuilds_after_a_source_change(view):
+    reloader = HotReloader(view.layout)
+    path = next(path for path in reloader._mtimes if path.name == "floating_qubit.py")
+    reloader._mtimes[path] -= 1
+    report = reloader.poll()
+    assert report["changed"] == [QUBIT] and report["cells"] == 1
+    assert reloader.poll() is None
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from kqcircuits.defaults import default_layers
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.junctions.junction_area import (E_CHARGE, JunctionModel, junction_overlaps, junction_table,
+                                                          validate)
+from kqcircuits.scq_layout.junctions.squidAS import SquidAS
+from kqcircuits.scq_layout.junctions.squidC import SquidC
+from kqcircuits.scq_layout.util.build import build_cell
+
+
+@pytest.mark.parametrize("cls", [SquidAS, SquidC])
+@pytest.mark.parametrize("flip", [False, True])
+def test_overlap_of_perpendicular_bars(cls, flip):
+    params = {"JJ_width": [0.09, 0.15, 0.2], "JJ_length": 3.0, "JJ_overshoot": 1.0, "flip": flip}
+    dx, dy, bar_area = junction_overlaps(cls, params)
+    widths = np.array(params["JJ_width"])[:, None]
+    assert np.allclose(dx, widths) and np.allclose(dy, widths)
+    assert np.allclose(bar_area, 2 * widths * (3.0 + 1.0))
+
+
+@pytest.mark.parametrize("cls", [SquidAS, SquidC])
+def test_built_junction_area(cls):
+    # the merged crosses on the built SIS_junction layer: two bars per junction less their overlap
+    params = {"JJ_width": 0.13, "JJ_length": 2.5, "JJ_overshoot": 0.7}
+    layout, cell = build_cell(cls, **params)
+    region = pya.Region(cell.begin_shapes_rec(layout.layer(default_layers["1t1_SIS_junction"])))
+    expected = 2 * (2 * 0.13 * (2.5 + 0.7) - 0.13**2)
+    assert region.area() * layout.dbu**2 == pytest.approx(expected, abs=1e-6)
+
+
+@pytest.mark.parametrize("cls", [SquidAS, SquidC])
+def test_calculation_matches_built_geometry(cls):
+    rng = np.random.default_rng(1)
+    samples = [{"JJ_width": round(float(w), 4), "JJ_length": round(float(length), 3), "flip": bool(flip)}
+               for w, length, flip in zip(rng.uniform(0.05, 0.4, 8), rng.uniform(1, 5, 8), rng.integers(0, 2, 8))]
+    assert validate(cls, samples) == []
+
+
+def test_table_follows_ambegaokar_baratoff():
+    model = JunctionModel(jc=2.0, gap=180e-6)
+    table = junction_table(SquidAS, {"JJ_width": [0.1, 0.2]}, model)
+    area = np.array([[0.01, 0.01], [0.04, 0.04]])
+    assert np.allclose(table["area"], area)
+    ic = 2.0e-6 * area
+    assert np.allclose(table["ic"], ic)
+    assert np.allclose(table["rn"], np.pi * 180e-6 / (2 * ic))
+    assert np.allclose(table["squid_rn"], table["rn"][:, 0] / 2)
+    assert np.allclose(table["ej"], ic / (4 * np.pi * E_CHARGE) * 1e-9)
+    assert table["rn"][1, 0] == pytest.approx(table["rn"][0, 0] / 4)
+
+
+def test_width_bias_and_missing_overlap():
+    biased = junction_table(SquidAS, {"JJ_width": 0.1}, JunctionModel(width_bias=-0.02))
+    assert np.allclose(biased["area"], 0.01)  # drawn overlap
+    assert np.allclose(biased["ic"], 1e-6 * 0.08**2)  # effective overlap
+    closed = junction_table(SquidAS, {"JJ_width": 0.1}, JunctionModel(width_bias=-0.1))
+    assert np.all(np.isinf(closed["rn"])) and np.all(closed["ej"] == 0)
@@ -0,0 +1,68 @@
+import pytest
+
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.util.build import build_cell
+from kqcircuits.scq_layout.util.cell_hash import cell_hashes
+from kqcircuits.scq_layout.util.layout_diff import MARKER_LAYER, diff_cells
+
+
+def _flat_xor_area(a, b):
+    layout_a, layout_b = a.layout(), b.layout()
+    area = 0
+    for info in {*map(layout_a.get_info, layout_a.layer_indexes()), *map(layout_b.get_info, layout_b.layer_indexes())}:
+        regions = [pya.Region(cell.begin_shapes_rec(li)) if li is not None else pya.Region()
+                   for cell, li in ((a, layout_a.find_layer(info)), (b, layout_b.find_layer(info)))]
+        area += (regions[0] ^ regions[1]).area()
+    return area * layout_a.dbu**2
+
+
+def _two_boxes(offset=0.0, size=10.0):
+    layout = pya.Layout()
+    top, child = layout.create_cell("Top"), layout.create_cell("Child")
+    child.shapes(layout.layer(1, 0)).insert(pya.DBox(0, 0, size, size))
+    for x in (0.0, 100.0):
+        inst = top.insert(pya.DCellInstArray(child.cell_index(), pya.DTrans(pya.DVector(x + offset, 0))))
+        inst.set_property("id", f"C{int(x)}")
+    return layout, top
+
+
+def test_content_hashes_match_across_layouts():
+    la, a = build_cell("qubits.floating_qubit.FloatingQubit")
+    lb, b = build_cell("qubits.floating_qubit.FloatingQubit")
+    lc, c = build_cell("qubits.floating_qubit.FloatingQubit", island_sep=25)
+    assert cell_hashes(la)[a.cell_index()] == cell_hashes(lb)[b.cell_index()]
+    assert cell_hashes(la)[a.cell_index()] != cell_hashes(lc)[c.cell_index()]
+
+
+def test_identical_cells():
+    la, a = build_cell("qubits.floating_qubit.FloatingQubit")
+    lb, b = build_cell("qubits.floating_qubit.FloatingQubit")
+    assert diff_cells(a, b)[2] is None
+
+
+def test_changed_child_matches_flat_xor():
+    (la, a), (lb, b) = _two_boxes(), _two_boxes(size=12)
+    markers, top, tree = diff_cells(a, b)
+    assert [child["instance"] for child in tree["changed"]] == ["C0", "C100"]
+    assert tree["area"] == 0 and tree["total_area"] == pytest.approx(_flat_xor_area(a, b))
+    assert pya.Region(top.begin_shapes_rec(markers.layer(*MARKER_LAYER))).count() == 2
+
+
+def test_moved_instances_are_paired():
+    (la, a), (lb, b) = _two_boxes(), _two_boxes(offset=5)
+    tree = diff_cells(a, b)[2]
+    assert tree["added"] == tree["removed"] == tree["changed"] == []
+    assert [(m["instance"], m["changed"]) for m in tree["moved"]] == [("C0", None), ("C100", None)]
+    assert tree["total_area"] == pytest.approx(_flat_xor_area(a, b))
+
+
+def test_moved_waveguide_of_test_chip():
+    la, a = build_cell("chips.test.TestChip")
+    lb, b = build_cell("chips.test.TestChip", readout_sep=20)
+    tree = diff_cells(a, b)[2]
+    meander = next(child for child in tree["changed"] if child["instance"] == "Meander")
+    assert meander["added"] == meander["removed"] == []
+    assert [m["instance"] for m in meander["moved"]] == ["Waveguide Coplanar$6"]
+    # overlapping changes are counted once per cell, so the total is at least the flat XOR
+    assert tree["total_area"] >= _flat_xor_area(a, b) > 0
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.util.build import build_cell
+from kqcircuits.scq_layout.util.geometry import cell_ports
+from kqcircuits.scq_layout.util.netlist import AREA_LAYER, GAP_LAYER, _Netlist, export_netlist, extract_netlist
+
+
+@pytest.fixture
+def chip():
+    return build_cell("chips.test.TestChip")
+
+
+def _net(netlist, port):
+    return next(net["name"] for net in netlist["nets"] if port in net["ports"])
+
+
+def test_intended_nets(chip, tmp_path):
+    netlist = export_netlist(tmp_path / "netlist.json", chip[1])
+    assert json.loads((tmp_path / "netlist.json").read_text()) == netlist
+    # through the capacitor and the meander, but not across the capacitor gap
+    assert _net(netlist, "C1_port_a") == _net(netlist, "C2_port_b") != _net(netlist, "C1_port_b")
+    assert _net(netlist, "L1_port") == _net(netlist, "C1_port_b")
+    grounded = {port for net in netlist["nets"] if net["grounded"] for port in net["ports"]}
+    assert "Q0_port_fluxline" in grounded and "L3_port" not in grounded
+
+
+def test_cut_waveguide_is_an_open(chip):
+    layout, cell = chip
+    # a gap across the whole chip cuts the line from C1 down to C2, and splits the ground in two
+    cell.shapes(layout.layer(*GAP_LAYER)).insert(pya.DBox(-5000, -5, 5000, 5))
+    netlist = extract_netlist(cell)
+    assert netlist["opens"] == [{"net": _net(netlist, "C1_port_a"), "metal_nets": 2}] and netlist["shorts"] == []
+
+
+def test_overlapping_launchers_are_a_short(chip):
+    layout, cell = chip
+    launcher = next(inst for inst in cell.each_inst() if inst.property("id") == "L1")
+    copy = cell.insert(pya.DCellInstArray(launcher.cell_index, pya.DCplxTrans(-50, 0) * launcher.dcplx_trans))
+    copy.set_property("id", "L5")
+    netlist = extract_netlist(cell)
+    assert netlist["shorts"] == [[_net(netlist, "L1_port"), _net(netlist, "L5_port")]]
+    assert netlist["opens"] == [{"port": "L5_port"}]  # nothing is connected to its port
+
+
+def test_element_metal_is_deep():
+    layout, cell = build_cell("qubits.floating_qubit.FloatingQubit")  # pylint: disable=unused-variable
+    netlist = _Netlist(cell, AREA_LAYER, GAP_LAYER)
+    assert netlist.metal.is_deep() and not netlist.metal.is_empty()
+    nets = {name: netlist.probe_port(*port) for name, port in cell_ports(cell).items()}
+    assert nets["port_fluxline"] in netlist.ground and nets["port_coupler"] not in netlist.ground
@@ -0,0 +1,36 @@
+import pytest
+
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.util.build import build_cell, element_class, params_hash
+from kqcircuits.scq_layout.util.parallel_build import build_cells, scaling
+
+QUBIT = "qubits.floating_qubit.FloatingQubit"
+REQUESTS = [(QUBIT, {"island_sep": 30.0}), (QUBIT, {"island_sep": 40.0}), (QUBIT, {"island_sep": 30.0})]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_distinct_cells_are_built_once_and_merged(workers):
+    layout = pya.Layout()
+    cells, report = build_cells(layout, REQUESTS, workers)
+    assert report["cells"] == len(cells) == 2 and report["workers"] == workers
+    for cls, params in REQUESTS[:2]:
+        cell = cells[params_hash(element_class(cls), params)]
+        assert cell.layout() is layout and not cell.is_pcell_variant()
+        reference_layout, reference = build_cell(cls, **params)  # pylint: disable=unused-variable
+        for li in reference_layout.layer_indexes():
+            info = reference_layout.get_info(li)
+            merged = pya.Region(cell.begin_shapes_rec(layout.layer(info)))
+            assert (merged ^ pya.Region(reference.begin_shapes_rec(li))).is_empty(), str(info)
+
+
+def test_merged_cell_names_are_unique():
+    layout = pya.Layout()
+    cells, _ = build_cells(layout, REQUESTS, workers=1)
+    assert len({cell.name for cell in cells.values()}) == 2
+
+
+def test_scaling():
+    result = scaling(REQUESTS[:2], [1, 2])
+    assert set(result) == {1, 2} and result[1]["speedup"] == 1.0
+    assert all(entry["elapsed"] > 0 for entry in result.values())
@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.util.build import build_cell
+from kqcircuits.scq_layout.util.chip_spec import ChipCompiler
+from kqcircuits.scq_layout.util.geometry import cell_ports, island_regions, transform_points
+from kqcircuits.scq_layout.util.netlist import extract_netlist
+from kqcircuits.scq_layout.util.port_check import check_ports
+
+SPEC = Path(__file__).parent.parent / "scq_layout" / "chips" / "test_chip.json"
+
+
+@pytest.fixture(scope="module")
+def chip():
+    return build_cell("chips.test.TestChip")
+
+
+def test_transform_points_matches_klayout():
+    trans = pya.DCplxTrans(1.5, 30, True, 10, -20)
+    points = np.array([[1.0, 2.0], [-3.0, 0.5]])
+    expected = [[p.x, p.y] for p in (trans * pya.DPoint(*point) for point in points)]
+    assert np.allclose(transform_points(points, trans), expected)
+
+
+def test_cell_ports_point_outwards():
+    _, cell = build_cell("qubits.floating_qubit.FloatingQubit")
+    ports = cell_ports(cell)
+    assert {"port_fluxline", "port_xyline", "port_coupler"} <= set(ports)
+    for point, direction in ports.values():
+        assert direction.length() == pytest.approx(1)
+
+
+def test_island_regions():
+    _, cell = build_cell("qubits.floating_qubit.FloatingQubit")
+    islands = island_regions(cell)
+    assert len(islands) >= 2 and islands[0].area() >= islands[1].area() > 0
+    assert (islands[0] & islands[1]).is_empty()
+
+
+def test_test_chip_is_aligned_and_connected(chip):
+    _, cell = chip
+    report = check_ports(cell)
+    assert report["connections"] > 0 and report["misaligned"] == []
+    netlist = extract_netlist(cell)
+    assert netlist["opens"] == [] and netlist["shorts"] == []
+
+
+def test_offset_waveguide_is_reported():
+    spec = json.loads(SPEC.read_text())
+    flux = next(c for c in spec["connections"] if c.get("nodes", [None])[-1] == "Q0_port_fluxline")
+    flux["nodes"][-1] = ["Q0_port_fluxline.x + 0.5", "Q0_port_fluxline.y"]
+    compiler = ChipCompiler()  # keeps the layout alive
+    report = check_ports(compiler.compile(spec))
+    # the port of the qubit and the one of its flux line it was copied from
+    assert {m["terminal"] for m in report["misaligned"]} == {"Q0_port_fluxline", "Q0_Flux Line T/port_fluxline"}
+    assert all(m["offset"] == pytest.approx(0.5) for m in report["misaligned"])
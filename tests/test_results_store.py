@@ -0,0 +1,74 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from kqcircuits.scq_layout.util.results_store import ResultsStore, flatten
+
+
+def _write(root, worker, rows, batch):
+    with ResultsStore(root).writer(batch) as writer:
+        for i in range(rows):
+            writer.append({"hash": f"{worker:02d}{i:038d}", "params": {"worker": worker, "i": i},
+                           "metrics": {"vertices": 10 * i}, "error": "odd" if i % 2 else None})
+    return rows
+
+
+def test_flatten():
+    assert flatten({"params": {"r": 5, "size": [1, 2]}, "time": None}) == \
+        {"params.r": 5, "params.size.0": 1, "params.size.1": 2, "time": None}
+
+
+def test_concurrent_writers(tmp_path):
+    store = ResultsStore(tmp_path)
+    with ProcessPoolExecutor(3) as pool:
+        futures = [pool.submit(_write, tmp_path, worker, 300, 32) for worker in range(3)]
+        while not all(f.done() for f in futures):
+            rows = store.query(columns=["hash", "params.worker", "params.i", "metrics.vertices"])
+            lengths = {len(values) for values in rows.values()}
+            assert len(lengths) == 1  # no partial rows
+            assert np.all(rows["metrics.vertices"] == 10 * rows["params.i"])
+        assert sum(f.result() for f in futures) == 900
+    assert len(store) == 900 and len(store.segments()) == 3
+
+
+def test_queries_across_segments(tmp_path):
+    store = ResultsStore(tmp_path)
+    for worker in range(3):
+        _write(tmp_path, worker, 50, 16)
+    with store.writer() as writer:  # a segment without ``error`` and with a column of its own
+        writer.append({"hash": "f" * 40, "params": {"worker": 9, "i": 0}, "metrics": {"vertices": 0}, "time": 1.5})
+
+    rows = store.query(lambda c: c["params.i"] >= 48, columns=["params.worker", "error", "time"])
+    assert sorted(rows["params.worker"]) == [0, 0, 1, 1, 2, 2]
+    assert list(rows["error"]).count("odd") == 3 and np.all(np.isnan(rows["time"]))
+    assert store.query(lambda c: c["time"] > 1, columns=["params.worker"])["params.worker"].tolist() == [9]
+
+    found = store.find([f"01{7:038d}", "f" * 40, "e" * 40], columns=["params.worker", "params.i"])
+    assert sorted(zip(found["params.worker"], found["params.i"])) == [(1, 7), (9, 0)]
+
+
+def test_column_names_are_escaped(tmp_path):
+    store = ResultsStore(tmp_path)
+    with store.writer() as writer:
+        writer.append({"metrics": {"a/b": 1, "..": 2, "meta.json": 3}})
+    rows = store.query()
+    assert rows["metrics.a/b"].tolist() == [1] and rows["metrics..."].tolist() == [2]
+    assert rows["metrics.meta.json"].tolist() == [3]
+
+
+def test_type_drift(tmp_path):
+    store = ResultsStore(tmp_path)
+    with store.writer(batch=2) as writer:
+        writer.append({"time": None, "vertices": 5})
+        writer.append({"time": None, "vertices": 6})  # flushed: ``time`` has missing values only
+        writer.append({"time": "slow", "vertices": 7})  # so it becomes a string column
+        with pytest.raises(ValueError, match="vertices"):
+            writer.append({"time": "fast", "vertices": "many"})
+        with pytest.raises(ValueError, match="time"):
+            writer.append({"time": 3.0})
+        with pytest.raises(TypeError):
+            writer.append({"time": object()})
+        writer.append({"time": "fast", "vertices": 8})
+    rows = store.query()
+    assert rows["time"].tolist() == [None, None, "slow", "fast"] and rows["vertices"].tolist() == [5, 6, 7, 8]
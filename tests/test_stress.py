@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from kqcircuits.scq_layout.util.param_space import ParamSpace, param_key
+from kqcircuits.scq_layout.util.stress import StressTest, measure
+
+FLOATING_COUPLER = "qubits.floating_coupler.FloatingCoupler"
+
+
+def test_measure_reports_pcell_errors():
+    good = measure(FLOATING_COUPLER, {})
+    assert good["error"] is None and good["vertices"] > 0
+    bad = measure(FLOATING_COUPLER, {"island1_r": "abc"})
+    assert "TypeError" in bad["error"] and bad["vertices"] == 0
+
+
+def test_param_space():
+    space = StressTest(FLOATING_COUPLER, {"island1_extent[1]": (100, 200), "align_r": (1, 50)}).space
+    assert param_key("island1_extent[1]") == ("island1_extent", 1) and param_key("align_r") == ("align_r", None)
+    params = space.params([150, 20])
+    assert params["align_r"] == 20 and params["island1_extent"][1] == 150
+    assert np.allclose(space.point(params), [150, 20])
+    xs = space.sample(10, np.random.default_rng(0))
+    # one point in each tenth of every range
+    assert sorted(np.floor(space.unit(xs)[:, 0] * 10)) == list(range(10))
+    assert space.contains(xs[0]) and not space.contains([250, 20])
+
+
+def test_feasible_matches_constraints():
+    space = ParamSpace(StressTest(FLOATING_COUPLER).cls, {"island1_r": (0, 200)})
+    xs = np.array([[10.0], [199.0]])
+    assert list(space.feasible(xs)) == [True, False]
+
+
+class _Synthetic(StressTest):
+    """Builds are errors when ``align_r < 30`` (default 95) whatever the other Params."""
+
+    def measure(self, xs):
+        self.builds += len(xs)
+        return [{"time": 1.0, "vertices": 10, "error": "boom" if self.params(x)["align_r"] < 30 else None}
+                for x in xs]
+
+
+def test_shrink_resets_irrelevant_params_and_bisects():
+    test = _Synthetic(FLOATING_COUPLER, {"align_r": (1, 100), "island1_r": (1, 100)})
+    shrunk = test.shrink([10.0, 70.0], (None, None), error=True)
+    assert list(shrunk["params"]) == ["align_r"]  # island1_r is back at its default
+    assert 29 < shrunk["params"]["align_r"] < 30
+    assert test.shrink([40.0, 70.0], (None, None), error=True) is None
+
+
+def test_run_reports_error_outliers():
+    test = _Synthetic(FLOATING_COUPLER, {"align_r": (1, 100)}, workers=1)
+    report = test.run(samples=20, constrained=False, max_outliers=2)
+    errors = [s for s in report["samples"] if s["error"]]
+    assert errors and len(report["outliers"]) == 2
+    assert all(o["error"] == "boom" and o["shrunk"]["params"]["align_r"] == pytest.approx(30, abs=0.5)
+               for o in report["outliers"])
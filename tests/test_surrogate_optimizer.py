@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from kqcircuits.scq_layout.util.param_space import ParamSpace
+from kqcircuits.scq_layout.util.surrogate_optimizer import GaussianProcess, ResultCache, SurrogateOptimizer
+
+FLOATING_COUPLER = "qubits.floating_coupler.FloatingCoupler"
+BOUNDS = {"island1_r": (10, 250), "align_r": (20, 100)}
+TARGETS = {"C": 120.0, "L": 50.0}
+
+
+class _Analytic:
+    """Evaluator with a known optimum at ``island1_r = 60, align_r = 50``, remembering what it evaluated."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, cls, params):
+        self.calls.append(params)
+        return {"C": 2.0 * params["island1_r"], "L": params["align_r"]}
+
+
+def test_gaussian_process_interpolates():
+    x = np.linspace(0, 1, 8)[:, None]
+    model = GaussianProcess().fit(x, np.sin(3 * x[:, 0]))
+    mean, std = model.predict(x)
+    assert np.allclose(mean, np.sin(3 * x[:, 0]), atol=1e-3) and np.all(std < 1e-2)
+    mean, std = model.predict([[0.5], [3.0]])
+    assert mean[0] == pytest.approx(np.sin(1.5), abs=1e-2)
+    assert std[1] > 10 * std[0]  # uncertain far from the data
+
+
+def test_result_cache(tmp_path):
+    cls = ParamSpace  # any class, only its dotted path is stored
+    cache = ResultCache(tmp_path)
+    assert cache.get(cls, {"a": 1.0}) is None
+    cache.put(cls, {"a": 1.0}, {"C": 2.5})
+    assert cache.get(cls, {"a": 1.0}) == {"C": 2.5} and cache.get(cls, {"a": 2.0}) is None
+    assert list(cache.entries(cls)) == [({"a": 1.0}, {"C": 2.5})]
+    assert not list(cache.entries(ResultCache))
+
+
+def test_optimizer_reaches_targets_without_building_infeasible_designs(tmp_path):
+    evaluator = _Analytic()
+    optimizer = SurrogateOptimizer(FLOATING_COUPLER, BOUNDS, TARGETS, evaluator=evaluator, cache_dir=tmp_path,
+                                   workers=1)
+    best = optimizer.run(max_evaluations=40)
+    assert best["objective"] < 1e-3 and best["evaluations"] <= 40
+    assert best["params"]["island1_r"] == pytest.approx(60, rel=0.02)
+    assert best["params"]["align_r"] == pytest.approx(50, rel=0.02)
+    calls = np.array([[p["island1_r"], p["align_r"]] for p in evaluator.calls])
+    assert np.all(optimizer.feasible(calls))
+    assert not np.all(optimizer.feasible(optimizer.space.uniform(200, np.random.default_rng(0))))
+
+
+def test_cache_warm_starts_later_runs(tmp_path):
+    first = SurrogateOptimizer(FLOATING_COUPLER, BOUNDS, TARGETS, evaluator=_Analytic(), cache_dir=tmp_path, workers=1)
+    best = first.run(max_evaluations=40)
+    evaluator = _Analytic()
+    second = SurrogateOptimizer(FLOATING_COUPLER, BOUNDS, TARGETS, evaluator=evaluator, cache_dir=tmp_path, workers=1)
+    assert second.history
+    assert second.run(max_evaluations=40)["params"] == best["params"] and evaluator.calls == []
+    # other fixed parameters do not reuse the cached designs
+    other = SurrogateOptimizer(FLOATING_COUPLER, BOUNDS, TARGETS, evaluator=_Analytic(), cache_dir=tmp_path,
+                               fixed={"island_sep": 40.0}, workers=1)
+    assert not other.history
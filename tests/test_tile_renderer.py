@@ -0,0 +1,49 @@
+import pytest
+
+from kqcircuits.klayout_view import KLayoutView
+from kqcircuits.pya_resolver import pya
+
+from kqcircuits.scq_layout.qubits.floating_qubit import FloatingQubit
+from kqcircuits.scq_layout.util.tile_renderer import TileRenderer
+
+
+@pytest.fixture
+def view():
+    view = KLayoutView()
+    view.insert_cell(FloatingQubit)
+    return view
+
+
+def test_tile_geometry(view, tmp_path):
+    renderer = TileRenderer(view, cache_dir=tmp_path, tile_size=64)
+    assert renderer.tile_box(0, 0, 0) == renderer.world
+    for x in range(4):
+        for y in range(4):
+            assert renderer.tile_at(2, renderer.tile_box(2, x, y).center()) == (x, y)
+    assert renderer.level_for(renderer.tile_box(3, 1, 1)) == 3
+
+
+def test_only_changed_tiles_are_rendered_again(view, tmp_path):
+    renderer = TileRenderer(view, cache_dir=tmp_path, tile_size=64)
+    renderer.pyramid([0, 1])
+    assert (renderer.hits, renderer.misses) == (0, 5)
+    cached = TileRenderer(view, cache_dir=tmp_path, tile_size=64)
+    cached.pyramid([0, 1])
+    assert (cached.hits, cached.misses) == (5, 0) and len(list(tmp_path.iterdir())) == 5
+
+    # a small box well inside the top left quadrant, so the bounding box does not change
+    quadrant = renderer.tile_box(1, 0, 0)
+    center = quadrant.center()
+    renderer.cell.shapes(renderer.layout.layer(1, 0)).insert(pya.DBox(center.x - 1, center.y - 1, center.x + 1,
+                                                                       center.y + 1))
+    renderer.refresh()
+    renderer.hits = renderer.misses = 0
+    renderer.pyramid([0, 1])
+    assert (renderer.hits, renderer.misses) == (3, 2)  # the top left tile and the whole-cell tile
+
+
+def test_svg_tiles(view, tmp_path):
+    renderer = TileRenderer(view, cache_dir=tmp_path, tile_size=64)
+    svg = renderer.tile(0, 0, 0, "svg").decode()
+    assert svg.startswith("<svg") and "<path" in svg
+    assert renderer.tile(0, 0, 0, "png")[:8] == b"\x89PNG\r\n\x1a\n"
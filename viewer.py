@@ -1,9 +1,14 @@
 from kqcircuits.klayout_view import KLayoutView
 #from kqcircuits.scq_layout.qubits.floating_qubit import FloatingQubit
 from kqcircuits.scq_layout.chips.test import TestChip
+from kqcircuits.scq_layout.util.hot_reload import HotReloader
 
 if __name__ == '__main__':
     view = KLayoutView()
     #view.insert_cell(FloatingQubit)
     view.insert_cell(TestChip)
-    view.focus()
\ No newline at end of file
+    view.focus()
+    # run with `-rd watch=1` to rebuild the edited cells whenever a source file is saved
+    if globals().get("watch"):
+        reloader = HotReloader(view.layout)
+        reloader.start_timer()